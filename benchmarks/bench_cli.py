@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_cli.py – Aprovisionamiento de una librería grande con `cli.py`.
+
+Uso:
+    python -m benchmarks.bench_cli [--files 2000] [--jobs 1 4]
+
+• Genera `--files` GIF sintéticos distintos (varios tamaños) en un árbol
+  de carpetas y los añade con `cli.py add -r` a una librería temporal.
+• Precalcula miniaturas y metadatos con distintos `--jobs` (caché fría)
+  y una segunda pasada con la caché ya caliente.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import cli
+from benchmarks.synthetic import write_gif
+from utils.thumb_cache import ThumbnailCache
+
+
+def _tree(root: Path, files: int) -> None:
+    sizes = [(64, 48), (160, 120), (320, 240)]
+    for i in range(files):
+        folder = root / f"d{i % 20:02d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        w, h = sizes[i % len(sizes)]
+        # `distinct` variable: archivos distintos (claves de caché distintas)
+        write_gif(folder / f"{i:05d}.gif", w, h, frames=4, distinct=1 + i % 4)
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--files", type=int, default=2000)
+    ap.add_argument("--jobs", type=int, nargs="+", default=[1, 4])
+    args = ap.parse_args(argv)
+
+    result: dict = {"files": args.files}
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        _tree(tmp / "gifs", args.files)
+        lib = ["--library", str(tmp / "library.db")]
+
+        t0 = time.perf_counter()
+        cli.main(lib + ["add", "-r", str(tmp / "gifs")])
+        result["add_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        paths = [str(p) for p in sorted((tmp / "gifs").rglob("*.gif"))]
+        for jobs in args.jobs:
+            shutil.rmtree(tmp / "thumbs", ignore_errors=True)
+            cache = ThumbnailCache(tmp / "thumbs")
+            t0 = time.perf_counter()
+            cli.precompute_thumbnails(paths, jobs, cache)
+            result[f"thumbs_cold_j{jobs}_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        t0 = time.perf_counter()
+        cli.precompute_thumbnails(paths, max(args.jobs), cache)
+        result["thumbs_warm_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        t0 = time.perf_counter()
+        cli.main(lib + ["verify"])
+        result["verify_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_clock.py – Despertares/s y CPU con N overlays simultáneos.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_clock [--counts 1 10 50] [--seconds 5]
+
+• `shared`: todos los overlays sobre un único AnimationClock.
+• `independent`: un reloj por overlay (equivale a un QTimer por QMovie).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from modules.animation_clock import AnimationClock  # noqa: E402
+from modules.overlay import GifOverlay  # noqa: E402
+
+SAMPLES = [
+    str(p) for p in sorted((Path(__file__).resolve().parent.parent / "src").glob("*.gif"))
+]
+
+
+def spin(ms: int) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def bench_overlays(count: int, seconds: float, shared: bool) -> dict:
+    shared_clock = AnimationClock()
+    clocks: List[AnimationClock] = []
+    overlays: List[GifOverlay] = []
+    for i in range(count):
+        clock = shared_clock if shared else AnimationClock()
+        if clock not in clocks:
+            clocks.append(clock)
+        ov = GifOverlay(SAMPLES[i % len(SAMPLES)], scale_percent=50,
+                        speed=100 + (i % 4) * 25, clock=clock)
+        ov.show()
+        overlays.append(ov)
+
+    spin(500)   # primer ciclo: decodificación y caché caliente
+    for c in clocks:
+        c.reset_stats()
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    spin(int(seconds * 1000))
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+
+    wakeups = sum(c.wakeups for c in clocks)
+    ticks = sum(c.ticks for c in clocks)
+    for ov in overlays:
+        ov.close()
+    spin(50)
+
+    return {
+        "overlays": count,
+        "mode": "shared" if shared else "independent",
+        "wakeups_per_s": round(wakeups / wall, 1),
+        "frames_per_s": round(ticks / wall, 1),
+        "cpu_percent": round(100 * cpu / wall, 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> list:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--counts", type=int, nargs="+", default=[1, 10, 50])
+    ap.add_argument("--seconds", type=float, default=5.0)
+    args = ap.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    results = []
+    for count in args.counts:
+        for shared in (True, False):
+            results.append(bench_overlays(count, args.seconds, shared))
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
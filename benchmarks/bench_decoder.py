@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_decoder.py – Decodificador NumPy (`utils.gif_decoder`) frente a Qt.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_decoder [--files 64] [--jobs 1 4]
+
+• Validación frame a frame contra QImageReader (píxeles RGBA y retardos) y
+  QMovie (píxeles; su `nextFrameDelay()` es lo que le queda al temporizador)
+  con los GIF de `src/`, sintéticos y casos construidos a mano:
+  disposición 1/2/3, transparencia, tablas locales, sin tabla global,
+  entrelazado, frames fuera del lienzo y archivo cortado. Los píxeles
+  transparentes en ambos lados se comparan solo por su alfa.
+• Tiempo de decode por archivo (un ciclo completo) de cada decodificador.
+• Miniaturas de `--files` GIF con `cli.precompute_thumbnails`: hilos
+  (QImageReader) frente a procesos (`--processes`) para cada `--jobs`.
+• Sale con código 1 si algún frame no coincide.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.synthetic import _lzw_literal, _subblocks, write_gif
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# (x, y, ancho, alto, disposición, índice transparente o -1, tabla local)
+Frame = Tuple[int, int, int, int, int, int, bool]
+
+_FRAMES: List[Frame] = [
+    (0, 0, 40, 30, 1, -1, False), (5, 5, 10, 10, 2, 7, False), (8, 3, 20, 20, 3, 9, True),
+    (0, 0, 12, 12, 2, -1, False), (30, 20, 20, 20, 1, 2, True), (2, 2, 5, 5, 3, -1, False),
+    (1, 1, 3, 3, 0, -1, False),
+]
+
+
+def _colors(count: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.randrange(256) for _ in range(3 * count))
+
+
+def _crafted_gif(
+    path: Path, frames: List[Frame], global_table: bool = True, interlaced: bool = False,
+    background: int = 3, cut: int = 0,
+) -> Path:
+    """GIF de 40×30 con los frames indicados (tablas locales de 4 colores)."""
+    out = bytearray(b"GIF89a")
+    out += struct.pack("<HHBBB", 40, 30, 0xF7 if global_table else 0x70, background, 0)
+    if global_table:
+        out += _colors(256, 1)
+    out += b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00"
+    rng = random.Random(5)
+    for x, y, w, h, disposal, transparent, local in frames:
+        flags = disposal << 2 | (transparent >= 0)
+        out += struct.pack("<BBBBHBB", 0x21, 0xF9, 4, flags, 7, max(transparent, 0), 0)
+        packed = (0x81 if local else 0) | (0x40 if interlaced else 0)
+        out += struct.pack("<BHHHHB", 0x2C, x, y, w, h, packed)
+        if local:
+            out += _colors(4, x + y)
+        pixels = bytes(rng.randrange(4 if local else 256) for _ in range(w * h))
+        out.append(8)
+        out += _subblocks(_lzw_literal(pixels))
+    out.append(0x3B)
+    path.write_bytes(bytes(out[:-cut] if cut else out))
+    return path
+
+
+def _cases(tmp: Path) -> List[Path]:
+    files = sorted(p for p in (ROOT / "src").iterdir() if p.suffix.lower() == ".gif")
+    files.append(write_gif(tmp / "synthetic.gif", 120, 90, frames=6, distinct=3))
+    files += [
+        _crafted_gif(tmp / "disposal.gif", _FRAMES),
+        _crafted_gif(tmp / "interlaced.gif", _FRAMES, interlaced=True),
+        _crafted_gif(tmp / "no_global_table.gif", _FRAMES, global_table=False),
+        _crafted_gif(tmp / "truncated.gif", _FRAMES, cut=700),
+        _crafted_gif(tmp / "background.gif", [(0, 0, 40, 30, 2, -1, False),
+                                              (5, 5, 10, 10, 2, -1, False),
+                                              (0, 0, 40, 30, 1, -1, False)]),
+        _crafted_gif(tmp / "transparent_first.gif", [(5, 5, 10, 10, 1, 4, False),
+                                                     (0, 0, 5, 5, 1, -1, False)]),
+    ]
+    return files
+
+
+def _qt_frames(path: Path, movie: bool) -> List[tuple]:
+    """(RGBA alto × ancho × 4, retardo) de cada frame según Qt."""
+    import numpy as np
+    from PyQt6.QtGui import QImage, QImageReader, QMovie
+
+    raw = []
+    if movie:
+        m = QMovie(str(path))
+        m.setCacheMode(QMovie.CacheMode.CacheAll)
+        for i in range(m.frameCount()):
+            m.jumpToFrame(i)
+            raw.append((m.currentImage(), m.nextFrameDelay()))
+    else:
+        reader = QImageReader(str(path))
+        while reader.canRead():
+            img = reader.read()
+            if img.isNull():
+                break
+            raw.append((img, reader.nextImageDelay()))
+    frames = []
+    for img, delay in raw:
+        img = img.convertToFormat(QImage.Format.Format_RGBA8888)
+        rows = np.frombuffer(img.constBits().asstring(img.sizeInBytes()), np.uint8)
+        rows = rows.reshape(img.height(), img.bytesPerLine())[:, :img.width() * 4]
+        frames.append((rows.reshape(img.height(), img.width(), 4), delay))
+    return frames
+
+
+def _mismatches(decoded, reference: List[tuple], delays: bool) -> int:  # noqa: ANN001
+    """Frames distintos (o que faltan/sobran) entre el decodificador y Qt."""
+    bad = abs(len(decoded.frames) - len(reference))
+    for rgba, delay, (expected, expected_delay) in zip(decoded.frames, decoded.delays, reference):
+        differs = (rgba != expected).any(-1) & ~((rgba[..., 3] == 0) & (expected[..., 3] == 0))
+        bad += bool(differs.any() or (delays and delay != expected_delay))
+    return bad
+
+
+def _validate(files: List[Path]) -> Dict[str, dict]:
+    from utils.gif_decoder import decode_file
+
+    result = {}
+    for path in files:
+        t = time.perf_counter()
+        decoded = decode_file(str(path))
+        decoder_ms = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        reader = _qt_frames(path, movie=False)
+        qt_ms = (time.perf_counter() - t) * 1000
+        result[path.name] = {
+            "frames": len(decoded.frames),
+            "mismatched_reader": _mismatches(decoded, reader, delays=True),
+            "mismatched_movie": _mismatches(decoded, _qt_frames(path, movie=True), delays=False),
+            "decoder_ms": round(decoder_ms, 1),
+            "qt_ms": round(qt_ms, 1),
+        }
+    return result
+
+
+def _thumbnails(tmp: Path, files: int, jobs_list: List[int]) -> dict:
+    import cli
+    from utils.thumb_cache import ThumbnailCache
+
+    sizes = [(160, 120), (320, 240), (480, 360)]
+    paths = [str(write_gif(tmp / "thumbs_src" / f"{i:04d}.gif", *sizes[i % len(sizes)],
+                           frames=4, distinct=1 + i % 4))
+             for i in range(files)]
+    result: dict = {"files": files}
+    for jobs in jobs_list:
+        for label, processes in (("threads", False), ("processes", True)):
+            cache = ThumbnailCache(tmp / f"thumbs_{label}_j{jobs}")
+            t = time.perf_counter()
+            rows = cli.precompute_thumbnails(paths, jobs, cache, processes=processes)
+            result[f"{label}_j{jobs}_ms"] = round((time.perf_counter() - t) * 1000, 1)
+            result[f"{label}_j{jobs}_failed"] = sum(1 for r in rows if not r["ok"])
+    return result
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--files", type=int, default=64)
+    ap.add_argument("--jobs", type=int, nargs="+", default=[1, 4])
+    args = ap.parse_args(argv)
+
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841  (QMovie)
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        (tmp / "thumbs_src").mkdir()
+        files = _validate(_cases(tmp))
+        result: dict = {
+            "files": files,
+            "mismatched_frames": sum(f["mismatched_reader"] + f["mismatched_movie"]
+                                     for f in files.values()),
+            "thumbnails": _thumbnails(tmp, args.files, args.jobs),
+        }
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return result
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main()["mismatched_frames"] else 0)
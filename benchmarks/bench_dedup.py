@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_dedup.py – Copias idénticas: coste de detectarlas y lo que ahorran.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_dedup [--unique 40] [--copies 5]
+        [--singles 100] [--entries 100000]
+
+• Genera `--unique` GIF sintéticos distintos y `--copies` copias de cada uno
+  en carpetas distintas, `--singles` GIF sin copias y un archivo que solo
+  difiere en el centro (mismo tamaño, cabeza y cola: el hash rápido
+  coincide, el completo no).
+• Hash rápido (µs por archivo) frente al completo, e importación con
+  `cli.find_duplicates`: cuántos archivos hubo que leer enteros.
+• Miniaturas y frames de todas las copias con y sin identidad por
+  contenido: archivos de miniatura escritos, decodes y memoria de frames.
+• Agrupar `--entries` entradas sintéticas (sin archivos) con `DuplicateIndex`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from benchmarks.synthetic import write_gif
+
+
+def _files(tmp: Path, unique: int, copies: int, singles: int) -> List[str]:
+    seeds = tmp / "seeds"
+    seeds.mkdir()
+    files = []
+    for i in range(unique):
+        seed = write_gif(seeds / f"{i:04d}.gif", 120 + i % 7 * 20, 90 + i % 5 * 20,
+                         frames=8, distinct=1 + i % 8)
+        for c in range(copies):
+            folder = tmp / "gifs" / f"carpeta{c}"
+            folder.mkdir(parents=True, exist_ok=True)
+            files.append(str(shutil.copy(seed, folder / f"{i:04d}.gif")))
+    for i in range(singles):
+        files.append(str(write_gif(tmp / "gifs" / f"unico{i:04d}.gif", 100 + i, 80,
+                                   frames=4, distinct=1 + i % 4)))
+    # Casi idéntico: el hash rápido no basta para distinguirlo
+    data = bytearray(Path(files[0]).read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    variant = tmp / "gifs" / "variante.gif"
+    variant.write_bytes(data)
+    files.append(str(variant))
+    return files
+
+
+def _hashes(files: List[str]) -> dict:
+    from utils.content_hash import full_hash, quick_hash
+
+    result = {}
+    for name, fn in (("quick_us", quick_hash), ("full_us", full_hash)):
+        t = time.perf_counter()
+        for path in files:
+            fn(path)
+        result[name] = round((time.perf_counter() - t) / len(files) * 1e6, 1)
+    return result
+
+
+def _import(tmp: Path, files: List[str]) -> dict:
+    import cli
+    from storage.library_store import LibraryStore
+    from storage.sqlite_backend import SqliteBackend
+    from utils import content_hash
+    from utils.folder_watcher import probe_all
+
+    store = LibraryStore(write_delay=None, backend=SqliteBackend(
+        tmp / "library.db", migrate_from=tmp / "none.json"))
+    read_whole = []
+    real = content_hash.full_hash
+
+    def counting(path: str) -> str:
+        read_whole.append(path)
+        return real(path)
+
+    t = time.perf_counter()
+    with store.batch():
+        store.add_many(files)
+        store.set_metadata(probe_all(files, jobs=1))
+    t_probe = time.perf_counter()
+    content_hash.full_hash = counting
+    try:
+        groups = cli.find_duplicates(store).groups()
+    finally:
+        content_hash.full_hash = real
+    return {
+        "store": store,
+        "probe_ms": round((t_probe - t) * 1000, 1),
+        "resolve_ms": round((time.perf_counter() - t_probe) * 1000, 1),
+        "files": len(files),
+        "read_whole": len(read_whole),
+        "groups": len(groups),
+        "redundant": sum(len(g) - 1 for g in groups),
+    }
+
+
+def _caches(tmp: Path, store, files: List[str], shared: bool) -> dict:  # noqa: ANN001
+    from PyQt6.QtCore import QThreadPool
+    from PyQt6.QtWidgets import QApplication
+
+    from modules.frame_cache import FrameCache
+    from utils.thumb_cache import THUMB_SIZE, ThumbnailCache
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    label = "shared" if shared else "by_path"
+    thumbs = ThumbnailCache(tmp / f"thumbs_{label}")
+    frames = FrameCache()
+    if shared:
+        thumbs.identity = frames.identity = store.content_id
+
+    t = time.perf_counter()
+    for path in files:
+        thumbs.get(path, THUMB_SIZE)
+    thumbs_ms = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    sets = [frames.acquire(path, stream=True) for path in files]
+    while any(not fs.complete for fs in sets):
+        app.processEvents()
+        QThreadPool.globalInstance().waitForDone(5)
+    frames_ms = (time.perf_counter() - t) * 1000
+    decoded = sum(fs.decoded_frames for fs in {id(fs): fs for fs in sets}.values())
+    result = {
+        "thumb_files": len(list(thumbs.cache_dir.iterdir())),
+        "thumbs_ms": round(thumbs_ms, 1),
+        "frame_sets": frames.stats()["sets"],
+        "frames_decoded": decoded,
+        "frame_mb": round(frames.total_bytes() / 1024 / 1024, 1),
+        "frames_ms": round(frames_ms, 1),
+    }
+    for fs in sets:
+        frames.release(fs)
+    return result
+
+
+def _index(entries: int) -> dict:
+    from storage.duplicates import DuplicateIndex
+    from storage.library_store import LibraryStore
+    from storage.json_backend import JsonBackend
+
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as d:
+        store = LibraryStore(write_delay=None, backend=JsonBackend(Path(d) / "none.json"))
+        with store.batch():
+            for i in range(entries):
+                entry = store.add(f"/gifs/{i % 97}/{i:06d}.gif")
+                # ~1 % de copias: mismo contenido que una entrada anterior
+                source = rng.randrange(i) if i and rng.random() < 0.01 else i
+                entry.quick_hash = entry.content_hash = f"{source:032x}"
+                entry.mtime_ns, entry.file_size = 1, 1000 + source
+        index = DuplicateIndex()
+        t = time.perf_counter()
+        index.attach(store)
+        index.sync()
+        build_ms = (time.perf_counter() - t) * 1000
+        paths = [e.path for e in store.items()]
+        with store.batch():
+            for path in rng.sample(paths, 1000):
+                store.set_speed(path, 150)          # no cambia la identidad
+        t = time.perf_counter()
+        index.sync()
+        unrelated_ms = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        redundant = index.redundant()
+        groups_ms = (time.perf_counter() - t) * 1000
+        store.close()
+    return {
+        "entries": entries, "redundant": redundant,
+        "build_ms": round(build_ms, 1), "sync_1000_unrelated_ms": round(unrelated_ms, 2),
+        "redundant_ms": round(groups_ms, 2),
+    }
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--unique", type=int, default=40)
+    ap.add_argument("--copies", type=int, default=5)
+    ap.add_argument("--singles", type=int, default=100)
+    ap.add_argument("--entries", type=int, default=100000)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        files = _files(tmp, args.unique, args.copies, args.singles)
+        result: dict = {"hash": _hashes(files)}
+        imported = _import(tmp, files)
+        store = imported.pop("store")
+        result["import"] = imported
+        result["caches_by_path"] = _caches(tmp, store, files, shared=False)
+        result["caches_shared"] = _caches(tmp, store, files, shared=True)
+        store.close()
+    result["index"] = _index(args.entries)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return result
+
+
+if __name__ == "__main__":
+    main()
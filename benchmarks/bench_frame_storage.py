@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_frame_storage.py – Memoria frente a CPU de los formatos de la caché de frames.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_frame_storage [--frames 300]
+        [--cycles 2] [--scale 100 50]
+
+• Animaciones largas: franjas que cambian el lienzo entero (`write_gif`),
+  un sprite que se mueve sobre un fondo fijo (`write_sprite_gif`) y los
+  GIF de `src/`; cada una a los porcentajes de `--scale` (escalado suave).
+• Por formato ("argb", "indexed", "delta"): MB en caché frente a ARGB,
+  tiempo hasta tener el ciclo completo (decode + conversión, en el hilo
+  de trabajo) y coste de expandir cada frame al mostrarlo, reproduciendo
+  `--cycles` ciclos seguidos, con dos reproductores sobre el mismo juego
+  de frames (cada uno en su índice) y con saltos aleatorios.
+• Comprueba que cada frame expandido es idéntico al ARGB.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.synthetic import write_gif, write_sprite_gif
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _animations(tmp: Path, frames: int) -> Dict[str, Path]:
+    animations = {
+        "stripes": write_gif(tmp / "stripes.gif", 200, 200, frames=frames, delay_ms=20),
+        "sprite": write_sprite_gif(tmp / "sprite.gif", 480, 360, frames=frames),
+    }
+    for p in sorted((ROOT / "src").iterdir()):
+        if p.suffix.lower() == ".gif":
+            animations[p.stem.replace(" ", "_")] = p
+    return animations
+
+
+def _load(app, path: Path, size, storage: str):  # noqa: ANN001, ANN202
+    from PyQt6.QtCore import QThreadPool
+
+    from modules.frame_cache import FrameCache
+
+    cache = FrameCache(storage=storage)
+    t = time.perf_counter()
+    fs = cache.acquire(str(path), size, stream=True)
+    while not fs.complete:
+        app.processEvents()
+        QThreadPool.globalInstance().waitForDone(5)
+    return cache, fs, (time.perf_counter() - t) * 1000
+
+
+def _measure(app, path: Path, size, storage: str, cycles: int, reference) -> dict:  # noqa: ANN001
+    from modules.frame_storage import FrameExpander
+
+    cache, fs, load_ms = _load(app, path, size, storage)
+    count = len(fs.frames)
+    expander = FrameExpander()      # uno por consumidor, como cada FramePlayer
+    t0, cpu0 = time.perf_counter(), time.process_time()
+    for i in range(count * cycles):
+        fs.frame(i % count, expander)
+    play_us = (time.perf_counter() - t0) / (count * cycles) * 1e6
+    play_cpu_us = (time.process_time() - cpu0) / (count * cycles) * 1e6
+    # Dos overlays sobre el mismo FrameSet, a medio ciclo de distancia
+    players = (FrameExpander(), FrameExpander())
+    t0 = time.perf_counter()
+    for i in range(count * cycles):
+        fs.frame(i % count, players[0])
+        fs.frame((i + count // 2) % count, players[1])
+    shared_us = (time.perf_counter() - t0) / (2 * count * cycles) * 1e6
+    jumps = random.Random(7).choices(range(count), k=min(200, 4 * count))
+    t0 = time.perf_counter()
+    for i in jumps:
+        fs.frame(i, expander)
+    seek_us = (time.perf_counter() - t0) / len(jumps) * 1e6
+    expander = FrameExpander()
+    exact = reference is None or all(fs.frame(i, expander)[0] == img
+                                     for i, img in enumerate(reference))
+    stats = cache.stats()
+    result = {
+        "frames": count,
+        "mb": round(stats["bytes"] / 2**20, 2),
+        "argb_mb": round(stats["argb_bytes"] / 2**20, 2),
+        "saved_pct": round(100 * stats["saved_bytes"] / max(stats["argb_bytes"], 1), 1),
+        "load_ms": round(load_ms, 1),
+        "play_us_per_frame": round(play_us, 1),
+        "play_cpu_us_per_frame": round(play_cpu_us, 1),
+        "shared_us_per_frame": round(shared_us, 1),
+        "seek_us_per_frame": round(seek_us, 1),
+        "exact": exact,
+    }
+    cache.release(fs)
+    return result
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=300, help="frames de las animaciones sintéticas")
+    ap.add_argument("--cycles", type=int, default=2)
+    ap.add_argument("--scale", type=int, nargs="+", default=[100, 50])
+    args = ap.parse_args(argv)
+
+    from PyQt6.QtCore import QSize
+    from PyQt6.QtWidgets import QApplication
+
+    from modules.frame_storage import FRAME_STORAGES, resolve_storage
+    from utils.gif_utils import gif_header_size
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    result: dict = {}
+    with tempfile.TemporaryDirectory() as d:
+        for name, path in _animations(Path(d), args.frames).items():
+            w, h = gif_header_size(path)
+            for scale in args.scale:
+                size = QSize(w * scale // 100, h * scale // 100) if scale != 100 else None
+                _, base, _ = _load(app, path, size, "argb")
+                reference = [base.frame(i)[0] for i in range(len(base.frames))]
+                row = {}
+                for storage in FRAME_STORAGES:
+                    if resolve_storage(storage) != storage:
+                        row[storage] = "no disponible (NumPy)"
+                        continue
+                    row[storage] = _measure(app, path, size, storage, args.cycles, reference)
+                result[f"{name}@{scale}%"] = row
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_governor.py – Frames/s y CPU con y sin presupuesto global.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_governor
+        [--overlays 20] [--seconds 3] [--max-fps 120] [--max-cpu-ms 100]
+
+• Caso extremo: GIF sintético de retardo mínimo a velocidad 400 %.
+• `unlimited`: presupuesto desactivado (referencia).
+• `skip` / `clamp`: con presupuesto, saltando frames o alargando retardos.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from benchmarks.synthetic import write_gif  # noqa: E402
+from modules.animation_clock import AnimationClock  # noqa: E402
+from modules.frame_governor import FrameGovernor  # noqa: E402
+from modules.overlay import GifOverlay  # noqa: E402
+
+
+def spin(ms: int) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def bench_case(
+    path: Path, count: int, seconds: float, mode: str, max_fps: float, max_cpu_ms: float
+) -> dict:
+    clock = AnimationClock()
+    if mode == "unlimited":
+        governor = FrameGovernor(max_fps=0, max_cpu_ms=0)
+    else:
+        governor = FrameGovernor(max_fps=max_fps, max_cpu_ms=max_cpu_ms, mode=mode)
+
+    overlays: List[GifOverlay] = []
+    for i in range(count):
+        ov = GifOverlay(str(path), speed=400, clock=clock)
+        # El overlay nace con el gobernador compartido: se mueve al de la prueba
+        player = ov._player
+        player.governor().unregister(player)
+        player._governor = governor
+        governor.register(player)
+        ov.move(20 + i * 8, 20 + i * 8)
+        overlays.append(ov)
+    overlays[-1]._player.touch()
+    spin(1000)   # primer ciclo decodificado y coste medido
+
+    clock.reset_stats()
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    spin(int(seconds * 1000))
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+
+    stats = governor.stats()
+    decision = governor.last_decision() or {"clients": []}
+    priority = [c for c in decision["clients"] if c["priority"]]
+    for ov in overlays:
+        ov.close()
+    spin(50)
+
+    return {
+        "mode": mode,
+        "overlays": count,
+        "frames_per_s": round(clock.ticks / wall, 1),
+        "cpu_percent": round(100 * cpu / wall, 1),
+        "demand_fps": stats["demand_fps"],
+        "granted_fps": stats["granted_fps"],
+        "priority_fps": priority[0]["allowed_fps"] if priority else None,
+        "decisions": len(governor.decisions()),
+    }
+
+
+def main(argv: List[str] | None = None) -> list:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--overlays", type=int, default=20)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--max-fps", type=float, default=120.0)
+    ap.add_argument("--max-cpu-ms", type=float, default=100.0)
+    args = ap.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    results = []
+    with tempfile.TemporaryDirectory() as d:
+        path = write_gif(Path(d) / "fast.gif", 160, 120, 24, delay_ms=10)
+        for mode in ("unlimited", "skip", "clamp"):
+            results.append(bench_case(path, args.overlays, args.seconds, mode,
+                                      args.max_fps, args.max_cpu_ms))
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
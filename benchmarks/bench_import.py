@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_import.py – Importación masiva en LibraryPage (headless).
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_import [--sizes 500 2000 5000]
+
+• Simula `_add_gifs` con N rutas (sin diálogo) y mide el tiempo total.
+• Cuenta las llamadas a `Path.resolve()`: deben ser exactamente N
+  (una por archivo nuevo); falla si el crecimiento deja de ser lineal.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QFileDialog  # noqa: E402
+
+from storage.library_store import LibraryStore  # noqa: E402
+from storage.path_index import clear_path_cache  # noqa: E402
+from storage.sqlite_backend import SqliteBackend  # noqa: E402
+from utils.thumb_cache import ThumbnailCache  # noqa: E402
+
+
+def bench_import(size: int, tmp: Path) -> dict:
+    from ui.library_page import LibraryPage
+
+    files = []
+    for i in range(size):
+        f = tmp / f"{i:06d}.gif"
+        f.touch()
+        files.append(str(f))
+
+    clear_path_cache()
+    store = LibraryStore(
+        write_delay=None,
+        backend=SqliteBackend(tmp / "library.db", migrate_from=tmp / "none.json"),
+    )
+    with mock.patch("ui.library_page.ThumbnailCache",
+                    lambda: ThumbnailCache(tmp / "thumbs")):
+        page = LibraryPage(store)
+
+    real_resolve = Path.resolve
+    calls = 0
+
+    def counting_resolve(self: Path, strict: bool = False) -> Path:
+        nonlocal calls
+        calls += 1
+        return real_resolve(self, strict)
+
+    with mock.patch.object(Path, "resolve", counting_resolve), \
+         mock.patch.object(QFileDialog, "getOpenFileNames", return_value=(files, "")):
+        t0 = time.perf_counter()
+        page._add_gifs()
+        page._add_gifs()            # segunda vez: todo duplicado, sin resolver de nuevo
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    page._loader.cancel_all()
+    page._loader.wait_for_done()
+    store.close()
+
+    assert page.model.rowCount() == size, page.model.rowCount()
+    assert calls <= size, f"{calls} llamadas a resolve() para {size} archivos"
+    return {"files": size, "import_ms": round(elapsed_ms, 2), "resolve_calls": calls}
+
+
+def main(argv: List[str] | None = None) -> list:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 5000])
+    args = ap.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    results = []
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as d:
+            results.append(bench_import(size, Path(d)))
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_instance.py – Coste de reenviar una orden a la instancia en marcha.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_instance [--runs 10]
+
+• Levanta un InstanceServer en este proceso (nombre de socket propio).
+• Lanza `--runs` procesos cliente que ejecutan el mismo camino que
+  `main.py` cuando ya hay una instancia: importar, conectar, enviar, salir.
+• Mide el tiempo de ida y vuelta de la orden dentro del cliente y el
+  tiempo total de cada proceso (incluye arrancar Python).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from utils.single_instance import InstanceServer  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CLIENT = """
+import sys, time
+t0 = time.perf_counter()
+from utils.single_instance import parse_commands, send_commands
+commands, _ = parse_commands(["main.py", "--play", "x.gif"])
+t1 = time.perf_counter()
+ok = send_commands(commands, sys.argv[1])
+t2 = time.perf_counter()
+print((t1 - t0) * 1000, (t2 - t1) * 1000, ok)
+"""
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    server = InstanceServer(name=f"DesktopGIF-bench-{os.getpid()}")
+    assert server.listen()
+    received: List[str] = []
+    server.commandReceived.connect(lambda cmd, _args: received.append(cmd))
+
+    imports, roundtrips, walls = [], [], []
+    for _ in range(args.runs):
+        out: dict = {}
+
+        def run() -> None:
+            t0 = time.perf_counter()
+            proc = subprocess.run([sys.executable, "-c", CLIENT, server.name], cwd=ROOT,
+                                  capture_output=True, text=True, timeout=30)
+            out["wall"] = (time.perf_counter() - t0) * 1000
+            out["stdout"] = proc.stdout
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        while worker.is_alive():        # el servidor necesita el bucle de eventos
+            loop = QEventLoop()
+            QTimer.singleShot(5, loop.quit)
+            loop.exec()
+        imp, rt, ok = out["stdout"].split()
+        assert ok == "True", out
+        imports.append(float(imp))
+        roundtrips.append(float(rt))
+        walls.append(out["wall"])
+    server.close()
+
+    result = {
+        "runs": args.runs,
+        "received": len(received),
+        "client_import_ms": round(statistics.median(imports), 2),
+        "roundtrip_ms": round(statistics.median(roundtrips), 2),
+        "process_wall_ms": round(statistics.median(walls), 2),
+    }
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
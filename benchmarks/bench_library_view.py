@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_library_view.py – Librería virtualizada con muchas entradas.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_library_view [--entries 50000]
+        [--steps 400] [--passes 3]
+
+• Crea `--entries` GIF (enlaces duros a unos pocos sintéticos, rutas
+  distintas: cada uno tiene su propia miniatura) en una librería temporal.
+• Mide la población del modelo y el tiempo hasta las miniaturas visibles.
+• Recorre la lista `--passes` veces (abajo, arriba, abajo…), `--steps`
+  saltos por pasada, uno cada 16 ms: duración de cada paso con repintado, mayor
+  bloqueo del bucle de eventos, miniaturas retenidas por el modelo y RSS
+  al final de cada pasada. Lo retenido queda acotado por la ventana del
+  modelo y el límite de la caché de miniaturas en memoria, no por lo
+  recorrido.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from benchmarks.synthetic import write_gif
+from utils.process_stats import rss_bytes
+
+
+def _files(root: Path, entries: int) -> List[str]:
+    root.mkdir(parents=True, exist_ok=True)
+    seeds = []
+    for i, (w, h) in enumerate([(64, 48), (160, 120), (320, 240)]):
+        seed = root / f"seed{i}.gif"
+        write_gif(seed, w, h, frames=4, distinct=1 + i)
+        seeds.append(seed)
+    files = []
+    for i in range(entries):
+        folder = root / f"d{i % 50:02d}"
+        folder.mkdir(exist_ok=True)
+        dst = folder / f"{i:06d}.gif"
+        try:
+            os.link(seeds[i % len(seeds)], dst)
+        except OSError:
+            shutil.copyfile(seeds[i % len(seeds)], dst)
+        files.append(str(dst))
+    return files
+
+
+def _mb(n: int) -> float:
+    return round(n / 1024 / 1024, 1)
+
+
+def run(tmp: Path, entries: int, steps: int, passes: int) -> dict:
+    from PyQt6.QtCore import QElapsedTimer, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    from storage.library_store import LibraryStore
+    from storage.sqlite_backend import SqliteBackend
+    from utils import folder_watcher, thumb_cache
+
+    folder_watcher.WATCH_FILE = tmp / "watched.json"
+    thumb_cache.CACHE_DIR = tmp / "thumbs"
+    from ui.library_page import LibraryPage
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    files = _files(tmp / "gifs", entries)
+    # Mismo write-behind que la app: los metadatos revalidados tras la
+    # carga se vuelcan en el hilo del temporizador, no en el GUI
+    store = LibraryStore(write_delay=0.75, backend=SqliteBackend(
+        tmp / "library.db", migrate_from=tmp / "none.json"))
+    store.add_many(files)
+    store.flush()
+
+    result: dict = {"entries": entries, "rss_start_mb": _mb(rss_bytes())}
+    page = LibraryPage(store)
+    generated = {"n": 0}
+    page._loader.thumbnailReady.connect(lambda *_: generated.__setitem__("n", generated["n"] + 1))
+    page.resize(1000, 700)
+    page.show()
+    app.processEvents()
+
+    marks: dict = {}
+    page.populated.connect(lambda: marks.setdefault("populated", time.perf_counter()))
+    page.thumbnailsDone.connect(lambda: marks.setdefault("thumbs", time.perf_counter()))
+    t0 = time.perf_counter()
+    page.populate()
+    while "thumbs" not in marks and time.perf_counter() - t0 < 120:
+        app.processEvents()
+        time.sleep(0.001)
+    result["populate_ms"] = round((marks["populated"] - t0) * 1000, 1)
+    result["visible_thumbnails_ms"] = round((marks["thumbs"] - t0) * 1000, 1)
+    result["rows"] = page.model.rowCount()
+    result["rss_populated_mb"] = _mb(rss_bytes())
+
+    # ---------- recorrido completo ----------
+    view = page.list_view
+    bar = view.verticalScrollBar()
+    stride = max(bar.maximum() // steps, 1)
+    step_ms: List[float] = []
+    rss: List[int] = []
+    held = {"max": 0}
+    stall = {"max": 0.0}
+    clock = QElapsedTimer()
+    tick = QTimer()
+    tick.setInterval(5)
+
+    def on_tick() -> None:
+        stall["max"] = max(stall["max"], clock.restart())
+        held["max"] = max(held["max"], page.model.thumbnail_count())
+
+    tick.timeout.connect(on_tick)
+
+    def step(sign: int) -> None:
+        t = time.perf_counter()
+        bar.setValue(bar.value() + sign * stride)
+        view.viewport().repaint()
+        step_ms.append((time.perf_counter() - t) * 1000)
+
+    def run_pass(sign: int, until) -> None:  # noqa: ANN001
+        scroll = QTimer()
+        scroll.setInterval(16)
+        scroll.timeout.connect(lambda: step(sign))
+        scroll.start()
+        t0 = time.perf_counter()
+        while not until() and time.perf_counter() - t0 < 600:
+            app.processEvents()
+            time.sleep(0.001)
+        scroll.stop()
+        # Que terminen las miniaturas donde se detuvo
+        while page._loader.pending_count() and time.perf_counter() - t0 < 600:
+            app.processEvents()
+            time.sleep(0.001)
+        rss.append(rss_bytes())
+
+    clock.start()
+    tick.start()
+    for i in range(passes):
+        if i % 2:
+            run_pass(-1, lambda: bar.value() <= 0)
+        else:
+            run_pass(1, lambda: bar.value() >= bar.maximum())
+    tick.stop()
+
+    step_ms.sort()
+    result["scroll_steps"] = len(step_ms)
+    result["scroll_step_median_ms"] = round(statistics.median(step_ms), 2)
+    result["scroll_step_p95_ms"] = round(step_ms[int(len(step_ms) * 0.95)], 2)
+    result["scroll_step_max_ms"] = round(step_ms[-1], 2)
+    result["scroll_max_stall_ms"] = stall["max"]
+    result["thumbnails_held_max"] = held["max"]
+    result["thumbnails_delivered"] = generated["n"]
+    result["thumb_cache_mb"] = _mb(page._thumbs._memory_bytes)
+    result["thumb_cache_limit_mb"] = _mb(page._thumbs.max_memory_bytes)
+    result["rss_passes_mb"] = [_mb(n) for n in rss]
+
+    page._watcher.stop()
+    page._loader.cancel_all()
+    page._loader.wait_for_done()
+    store.close()
+    return result
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--entries", type=int, default=50000)
+    ap.add_argument("--steps", type=int, default=400)
+    ap.add_argument("--passes", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as d:
+        result = run(Path(d), args.entries, args.steps, args.passes)
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_opacity.py – Coste de pintado por frame según modo de opacidad.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_opacity [--frames 300]
+
+• Compara QGraphicsOpacityEffect ("effect") con el pintado directo
+  ("painter"), a opacidad 1.0 y 0.6.
+• "window" lo resuelve el compositor; en la plataforma offscreen no existe
+  y cae automáticamente a "painter" (se informa como `effective_mode`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import Qt  # noqa: E402
+from PyQt6.QtGui import QImage  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from modules.overlay import GifOverlay  # noqa: E402
+
+SAMPLE = str(Path(__file__).resolve().parent.parent / "src" / "giphy (1).gif")
+
+
+def bench_mode(mode: str, opacity: float, frames: int) -> dict:
+    ov = GifOverlay(SAMPLE, opacity=opacity, opacity_mode=mode)
+    ov.show()
+    ov._player.stop()                     # solo pintado: sin reloj de por medio
+    fs = ov._frames
+    while not fs.complete:                # ciclo completo (se carga en segundo plano)
+        QApplication.processEvents()
+        time.sleep(0.005)
+
+    # Se pinta la ventana completa sobre un destino ARGB transparente, igual
+    # que el backing store de una ventana translúcida (incluye el efecto)
+    view = ov._label
+    target = QImage(ov.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    times: List[float] = []
+    for i in range(frames):
+        found = fs.frame(i)
+        assert found is not None
+        view.set_image(found[0])
+        target.fill(Qt.GlobalColor.transparent)
+        t0 = time.perf_counter()
+        ov.render(target)
+        times.append((time.perf_counter() - t0) * 1000)
+
+    result = {
+        "mode": mode,
+        "effective_mode": ov.opacity_mode,
+        "opacity": opacity,
+        "paint_ms_median": round(statistics.median(times), 3),
+        "paint_ms_p95": round(sorted(times)[int(len(times) * 0.95) - 1], 3),
+    }
+    ov.close()
+    return result
+
+
+def main(argv: List[str] | None = None) -> list:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--frames", type=int, default=300)
+    args = ap.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    results = [
+        bench_mode(mode, opacity, args.frames)
+        for opacity in (1.0, 0.6)
+        for mode in ("effect", "painter", "window")
+    ]
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_power.py – Despertares evitados por la política de ahorro.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_power [--overlays 10] [--seconds 3]
+
+• `visible`: todos los overlays a la vista (referencia).
+• `hidden`: todos ocultos → deben quedar en pausa con 0 despertares.
+• `offscreen`: movidos fuera de las pantallas.
+• `idle`: sesión inactiva (se simula la inactividad).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from modules import power_policy  # noqa: E402
+from modules.animation_clock import AnimationClock  # noqa: E402
+from modules.overlay import GifOverlay  # noqa: E402
+
+SAMPLES = [
+    str(p) for p in sorted((Path(__file__).resolve().parent.parent / "src").glob("*.gif"))
+]
+
+
+def spin(ms: int) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def _hide(ov: GifOverlay) -> None:
+    ov.hide()
+
+
+def _offscreen(ov: GifOverlay) -> None:
+    ov.move(-10_000, -10_000)
+
+
+def _idle(ov: GifOverlay) -> None:
+    ov.power.configure(ov.power.pause_when_hidden, 1)
+
+
+SCENARIOS: Dict[str, Callable[[GifOverlay], None] | None] = {
+    "visible": None,
+    "hidden": _hide,
+    "offscreen": _offscreen,
+    "idle": _idle,
+}
+
+
+def bench_scenario(name: str, count: int, seconds: float) -> dict:
+    clock = AnimationClock()
+    overlays: List[GifOverlay] = []
+    for i in range(count):
+        ov = GifOverlay(SAMPLES[i % len(SAMPLES)], scale_percent=50, clock=clock)
+        ov.move(40 + i * 10, 40 + i * 10)
+        overlays.append(ov)
+    spin(500)   # primer ciclo: decodificación y caché caliente
+
+    real_idle = power_policy.idle_seconds
+    if name == "idle":
+        power_policy.idle_seconds = lambda: 3600.0
+    action = SCENARIOS[name]
+    if action is not None:
+        for ov in overlays:
+            action(ov)
+    spin(1500 if name == "idle" else 50)     # la inactividad se comprueba con retardo
+
+    clock.reset_stats()
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    spin(int(seconds * 1000))
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+
+    paused = sum(1 for ov in overlays if ov.power.is_paused())
+    saved = sum(ov.power.saved_wakeups() for ov in overlays)
+    power_policy.idle_seconds = real_idle
+    for ov in overlays:
+        ov.close()
+    spin(50)
+
+    return {
+        "scenario": name,
+        "overlays": count,
+        "paused": paused,
+        "wakeups_per_s": round(clock.wakeups / wall, 1),
+        "saved_wakeups": round(saved, 1),
+        "cpu_percent": round(100 * cpu / wall, 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> list:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--overlays", type=int, default=10)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    args = ap.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    results = [bench_scenario(name, args.overlays, args.seconds) for name in SCENARIOS]
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
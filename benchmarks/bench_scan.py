@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_scan.py – Importación de una carpeta vigilada grande.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_scan [--files 20000] [--jobs 1 0]
+
+• Genera un árbol de `--files` GIF (copias de unos pocos sintéticos).
+• Mide el recorrido (`walk_gifs`) y la validación (`probe_all`) con cada
+  `--jobs` (0 = todos los núcleos).
+• Después vigila la carpeta desde una LibraryPage real sobre una librería
+  temporal: tiempo hasta tener todo en el store y en la vista, y el mayor
+  bloqueo del bucle de eventos mientras tanto (temporizador de 5 ms).
+• Por último toca, añade y borra unos archivos y mide cuánto tarda el
+  reescaneo en reflejarlo.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from benchmarks.synthetic import write_gif
+from utils.folder_watcher import probe_all, walk_gifs
+
+
+def _tree(root: Path, files: int) -> None:
+    root.mkdir(parents=True, exist_ok=True)
+    seeds = []
+    for i, (w, h) in enumerate([(64, 48), (160, 120), (320, 240)]):
+        seed = root / f"seed{i}.gif"
+        write_gif(seed, w, h, frames=4, distinct=1 + i)
+        seeds.append(seed)
+    for i in range(files):
+        folder = root / f"d{i % 40:02d}" / f"e{i % 7}"
+        folder.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(seeds[i % len(seeds)], folder / f"{i:05d}.gif")
+    for seed in seeds:
+        seed.unlink()
+
+
+def _ui(tmp: Path, gifs: Path, files: int) -> dict:
+    from PyQt6.QtCore import QElapsedTimer, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    from storage.library_store import LibraryStore
+    from storage.sqlite_backend import SqliteBackend
+    from utils import folder_watcher, thumb_cache
+
+    folder_watcher.WATCH_FILE = tmp / "watched.json"
+    thumb_cache.CACHE_DIR = tmp / "thumbs"
+    from ui.library_page import LibraryPage
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    # Mismo write-behind que la app (`MainWindow`): el volcado va en otro hilo
+    store = LibraryStore(write_delay=0.75, backend=SqliteBackend(
+        tmp / "library.db", migrate_from=tmp / "none.json"))
+    page = LibraryPage(store)
+    page._loader.request = lambda path: None    # solo importación, sin miniaturas
+    page.populate()
+    app.processEvents()
+
+    result: dict = {}
+    stall = {"max": 0.0}
+    clock = QElapsedTimer()
+    tick = QTimer()
+    tick.setInterval(5)
+
+    def on_tick() -> None:
+        stall["max"] = max(stall["max"], clock.restart())
+
+    tick.timeout.connect(on_tick)
+
+    def run_until(done, timeout_s: float = 600) -> float:  # noqa: ANN001
+        stall["max"] = 0.0
+        t0 = time.perf_counter()
+        clock.start()
+        tick.start()
+        while not done() and time.perf_counter() - t0 < timeout_s:
+            app.processEvents()
+            time.sleep(0.001)
+        tick.stop()
+        return round((time.perf_counter() - t0) * 1000, 1)
+
+    page._watcher.add_root(str(gifs))
+    result["watch_import_ms"] = run_until(
+        lambda: page.model.rowCount() >= files and not page._watcher.is_scanning()
+    )
+    result["watch_ui_max_stall_ms"] = stall["max"]
+    result["store_entries"] = len(store.items())
+
+    # Cambios incrementales: 10 nuevos, 10 modificados, 10 borrados
+    existing = sorted(gifs.rglob("*.gif"))
+    for i, path in enumerate(existing[:10]):
+        shutil.copyfile(path, gifs / f"new{i}.gif")
+    for path in existing[10:20]:
+        with open(path, "ab") as f:
+            f.write(b"\0")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+    for path in existing[20:30]:
+        path.unlink()
+    page._watcher.rescan()          # lo que haría el sondeo o una notificación
+    result["rescan_ms"] = run_until(
+        lambda: not page._watcher.is_scanning() and page.model.rowCount() == files
+    )
+    result["after_rescan_entries"] = len(store.items())
+    page._watcher.stop()
+    store.close()
+    return result
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--files", type=int, default=20000)
+    ap.add_argument("--jobs", type=int, nargs="+", default=[1, 0])
+    args = ap.parse_args(argv)
+
+    result: dict = {"files": args.files, "cpus": os.cpu_count()}
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        gifs = tmp / "gifs"
+        _tree(gifs, args.files)
+
+        t0 = time.perf_counter()
+        files, dirs = walk_gifs(str(gifs))
+        result["walk_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        result["dirs"] = len(dirs)
+        for jobs in args.jobs:
+            t0 = time.perf_counter()
+            metas = probe_all(list(files), jobs or None)
+            result[f"probe_j{jobs or os.cpu_count()}_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            assert all(m.valid for m in metas)
+        result.update(_ui(tmp, gifs, args.files))
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
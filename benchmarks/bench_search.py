@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_search.py – Búsqueda en una librería grande.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_search [--entries 100000]
+        [--repeat 20] [--no-view]
+
+• Crea `--entries` entradas sintéticas (nombres, carpetas, etiquetas y
+  metadatos variados, sin archivos) en una librería SQLite temporal.
+• Mide la indexación completa y lo que ocupa (RSS), y la latencia de cada
+  consulta de `QUERIES` (mediana y máximo de `--repeat`).
+• Cambios incrementales a través del store: etiquetas nuevas, entradas
+  nuevas y un cambio que no afecta a la búsqueda (velocidad); tiempo del
+  `sync()` siguiente.
+• Salvo con `--no-view`, filtra una LibraryPage real con cada resultado:
+  tiempo hasta tener las filas en la vista y el mayor bloqueo del bucle de
+  eventos mientras se dispone.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from utils.process_stats import rss_bytes
+
+WORDS = (
+    "gato perro baile risa fuego lluvia neon retro pixel anime ola hola fiesta "
+    "loop meme reaccion saludo aplauso cafe noche playa nieve robot dragon"
+).split()
+QUERIES = (
+    "gato", "ga", "g", "reaccion", "perro_baile", "#favorito", "#fa",
+    "ancho>300", "640x480", "dur<2", "dur>500ms mb>5", "gato 2024 #fav",
+    "noche ancho>=320 frames>10", "zzz", "012345",
+)
+
+
+def _mb(n: int) -> float:
+    return round(n / 1024 / 1024, 1)
+
+
+def _entries(rng: random.Random, first: int, count: int) -> List[dict]:
+    rows = []
+    for i in range(first, first + count):
+        folder = f"/gifs/{rng.choice(WORDS)}/{rng.choice(('2023', '2024', 'varios'))}"
+        name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}-{i:06d}.gif"
+        rows.append({
+            "path": f"{folder}/{name}",
+            "tags": ["favorito"] if i % 50 == 0 else [rng.choice(WORDS)] if i % 7 == 0 else [],
+            "width": rng.choice((64, 160, 320, 480, 640)),
+            "height": rng.choice((48, 120, 240, 360, 480)),
+            "frames": rng.randint(1, 200),
+            "duration_ms": rng.randint(100, 20000),
+            "file_size": rng.randint(10_000, 20_000_000),
+            "mtime_ns": 1,
+        })
+    return rows
+
+
+def _fill(store, rows: List[dict]) -> None:  # noqa: ANN001
+    with store.batch():
+        for row in rows:
+            entry = store.add(row["path"])
+            for name, value in row.items():
+                setattr(entry, name, value)
+
+
+def _timed(fn, repeat: int) -> Dict[str, float]:  # noqa: ANN001
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+    return {"median_ms": round(statistics.median(times), 2), "max_ms": round(max(times), 2)}
+
+
+def run(tmp: Path, entries: int, repeat: int, view: bool) -> dict:
+    from storage.library_store import LibraryStore
+    from storage.search_index import SearchIndex
+    from storage.sqlite_backend import SqliteBackend
+
+    rng = random.Random(7)
+    store = LibraryStore(write_delay=None, backend=SqliteBackend(
+        tmp / "library.db", migrate_from=tmp / "none.json"))
+    _fill(store, _entries(rng, 0, entries))
+    result: dict = {"entries": entries}
+
+    # ---------- índice completo ----------
+    rss0 = rss_bytes()
+    index = SearchIndex()
+    t = time.perf_counter()
+    index.attach(store)
+    index.sync()
+    index.query("ancho>0 alto>0 frames>0 dur>0 mb>0 a")     # columnas y palabras ordenadas
+    result["index_build_ms"] = round((time.perf_counter() - t) * 1000, 1)
+    result["index_rss_mb"] = _mb(rss_bytes() - rss0)
+
+    # ---------- consultas ----------
+    queries = {}
+    for text in QUERIES:
+        timing = _timed(lambda: index.query(text), repeat)
+        queries[text] = {"hits": len(index.query(text) or ()), **timing}
+    result["queries"] = queries
+
+    # ---------- cambios incrementales ----------
+    paths = [e.path for e in store.items()]
+    tagged = rng.sample(paths, 100)
+    with store.batch():
+        for path in tagged:
+            store.set_tags(path, ["nuevo"])
+    result["sync_100_tags_ms"] = _timed(index.sync, 1)["max_ms"]
+    assert index.query("#nuevo") == set(tagged)
+    _fill(store, _entries(rng, entries, 1000))
+    result["sync_1000_added_ms"] = _timed(index.sync, 1)["max_ms"]
+    with store.batch():
+        for path in rng.sample(paths, 1000):
+            store.set_speed(path, 150)
+    result["sync_1000_unrelated_ms"] = _timed(index.sync, 1)["max_ms"]
+    index.detach()
+
+    if view:
+        result["view"] = _view(tmp, store)
+    store.close()
+    return result
+
+
+def _view(tmp: Path, store) -> List[dict]:  # noqa: ANN001
+    from PyQt6.QtCore import QElapsedTimer, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    from utils import folder_watcher, thumb_cache
+
+    folder_watcher.WATCH_FILE = tmp / "watched.json"
+    thumb_cache.CACHE_DIR = tmp / "thumbs"
+    from ui.library_page import LibraryPage
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    page = LibraryPage(store)
+    page._watcher.refresh_metadata = lambda *a, **k: None    # sin archivos que revalidar
+    page.resize(1000, 700)
+    page.show()
+    page.populate()
+    while not page.is_populated() or page._search.pending():
+        app.processEvents()
+    view = page.list_view
+    clock = QElapsedTimer()
+    tick = QTimer()
+    tick.setInterval(5)
+    stall = {"max": 0}
+    tick.timeout.connect(lambda: stall.__setitem__("max", max(stall["max"], clock.restart())))
+
+    result = []
+    # De pocos resultados a todo y vuelta: lo caro es volver a mostrarlo todo
+    for text in ("gato 2024 #fav", "gato", "ancho>300", "", "zzz", ""):
+        stall["max"] = 0
+        clock.start()
+        tick.start()
+        t = time.perf_counter()
+        page._search_box.setText(text)
+        page._apply_search()
+        # Filas dispuestas: la barra llega a su rango final
+        while view.verticalScrollBar().maximum() < _expected_height(page):
+            app.processEvents()
+        app.processEvents()
+        elapsed = round((time.perf_counter() - t) * 1000, 1)
+        tick.stop()
+        result.append({
+            "query": text, "rows": page.model.rowCount(), "ms": elapsed,
+            "max_stall_ms": stall["max"],
+        })
+    page._watcher.stop()
+    page._loader.cancel_all()
+    page._loader.wait_for_done()
+    return result
+
+
+def _expected_height(page) -> int:  # noqa: ANN001
+    view = page.list_view
+    grid = view.gridSize()
+    cols = max(view.viewport().width() // grid.width(), 1)
+    lines = -(-page.model.rowCount() // cols)
+    return max(lines * grid.height() - view.viewport().height(), 0)
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--entries", type=int, default=100000)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--no-view", dest="view", action="store_false")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as d:
+        result = run(Path(d), args.entries, args.repeat, args.view)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return result
+
+
+if __name__ == "__main__":
+    main()
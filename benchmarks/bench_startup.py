@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_startup.py – Arranque en frío de la aplicación completa.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_startup [--entries 200] [--repeats 3]
+
+• Cada medición es un proceso nuevo (importaciones en frío) que ejecuta
+  `main.main()` con una librería temporal de `--entries` GIFs y sin
+  miniaturas en caché; sale al completar todas las miniaturas.
+• Devuelve la mediana de time-to-window, time-to-interactive y de cada
+  fase registrada en `utils.startup_timing`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLES = sorted((ROOT / "src").glob("*.gif"))
+
+
+def _child(tmp: Path) -> None:
+    """Proceso medido: arranca la app real contra la librería de `tmp`."""
+    from utils.startup_timing import INTERACTIVE_PHASE, WINDOW_PHASE, startup_timer
+
+    timer = startup_timer()
+
+    def on_phase(phase: str, _ms: float) -> None:
+        if phase == WINDOW_PHASE:
+            # Justo antes de crear el store: se redirige a la librería temporal
+            from storage import sqlite_backend
+            from utils import thumb_cache
+
+            sqlite_backend.DB_FILE = tmp / "library.db"
+            sqlite_backend.CONFIG_FILE = tmp / "none.json"
+            thumb_cache.CACHE_DIR = tmp / "thumbs"
+        elif timer.elapsed(INTERACTIVE_PHASE) and timer.elapsed("thumbnails"):
+            from PyQt6.QtWidgets import QApplication
+
+            print(json.dumps(timer.report()))
+            QApplication.quit()
+
+    timer.add_listener(on_phase)
+    sys.argv = [str(ROOT / "main.py")]
+    import main
+
+    try:
+        main.main()
+    except SystemExit:
+        pass
+
+
+def _prepare(tmp: Path, entries: int) -> None:
+    from storage.library_store import LibraryStore
+    from storage.sqlite_backend import SqliteBackend
+
+    lib = tmp / "gifs"
+    lib.mkdir()
+    store = LibraryStore(write_delay=None, backend=SqliteBackend(
+        tmp / "library.db", migrate_from=tmp / "none.json"))
+    with store.batch():
+        for i in range(entries):
+            src = SAMPLES[i % len(SAMPLES)]
+            dst = lib / f"{i:05d}.gif"
+            shutil.copyfile(src, dst)
+            store.add(str(dst))
+    store.close()
+
+
+def measure(entries: int = 200, repeats: int = 3) -> Dict[str, float]:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    runs: List[dict] = []
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        _prepare(tmp, entries)
+        for _ in range(repeats):
+            shutil.rmtree(tmp / "thumbs", ignore_errors=True)
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--child", str(tmp)],
+                cwd=ROOT, env=env, capture_output=True, text=True, timeout=300,
+            )
+            lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+            if not lines:
+                raise RuntimeError(f"el arranque no terminó:\n{out.stderr[-2000:]}")
+            runs.append(json.loads(lines[-1]))
+
+    result = {
+        "time_to_window_ms": statistics.median(r["time_to_window_ms"] for r in runs),
+        "time_to_interactive_ms": statistics.median(r["time_to_interactive_ms"] for r in runs),
+    }
+    for phase in ("imports", "qapplication", "window", "library_page", "thumbnails"):
+        values = [p["at_ms"] for r in runs for p in r["phases"] if p["phase"] == phase]
+        if values:
+            result[f"{phase}_ms"] = statistics.median(values)
+    return {k: round(v, 2) for k, v in result.items()}
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--entries", type=int, default=200)
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        _child(Path(args.child))
+        return {}
+    result = measure(args.entries, args.repeats)
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
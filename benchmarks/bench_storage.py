@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/bench_storage.py – Compara los backends de LibraryStore.
+
+Uso:
+    python -m benchmarks.bench_storage [--sizes 10000 100000] [--updates 50]
+
+Mide, por backend y tamaño:
+• carga masiva dentro de `batch()` (una sola escritura),
+• `load()` en frío,
+• latencia de `set_speed()` + `flush()` (un cambio de un campo).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from storage.backend import StorageBackend
+from storage.json_backend import JsonBackend
+from storage.library_store import LibraryStore
+from storage.sqlite_backend import SqliteBackend
+
+
+def _backends(tmp: Path) -> Dict[str, Callable[[], StorageBackend]]:
+    return {
+        "json": lambda: JsonBackend(tmp / "library.json"),
+        "sqlite": lambda: SqliteBackend(tmp / "library.db", migrate_from=tmp / "none.json"),
+    }
+
+
+def bench_backend(factory: Callable[[], StorageBackend], size: int, updates: int) -> dict:
+    store = LibraryStore(write_delay=None, backend=factory())
+
+    t0 = time.perf_counter()
+    with store.batch():
+        for i in range(size):
+            store.add(f"/bench/gifs/{i:06d}.gif")
+    bulk_ms = (time.perf_counter() - t0) * 1000
+    store.close()
+
+    t0 = time.perf_counter()
+    store = LibraryStore(write_delay=None, backend=factory())
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    lat: List[float] = []
+    for i in range(updates):
+        t0 = time.perf_counter()
+        store.set_speed(f"/bench/gifs/{(i * 7919) % size:06d}.gif", 50 + i % 300)
+        lat.append((time.perf_counter() - t0) * 1000)
+    store.close()
+
+    return {
+        "entries": size,
+        "bulk_add_ms": round(bulk_ms, 2),
+        "load_ms": round(load_ms, 2),
+        "set_speed_ms_median": round(statistics.median(lat), 3),
+        "set_speed_ms_max": round(max(lat), 3),
+    }
+
+
+def main(argv: List[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--updates", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    results: dict = {}
+    for size in args.sizes:
+        for name in ("json", "sqlite"):
+            with tempfile.TemporaryDirectory() as d:
+                factory = _backends(Path(d))[name]
+                results.setdefault(name, []).append(bench_backend(factory, size, args.updates))
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/run.py – Suite de rendimiento headless (QT_QPA_PLATFORM=offscreen).
+
+Uso:
+    python -m benchmarks.run [--quick] [--out results.json]
+                             [--baseline benchmarks/baseline.json]
+                             [--threshold 0.25] [--update-baseline]
+
+Mide, con los GIF/WebP de `src/` y GIF sintéticos (`benchmarks.synthetic`):
+• construcción de GifOverlay, tiempo hasta el primer frame, FPS logrado frente al objetivo y CPU por frame;
+• crecimiento de RSS con varios overlays en marcha;
+• tiempo de población de LibraryPage y de sus miniaturas visibles (caché fría y caliente);
+• arranque en frío de la app (time-to-window / time-to-interactive);
+• latencia de guardado de LibraryStore (SQLite y JSON).
+
+El resultado se escribe como JSON y se compara con la línea base: sale con
+código 1 si alguna métrica empeora más que el umbral, y con código 2 si la
+línea base es de otro modo (`--quick` mide con menos GIF y entradas: no
+son comparables).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import (  # noqa: E402
+    PYQT_VERSION_STR, QT_VERSION_STR, QCoreApplication, QEvent, QEventLoop, QTimer,
+)
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from benchmarks import bench_startup, bench_storage  # noqa: E402
+from benchmarks.synthetic import write_profiles  # noqa: E402
+from modules.animation_clock import AnimationClock  # noqa: E402
+from modules.frame_cache import FrameCache  # noqa: E402
+from modules.frame_player import MIN_DELAY_MS  # noqa: E402
+from modules.overlay import GifOverlay  # noqa: E402
+from storage.json_backend import JsonBackend  # noqa: E402
+from storage.library_store import LibraryStore  # noqa: E402
+from storage.sqlite_backend import SqliteBackend  # noqa: E402
+from utils.process_stats import rss_bytes  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+
+# Métricas donde "más es mejor"; el resto se interpreta como coste
+HIGHER_IS_BETTER = ("fps_ratio", "achieved_fps")
+
+# Métricas informativas: se registran pero no se comparan
+INFORMATIONAL = ("target_fps", "rss_start_mb")
+
+# Diferencia absoluta mínima para considerar regresión (evita ruido en valores diminutos)
+ABS_FLOOR = {
+    "_ms": 5.0, "_mb": 4.0, "fps_ratio": 0.05, "achieved_fps": 1.0, "cpu_ms_per_frame": 0.2,
+}
+
+
+def spin(ms: int) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def _samples(tmp: Path) -> Dict[str, Path]:
+    samples = {p.stem.replace(" ", "_"): p for p in sorted((ROOT / "src").iterdir())
+               if p.suffix.lower() in (".gif", ".webp")}
+    samples.update(write_profiles(tmp / "synthetic"))
+    return samples
+
+
+# ---------- overlays ----------
+def bench_overlay(path: Path, seconds: float, repeats: int = 5) -> Dict[str, float]:
+    # Construcción en frío (caché de frames vacía): mediana de varias repeticiones.
+    # La carga es asíncrona: se mide también hasta el primer frame en pantalla
+    samples: List[float] = []
+    first: List[float] = []
+    for _ in range(repeats):
+        loop = QEventLoop()
+        t0 = time.perf_counter()
+        ov = GifOverlay(str(path), frame_cache=FrameCache(), clock=AnimationClock())
+        ov.show()
+        samples.append((time.perf_counter() - t0) * 1000)
+        ov.loaded.connect(loop.quit)
+        QTimer.singleShot(10_000, loop.quit)
+        if not ov.is_loaded():
+            loop.exec()
+        first.append((time.perf_counter() - t0) * 1000)
+        ov.close()
+        ov.deleteLater()
+    construct_ms = statistics.median(samples)
+    first_frame_ms = statistics.median(first)
+
+    cache, clock = FrameCache(), AnimationClock()
+    ov = GifOverlay(str(path), frame_cache=cache, clock=clock)
+    ov.show()
+
+    frames = 0
+
+    def count(_i: int) -> None:
+        nonlocal frames
+        frames += 1
+
+    spin(300)                                   # 1.er frame y puesta en marcha
+    ov._player.frameChanged.connect(count)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    spin(int(seconds * 1000))
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+
+    fs = ov._frames                             # ciclo ya completo tras `seconds`
+    delays = [max(d, MIN_DELAY_MS) for d in fs.delays] or [MIN_DELAY_MS]
+    target_fps = 1000 / statistics.mean(delays)
+    achieved_fps = frames / wall
+    ov.close()
+
+    return {
+        "construct_ms": round(construct_ms, 2),
+        "first_frame_ms": round(first_frame_ms, 2),
+        "target_fps": round(target_fps, 2),
+        "achieved_fps": round(achieved_fps, 2),
+        "fps_ratio": round(achieved_fps / target_fps, 3),
+        "cpu_ms_per_frame": round(cpu * 1000 / max(frames, 1), 3),
+    }
+
+
+def bench_rss(samples: List[Path], seconds: float) -> Dict[str, float]:
+    overlays = [GifOverlay(str(p)) for p in samples]
+    for ov in overlays:
+        ov.show()
+    spin(1000)                                  # primer ciclo decodificado
+    before = rss_bytes()
+    spin(int(seconds * 1000))
+    after = rss_bytes()
+    for ov in overlays:
+        ov.close()
+    spin(50)
+    return {
+        "rss_start_mb": round(before / 2**20, 2),
+        "rss_growth_mb": round((after - before) / 2**20, 2),
+    }
+
+
+# ---------- librería ----------
+def bench_library(samples: List[Path], entries: int, tmp: Path) -> Dict[str, float]:
+    from ui.library_page import LibraryPage
+    from utils.thumb_cache import ThumbnailCache
+
+    lib_dir = tmp / "library"
+    lib_dir.mkdir()
+    files = []
+    for i in range(entries):
+        src = samples[i % len(samples)]
+        dst = lib_dir / f"{i:05d}{src.suffix}"
+        shutil.copyfile(src, dst)
+        files.append(str(dst))
+
+    store = LibraryStore(write_delay=None, backend=SqliteBackend(
+        tmp / "library.db", migrate_from=tmp / "none.json"))
+    with store.batch():
+        for f in files:
+            store.add(f)
+
+    def settle(page: LibraryPage) -> None:
+        # Metadatos, hashes de copias e índices siguen en segundo plano tras
+        # `thumbnailsDone`; la pasada caliente no debe competir con ellos ni
+        # ver cambiar a medias las claves (hash de contenido) de las miniaturas
+        timers = (page._index_timer, page._dups_timer, page._search_timer, page._view_timer)
+        deadline = time.perf_counter() + 120
+        quiet = 0
+        while quiet < 3 and time.perf_counter() < deadline:
+            page._watcher.wait_for_done()
+            page._loader.wait_for_done()
+            QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+            busy = any(t.isActive() for t in timers) or page._loader.pending_count()
+            quiet = 0 if busy else quiet + 1
+            time.sleep(0.01)
+
+    def populate() -> Tuple[float, dict]:
+        with mock.patch("ui.library_page.ThumbnailCache",
+                        lambda: ThumbnailCache(tmp / "thumbs")):
+            t0 = time.perf_counter()
+            page = LibraryPage(store)
+        # Solo se generan las miniaturas del área visible
+        page.resize(800, 600)
+        page.show()
+        marks: Dict[str, float] = {}
+        loop = QEventLoop()
+        page.populated.connect(lambda: marks.setdefault("items", time.perf_counter()))
+        page.thumbnailsDone.connect(loop.quit)
+        page.populate()
+        if not page.is_populated() or page._loader.pending_count():
+            QTimer.singleShot(120_000, loop.quit)
+            loop.exec()
+        items_ms = (marks.get("items", time.perf_counter()) - t0) * 1000
+        timings = page.thumbnail_timings()
+        settle(page)
+        page.deleteLater()
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+        return items_ms, timings
+
+    cold_items, cold = populate()
+    warm_items, warm = populate()
+    store.close()
+    return {
+        "items_ms": round(cold_items, 2),
+        "cold_all_thumbnails_ms": cold["all_thumbnails_ms"] or 0.0,
+        "warm_items_ms": round(warm_items, 2),
+        "warm_all_thumbnails_ms": warm["all_thumbnails_ms"] or 0.0,
+    }
+
+
+def bench_store(tmp: Path, size: int) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    factories = {
+        "sqlite": lambda: SqliteBackend(tmp / "bench.db", migrate_from=tmp / "none.json"),
+        "json": lambda: JsonBackend(tmp / "bench.json"),
+    }
+    for name, factory in factories.items():
+        r = bench_storage.bench_backend(factory, size, updates=30)
+        out[f"{name}.set_speed_ms"] = r["set_speed_ms_median"]
+        out[f"{name}.load_ms"] = r["load_ms"]
+    return out
+
+
+# ---------- comparación ----------
+def _floor_for(name: str) -> float:
+    for suffix, floor in ABS_FLOOR.items():
+        if name.endswith(suffix):
+            return floor
+    return 0.0
+
+
+def compare(metrics: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Lista legible de regresiones respecto de la línea base."""
+    regressions = []
+    for name, base in baseline.items():
+        value = metrics.get(name)
+        if value is None or not isinstance(base, (int, float)):
+            continue
+        if any(name.endswith(i) for i in INFORMATIONAL):
+            continue
+        diff = value - base
+        if any(name.endswith(h) for h in HIGHER_IS_BETTER):
+            diff = -diff
+        if diff > abs(base) * threshold and diff > _floor_for(name):
+            regressions.append(f"{name}: {base} → {value}")
+    return regressions
+
+
+def _mode(quick: bool) -> str:
+    return "--quick" if quick else "completo"
+
+
+def run(quick: bool) -> Dict[str, float]:
+    seconds = 1.5 if quick else 5.0
+    metrics: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        samples = _samples(tmp)
+
+        for name, path in samples.items():
+            for k, v in bench_overlay(path, seconds).items():
+                metrics[f"overlay.{name}.{k}"] = v
+
+        for k, v in bench_rss(list(samples.values()), seconds * 2).items():
+            metrics[f"overlay.{k}"] = v
+
+        gifs = [p for p in samples.values() if p.suffix.lower() == ".gif"]
+        for k, v in bench_library(gifs, 100 if quick else 500, tmp).items():
+            metrics[f"library.{k}"] = v
+
+        for k, v in bench_startup.measure(100 if quick else 300, 3).items():
+            metrics[f"startup.{k}"] = v
+
+        store_dir = tmp / "store"
+        store_dir.mkdir()
+        for k, v in bench_store(store_dir, 1_000 if quick else 10_000).items():
+            metrics[f"store.{k}"] = v
+    return metrics
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--quick", action="store_true", help="duraciones y tamaños reducidos")
+    ap.add_argument("--out", type=Path, default=None, help="archivo JSON de resultados")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="empeoramiento relativo tolerado (0.25 = 25 %%)")
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    metrics = run(args.quick)
+    result = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": args.quick,
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+        },
+        "metrics": metrics,
+    }
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    print(text)
+
+    if args.update_baseline:
+        args.baseline.write_text(text, encoding="utf-8")
+        return 0
+    if not args.baseline.exists():
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    baseline_quick = bool(baseline.get("meta", {}).get("quick"))
+    if baseline_quick != args.quick:
+        print(f"línea base de modo {_mode(baseline_quick)} y esta ejecución de modo "
+              f"{_mode(args.quick)}: no se comparan (tamaños distintos)", file=sys.stderr)
+        return 2
+    regressions = compare(metrics, baseline.get("metrics", {}), args.threshold)
+    for r in regressions:
+        print(f"REGRESIÓN {r}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
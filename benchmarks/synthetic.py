@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+benchmarks/synthetic.py – Generador de GIF sintéticos (sin Qt ni dependencias).
+
+• Paleta de 256 colores y franjas que se desplazan frame a frame.
+• Codificación LZW "solo literales": código de limpieza cada 254 códigos,
+  así el ancho se mantiene en 9 bits y no hace falta diccionario. El
+  archivo es válido para cualquier decodificador, aunque no comprima.
+• Solo se codifican `distinct` frames distintos y se repiten en ciclo,
+  para poder generar animaciones largas rápidamente.
+• `write_sprite_gif()`: fondo fijo y un cuadrado que se mueve; cada frame
+  solo codifica ese rectángulo, como los GIF optimizados.
+"""
+
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import Dict, List
+
+_CLEAR = 256
+_END = 257
+_CHUNK = 254          # literales por bloque entre códigos de limpieza
+
+
+def _palette() -> bytes:
+    out = bytearray()
+    for i in range(256):
+        out += bytes(((i * 7) & 0xFF, (i * 13 + 64) & 0xFF, (255 - i) & 0xFF))
+    return bytes(out)
+
+
+def _pack9(codes: List[int]) -> bytes:
+    """Empaqueta códigos de 9 bits, LSB primero (grupos de 8 códigos = 9 bytes)."""
+    out = bytearray()
+    for i in range(0, len(codes), 8):
+        group = codes[i:i + 8]
+        acc = 0
+        for j, code in enumerate(group):
+            acc |= code << (9 * j)
+        out += acc.to_bytes((9 * len(group) + 7) // 8, "little")
+    return bytes(out)
+
+
+def _lzw_literal(pixels: bytes) -> bytes:
+    codes: List[int] = []
+    for start in range(0, len(pixels), _CHUNK):
+        codes.append(_CLEAR)
+        codes.extend(pixels[start:start + _CHUNK])
+    codes.append(_END)
+    return _pack9(codes)
+
+
+def _subblocks(data: bytes) -> bytes:
+    out = bytearray()
+    for i in range(0, len(data), 255):
+        chunk = data[i:i + 255]
+        out.append(len(chunk))
+        out += chunk
+    out.append(0)
+    return bytes(out)
+
+
+def _frame_pixels(width: int, height: int, phase: int) -> bytes:
+    row = bytes(((x + phase * 3) // 4) & 0xFF for x in range(width))
+    return b"".join(row[y % 7:] + row[: y % 7] for y in range(height))
+
+
+def write_gif(
+    path: str | Path,
+    width: int,
+    height: int,
+    frames: int,
+    delay_ms: int = 40,
+    distinct: int = 12,
+) -> Path:
+    """Escribe un GIF animado de `frames` frames y devuelve su ruta."""
+    path = Path(path)
+    out = bytearray(b"GIF89a")
+    out += struct.pack("<HHBBB", width, height, 0xF7, 0, 0)     # GCT de 256 colores
+    out += _palette()
+    out += b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00"        # bucle infinito
+
+    encoded: Dict[int, bytes] = {}
+    delay_cs = max(delay_ms // 10, 0)
+    for i in range(frames):
+        key = i % max(distinct, 1)
+        if key not in encoded:
+            encoded[key] = _subblocks(_lzw_literal(_frame_pixels(width, height, key)))
+        out += struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 0x04, delay_cs, 0, 0)
+        out += struct.pack("<BHHHHB", 0x2C, 0, 0, width, height, 0)
+        out.append(8)                                           # tamaño mínimo de código
+        out += encoded[key]
+    out.append(0x3B)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def write_sprite_gif(
+    path: str | Path,
+    width: int,
+    height: int,
+    frames: int,
+    sprite: int = 32,
+    delay_ms: int = 40,
+    distinct: int = 12,
+) -> Path:
+    """
+    GIF "optimizado": un fondo completo y, después, cada frame solo redibuja
+    un cuadrado de `sprite`×`sprite` que se desplaza (disposición 1).
+    """
+    path = Path(path)
+    sprite = min(sprite, width, height)
+    out = bytearray(b"GIF89a")
+    out += struct.pack("<HHBBB", width, height, 0xF7, 0, 0)
+    out += _palette()
+    out += b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00"
+
+    delay_cs = max(delay_ms // 10, 0)
+    out += struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 0x04, delay_cs, 0, 0)
+    out += struct.pack("<BHHHHB", 0x2C, 0, 0, width, height, 0)
+    out.append(8)
+    out += _subblocks(_lzw_literal(_frame_pixels(width, height, 0)))
+    encoded: Dict[int, bytes] = {}
+    for i in range(1, frames):
+        key = i % max(distinct, 1)
+        if key not in encoded:
+            encoded[key] = _subblocks(_lzw_literal(_frame_pixels(sprite, sprite, 40 + key)))
+        x = i * 5 % (width - sprite + 1)
+        y = i * 3 % (height - sprite + 1)
+        out += struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 0x04, delay_cs, 0, 0)
+        out += struct.pack("<BHHHHB", 0x2C, x, y, sprite, sprite, 0)
+        out.append(8)
+        out += encoded[key]
+    out.append(0x3B)
+    path.write_bytes(bytes(out))
+    return path
+
+
+# Perfiles usados por la suite de benchmarks
+PROFILES = {
+    "small": dict(width=64, height=64, frames=10, delay_ms=50),
+    "medium": dict(width=320, height=240, frames=60, delay_ms=40),
+    "long": dict(width=200, height=200, frames=300, delay_ms=20),
+    "large": dict(width=800, height=600, frames=24, delay_ms=40),
+}
+
+
+def write_profiles(directory: str | Path) -> Dict[str, Path]:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    return {
+        name: write_gif(directory / f"synthetic_{name}.gif", **spec)
+        for name, spec in PROFILES.items()
+    }
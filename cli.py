@@ -0,0 +1,546 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+cli.py – Operaciones de librería sin interfaz gráfica.
+
+Uso:
+    python cli.py [--library RUTA.db|RUTA.json] <orden> …
+
+    add RUTA…        [-r] [--thumbs] [-j N] [--skip-duplicates]
+                                              añade GIF o carpetas (con sus metadatos;
+                                              los ilegibles se señalan y no se añaden)
+    remove RUTA…     [-r]                     quita GIF o carpetas enteras
+    list             [--missing] [--details] [--json]
+    search CONSULTA… [--json]                 busca por nombre, carpeta, #etiqueta, ancho>300…
+    tag RUTA…        [-a ETIQ…] [-d ETIQ…] [--clear]   añade/quita etiquetas
+    thumbs [RUTA…]   [-r] [-j N] [--processes] [--json]
+                                              precalcula miniaturas y metadatos
+    verify           [--prune]                entradas cuyo archivo ya no existe
+    dups             [--prune] [--json]       grupos de copias idénticas
+    export ARCHIVO                            librería → JSON
+    import ARCHIVO   [--replace]              JSON → librería
+
+• No crea ventanas ni QApplication: solo LibraryStore y QImageReader.
+• Metadatos (dimensiones, frames, duración) con `utils.gif_meta`, sin
+  decodificar; se guardan en la librería, que los revalida por mtime/tamaño.
+• Miniaturas en paralelo (hilos) sobre la misma caché de disco que usa la
+  librería: al abrir la app ya están calientes. Las copias idénticas
+  comparten miniatura. Con `--processes`, el primer frame se decodifica en
+  un pool de procesos con `utils.gif_decoder` (sin Qt ni GIL compartido;
+  requiere NumPy) y el proceso principal solo escribe los PNG.
+• Copias idénticas (`storage.duplicates`): hash rápido con los metadatos y
+  completo solo de los que coinciden; `add` las señala (o las omite con
+  `--skip-duplicates`) y `dups` las lista o las quita.
+• Si la app está abierta, solo ella escribe la librería: `add`, `remove` e
+  `import` trabajan sobre una copia en memoria y le reenvían el resultado
+  (`utils.single_instance`); el resto de órdenes que modifican la
+  librería se niegan mientras esté abierta.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from PyQt6.QtCore import QSize, Qt
+
+from storage.backend import StorageBackend
+from storage.duplicates import DuplicateIndex
+from storage.json_backend import JsonBackend
+from storage.library_store import LibraryStore
+from storage.models import GifEntry, entry_from_dict, metadata_fresh
+from storage.path_index import canonical_path
+from storage.search_index import SearchIndex
+from storage.sqlite_backend import SqliteBackend
+from utils.content_hash import full_hashes
+from utils.folder_watcher import probe_all
+from utils.gif_meta import GifMeta, probe
+from utils.thumb_cache import THUMB_SIZE, ThumbnailCache
+
+EXPORT_VERSION = 1
+GIF_SUFFIXES = (".gif",)
+
+MUTATING = ("add", "remove", "verify", "import", "thumbs", "tag", "dups")
+FORWARDED = ("add", "remove", "import")     # con la app abierta, se le reenvían
+
+
+# ---------- utilidades ----------
+def iter_gifs(paths: Iterable[str], recursive: bool = False) -> Iterator[str]:
+    """Archivos GIF de `paths` (las carpetas se recorren; con `recursive`, a fondo)."""
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            walker = os.walk(path) if recursive else [
+                (str(path), [], [e.name for e in os.scandir(path) if e.is_file()])
+            ]
+            for root, _dirs, files in walker:
+                for name in sorted(files):
+                    if name.lower().endswith(GIF_SUFFIXES):
+                        yield os.path.join(root, name)
+        elif path.suffix.lower() in GIF_SUFFIXES:
+            yield str(path)
+
+
+def _meta_row(meta: GifMeta | GifEntry) -> dict:
+    if isinstance(meta, GifEntry):
+        return {"width": meta.width, "height": meta.height, "frames": meta.frames,
+                "duration_ms": meta.duration_ms, "bytes": meta.file_size}
+    return {"width": meta.width, "height": meta.height, "frames": meta.frames,
+            "duration_ms": meta.duration_ms, "bytes": meta.size}
+
+
+def gif_metadata(path: str) -> dict:
+    """Dimensiones, frames, duración y tamaño en disco (recorre bloques, no decodifica)."""
+    return _meta_row(probe(path))
+
+
+def _precompute(cache: ThumbnailCache, path: str, size: QSize) -> dict:
+    t0 = time.perf_counter()
+    key, img = cache.load_image(path, size)
+    meta = probe(path)
+    info = {"path": path, "ok": key is not None and not img.isNull(), "meta": meta}
+    info.update(_meta_row(meta))
+    info["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return info
+
+
+def _precompute_in_processes(
+    cache: ThumbnailCache, paths: List[str], size: QSize, jobs: int
+) -> List[dict] | None:
+    """
+    Metadatos y primer frame en un pool de procesos (`utils.gif_decoder`).
+    None si no se puede (sin NumPy, sin procesos): se usan hilos.
+    """
+    try:
+        from utils.gif_decoder import probe_with_thumbnail
+        from utils.gif_utils import rgba_to_image
+    except ImportError:
+        print("--processes requiere NumPy: se usan hilos", file=sys.stderr)
+        return None
+    # Importación diferida, como `utils.folder_watcher.probe_all`
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    # Claves en este proceso: dependen de la identidad de la librería
+    keys = [cache.key_for(p, size) for p in paths]
+    boxes = [None if k is None or cache.has_file(k) else (size.width(), size.height())
+             for k in keys]
+    rows: List[dict] = []
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx) as pool:
+            results = pool.map(probe_with_thumbnail, paths, boxes,
+                               chunksize=max(1, len(paths) // (jobs * 8)))
+            for path, key, box, (meta, rgba, ms) in zip(paths, keys, boxes, results):
+                ok = key is not None and (box is None or rgba is not None)
+                if ok and rgba is not None:
+                    img = rgba_to_image(rgba)
+                    # Como QImageReader.setScaledSize: las pequeñas también se amplían
+                    target = QSize(meta.width, meta.height).scaled(
+                        size, Qt.AspectRatioMode.KeepAspectRatio)
+                    if img.size() != target:
+                        img = img.scaled(target, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                         Qt.TransformationMode.SmoothTransformation)
+                    cache.save(key, img)
+                row = {"path": path, "ok": ok, "meta": meta}
+                row.update(_meta_row(meta))
+                row["ms"] = round(ms, 2)
+                rows.append(row)
+    except (BrokenProcessPool, OSError, RuntimeError):
+        print("sin pool de procesos: se usan hilos", file=sys.stderr)
+        return None
+    return rows
+
+
+def precompute_thumbnails(
+    paths: List[str], jobs: int | None = None, cache: ThumbnailCache | None = None,
+    size: QSize = THUMB_SIZE, processes: bool = False,
+) -> List[dict]:
+    """
+    Genera (o confirma en disco) la miniatura y los metadatos de cada ruta.
+    • `processes`: decodifica en un pool de procesos en vez de hilos.
+    """
+    cache = cache or ThumbnailCache()
+    if processes and paths:
+        rows = _precompute_in_processes(cache, paths, size, jobs or os.cpu_count() or 1)
+        if rows is not None:
+            return rows
+    jobs = jobs or min(8, (os.cpu_count() or 1) + 1)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(lambda p: _precompute(cache, p, size), paths))
+
+
+def find_duplicates(store: LibraryStore) -> DuplicateIndex:
+    """Agrupa la librería por contenido (hash completo solo de las coincidencias)."""
+    dups = DuplicateIndex()
+    dups.attach(store)
+    with store.batch():
+        store.set_content_hashes(full_hashes(dups.unresolved()))
+    dups.sync()
+    return dups
+
+
+def _open_store(args: argparse.Namespace, read_only: bool = False) -> LibraryStore:
+    if args.library and args.library.lower().endswith(".json"):
+        backend: StorageBackend | None = JsonBackend(Path(args.library))
+    elif args.library:
+        db = Path(args.library)
+        backend = SqliteBackend(db, migrate_from=db.with_suffix(".json"))
+    else:
+        backend = None      # el mismo que usa la app (DESKTOPGIF_BACKEND)
+    if read_only:
+        from storage.backend import default_backend
+
+        backend = _ReadOnlyBackend(backend or default_backend())
+    return LibraryStore(write_delay=None, backend=backend)
+
+
+class _ReadOnlyBackend(StorageBackend):
+    """Lee la librería de la app abierta y descarta las escrituras (se le reenvían)."""
+
+    name = "read-only"
+
+    def __init__(self, inner: StorageBackend) -> None:
+        self._inner = inner
+
+    def load(self) -> List[GifEntry]:
+        return self._inner.load()
+
+    def write_all(self, entries: List[GifEntry]) -> None:
+        pass
+
+    def write_changes(
+        self, entries: Dict[str, GifEntry], changed: Set[str], removed: Set[str]
+    ) -> None:
+        pass
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def _app_running() -> bool:
+    from utils.single_instance import send_commands
+
+    return send_commands([])
+
+
+def _forward(store: LibraryStore, args: argparse.Namespace) -> int:
+    """
+    Ejecuta la orden sobre la copia en memoria (`_ReadOnlyBackend`) y envía
+    a la app el resultado neto: rutas quitadas y entradas nuevas o cambiadas.
+    """
+    from utils.single_instance import send_commands
+
+    before = {e.path for e in store.items()}
+    changed: Set[str] = set()
+    store.subscribe(lambda c, _removed: changed.update(c))
+    code = COMMANDS[args.cmd](store, args)
+    after = {e.path for e in store.items()}
+    commands: List[Tuple[str, dict]] = []
+    if before - after:
+        commands.append(("remove", {"paths": sorted(before - after)}))
+    entries = [asdict(e) for e in map(store.get, sorted(changed & after)) if e is not None]
+    if entries:
+        commands.append(("import" if args.cmd == "import" else "add", {"entries": entries}))
+    if commands and not send_commands(commands):
+        print("DesktopGIF se cerró antes de recibir los cambios: repita la orden.",
+              file=sys.stderr)
+        return 1
+    return code
+
+
+def _print(rows: List[dict], as_json: bool, columns: List[str]) -> None:
+    if as_json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+    for row in rows:
+        print("\t".join(str(row.get(c, "")) for c in columns))
+
+
+# ---------- órdenes ----------
+def cmd_add(store: LibraryStore, args: argparse.Namespace) -> int:
+    metas = probe_all(list(iter_gifs(args.paths, args.recursive)), args.jobs)
+    # Como `FolderWatcher`: solo entran los GIF que se pudieron leer
+    files = [m.path for m in metas if m.valid]
+    for meta in metas:
+        if not meta.valid:
+            print(f"no válido: {meta.path}", file=sys.stderr)
+    known = {e.path for e in store.items()}
+    with store.batch():
+        for f in files:
+            store.add(f)
+        store.set_metadata(m for m in metas if m.valid)
+    new = {e.path for e in store.items()} - known
+    print(f"{len(new)} añadidos ({len(files) - len(new)} ya estaban, "
+          f"{len(metas) - len(files)} no válidos)", file=sys.stderr)
+    # Copias de entradas que ya estaban o de otro archivo del mismo lote
+    copies: List[str] = []
+    for group in find_duplicates(store).groups():
+        keep = [p for p in group if p not in new] or group[:1]
+        copies += [p for p in group if p not in keep]
+    if copies and args.skip_duplicates:
+        with store.batch():
+            for path in copies:
+                store.remove(path)
+        print(f"{len(copies)} copias idénticas omitidas", file=sys.stderr)
+    elif copies:
+        print(f"{len(copies)} copias idénticas (ver `dups`)", file=sys.stderr)
+    if args.thumbs and files:
+        cache = ThumbnailCache()
+        cache.identity = store.content_id       # una miniatura por contenido
+        paths = [e.path for e in map(store.get, files) if e is not None]
+        results = precompute_thumbnails(paths, args.jobs, cache)
+        failed = sum(1 for r in results if not r["ok"])
+        print(f"{len(results)} miniaturas ({failed} fallidas)", file=sys.stderr)
+    return 0
+
+
+def cmd_remove(store: LibraryStore, args: argparse.Namespace) -> int:
+    targets = [canonical_path(p) for p in args.paths]
+    prefixes = tuple(t.rstrip(os.sep) + os.sep for t in targets)
+    removed = 0
+    with store.batch():
+        for entry in store.items():
+            if entry.path in targets or (args.recursive and entry.path.startswith(prefixes)):
+                store.remove(entry.path)
+                removed += 1
+    print(f"{removed} quitados", file=sys.stderr)
+    return 0
+
+
+def cmd_list(store: LibraryStore, args: argparse.Namespace) -> int:
+    rows = []
+    for entry in sorted(store.items(), key=lambda e: e.path):
+        exists = os.path.exists(entry.path)
+        if args.missing and exists:
+            continue
+        row = asdict(entry)
+        row["exists"] = exists
+        if args.details and exists:
+            # Metadatos en caché si siguen vigentes; si no, se leen (sin guardarlos)
+            row.update(_meta_row(entry) if metadata_fresh(entry) else gif_metadata(entry.path))
+        rows.append(row)
+    columns = ["path", "exists"] + (
+        ["width", "height", "frames", "duration_ms", "bytes"] if args.details else []
+    )
+    _print(rows, args.as_json, columns)
+    return 0
+
+
+def cmd_search(store: LibraryStore, args: argparse.Namespace) -> int:
+    index = SearchIndex()
+    index.index(store.items())
+    found = index.query(" ".join(args.query))
+    entries = store.items() if found is None else [e for e in map(store.get, found) if e]
+    rows = []
+    for entry in sorted(entries, key=lambda e: e.path):
+        row = {"path": entry.path, **_meta_row(entry), "tags": entry.tags}
+        rows.append(row if args.as_json else {**row, "tags": ",".join(entry.tags)})
+    _print(rows, args.as_json, ["path", "width", "height", "frames", "duration_ms", "tags"])
+    return 0 if rows else 1
+
+
+def cmd_tag(store: LibraryStore, args: argparse.Namespace) -> int:
+    drop = {t.lower() for t in args.remove}
+    changed = 0
+    with store.batch():
+        for path in args.paths:
+            entry = store.get(path)
+            if entry is None:
+                print(f"no está en la librería: {path}", file=sys.stderr)
+                continue
+            before = entry.tags
+            tags = [] if args.clear else [t for t in before if t.lower() not in drop]
+            if store.set_tags(path, tags + args.add) != before:
+                changed += 1
+    print(f"{changed} entradas etiquetadas", file=sys.stderr)
+    return 0
+
+
+def cmd_thumbs(store: LibraryStore, args: argparse.Namespace) -> int:
+    if args.paths:
+        files = [canonical_path(f) for f in iter_gifs(args.paths, args.recursive)]
+    else:
+        files = [e.path for e in store.items() if os.path.exists(e.path)]
+    cache = ThumbnailCache()
+    cache.identity = store.content_id
+    t0 = time.perf_counter()
+    results = precompute_thumbnails(files, args.jobs, cache, processes=args.processes)
+    elapsed = time.perf_counter() - t0
+    with store.batch():
+        store.set_metadata(r.pop("meta") for r in results)
+    if args.as_json:
+        _print(results, True, [])
+    failed = [r["path"] for r in results if not r["ok"]]
+    for path in failed:
+        print(f"sin miniatura: {path}", file=sys.stderr)
+    print(f"{len(results)} miniaturas en {elapsed:.2f} s ({len(failed)} fallidas)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_verify(store: LibraryStore, args: argparse.Namespace) -> int:
+    missing = [e.path for e in store.items() if not os.path.exists(e.path)]
+    for path in sorted(missing):
+        print(path)
+    if args.prune and missing:
+        with store.batch():
+            for path in missing:
+                store.remove(path)
+        print(f"{len(missing)} entradas eliminadas", file=sys.stderr)
+        return 0
+    return 1 if missing else 0
+
+
+def cmd_dups(store: LibraryStore, args: argparse.Namespace) -> int:
+    # Sin hash rápido no hay con qué comparar: antes, los metadatos que falten
+    stale = [p for p in store.stale_metadata() if os.path.exists(p)]
+    if stale:
+        with store.batch():
+            store.set_metadata(probe_all(stale))
+    groups = find_duplicates(store).groups()
+    if args.as_json:
+        print(json.dumps(groups, indent=2, ensure_ascii=False))
+    else:
+        print("\n\n".join("\n".join(g) for g in groups))
+    extra = sum(len(g) - 1 for g in groups)
+    if args.prune and extra:
+        # Se conserva la primera ruta de cada grupo; los archivos no se tocan
+        with store.batch():
+            for group in groups:
+                for path in group[1:]:
+                    store.remove(path)
+        print(f"{extra} copias quitadas de la librería", file=sys.stderr)
+        return 0
+    print(f"{len(groups)} grupos, {extra} copias", file=sys.stderr)
+    return 1 if extra else 0
+
+
+def cmd_export(store: LibraryStore, args: argparse.Namespace) -> int:
+    data = {
+        "version": EXPORT_VERSION,
+        "entries": [asdict(e) for e in sorted(store.items(), key=lambda e: e.path)],
+    }
+    text = json.dumps(data, indent=2, ensure_ascii=False)
+    if args.file == "-":
+        print(text)
+    else:
+        Path(args.file).write_text(text, encoding="utf-8")
+    print(f"{len(data['entries'])} entradas exportadas", file=sys.stderr)
+    return 0
+
+
+def cmd_import(store: LibraryStore, args: argparse.Namespace) -> int:
+    raw = sys.stdin.read() if args.file == "-" else Path(args.file).read_text(encoding="utf-8")
+    data = json.loads(raw)
+    items = data.get("entries", []) if isinstance(data, dict) else data
+    entries: List[GifEntry] = []
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("path"), str):
+            entry = entry_from_dict(item)
+            entry.path = canonical_path(entry.path)
+            entries.append(entry)
+    with store.batch():
+        if args.replace:
+            for entry in store.items():
+                store.remove(entry.path)
+        for entry in entries:
+            store.update(entry)
+    print(f"{len(entries)} entradas importadas", file=sys.stderr)
+    return 0
+
+
+COMMANDS = {
+    "add": cmd_add, "remove": cmd_remove, "list": cmd_list, "search": cmd_search,
+    "tag": cmd_tag, "thumbs": cmd_thumbs, "verify": cmd_verify, "dups": cmd_dups,
+    "export": cmd_export, "import": cmd_import,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python cli.py", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--library", metavar="ARCHIVO",
+                    help="librería .db (SQLite) o .json (por defecto, la de la app)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("add", help="añade GIF o carpetas")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("-r", "--recursive", action="store_true")
+    p.add_argument("--thumbs", action="store_true", help="precalcula también las miniaturas")
+    p.add_argument("-j", "--jobs", type=int, default=None)
+    p.add_argument("--skip-duplicates", action="store_true",
+                   help="no añade copias idénticas de GIF que ya están")
+
+    p = sub.add_parser("remove", help="quita GIF (o carpetas con -r)")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("-r", "--recursive", action="store_true")
+
+    p = sub.add_parser("list", help="lista la librería")
+    p.add_argument("--missing", action="store_true", help="solo las que no existen")
+    p.add_argument("--details", action="store_true", help="incluye dimensiones y frames")
+    p.add_argument("--json", dest="as_json", action="store_true")
+
+    p = sub.add_parser("search", help="busca en la librería (código 1 si no hay resultados)")
+    p.add_argument("query", nargs="+",
+                   help="palabras, #etiqueta, ancho/alto/frames/dur/mb con < > =, 640x480")
+    p.add_argument("--json", dest="as_json", action="store_true")
+
+    p = sub.add_parser("tag", help="añade o quita etiquetas")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("-a", "--add", nargs="+", default=[], metavar="ETIQ")
+    p.add_argument("-d", "--remove", nargs="+", default=[], metavar="ETIQ")
+    p.add_argument("--clear", action="store_true", help="quita todas antes de añadir")
+
+    p = sub.add_parser("thumbs", help="precalcula miniaturas y metadatos")
+    p.add_argument("paths", nargs="*", help="archivos/carpetas (por defecto, la librería)")
+    p.add_argument("-r", "--recursive", action="store_true")
+    p.add_argument("-j", "--jobs", type=int, default=None)
+    p.add_argument("--processes", action="store_true",
+                   help="decodifica en procesos (utils.gif_decoder, requiere NumPy)")
+    p.add_argument("--json", dest="as_json", action="store_true")
+
+    p = sub.add_parser("verify", help="entradas cuyo archivo falta (código 1 si hay)")
+    p.add_argument("--prune", action="store_true", help="las elimina")
+
+    p = sub.add_parser("dups", help="copias idénticas (código 1 si hay)")
+    p.add_argument("--prune", action="store_true",
+                   help="deja solo la primera de cada grupo (no borra archivos)")
+    p.add_argument("--json", dest="as_json", action="store_true")
+
+    p = sub.add_parser("export", help="exporta a JSON ('-' = stdout)")
+    p.add_argument("file")
+
+    p = sub.add_parser("import", help="importa desde JSON ('-' = stdin)")
+    p.add_argument("file")
+    p.add_argument("--replace", action="store_true", help="vacía la librería antes")
+    return ap
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    mutating = args.cmd in MUTATING and not (args.cmd == "verify" and not args.prune)
+    # Solo importa la librería de la app: con --library es otro archivo
+    shared = not args.library
+    running = mutating and shared and _app_running()
+
+    if running and args.cmd not in FORWARDED:
+        print(f"DesktopGIF está abierto: ciérrelo para usar `{args.cmd}` "
+              f"(`{'`, `'.join(FORWARDED)}` se le reenvían).", file=sys.stderr)
+        return 2
+    store = _open_store(args, read_only=running)
+    try:
+        return _forward(store, args) if running else COMMANDS[args.cmd](store, args)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,17 +7,22 @@ main.py – Punto de entrada de DesktopGIF
 
 from __future__ import annotations
 
+# Primero el cronómetro: así también mide las importaciones de PyQt6
+from utils.startup_timing import (  # isort: skip
+    INTERACTIVE_PHASE, report_requested, startup_timer,
+)
+
 import signal
 import sys
 
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QApplication
-
-from ui.main_window import MainWindow
+from utils.profiling import ProfilingSession
+from utils.single_instance import InstanceServer, parse_commands, send_commands
 
 
 def _handle_sigint(*_args) -> None:
     """Permite cerrar la app con Ctrl + C cuando se ejecuta en consola."""
+    from PyQt6.QtWidgets import QApplication
+
     QApplication.quit()
 
 
@@ -26,22 +31,73 @@ def _enable_high_dpi() -> None:
     Activa los flags High-DPI solo si existen en la versión de PyQt6 instalada.
     Esto evita advertencias “atributo desconocido” en algunos stubs.
     """
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+
     for name in ("AA_EnableHighDpiScaling", "AA_UseHighDpiPixmaps"):
         attr = getattr(Qt.ApplicationAttribute, name, None)
         if attr is not None:
             QApplication.setAttribute(attr, True)  # type: ignore[arg-type]
 
 
+def _print_startup_report(phase: str, _ms: float) -> None:
+    timer = startup_timer()
+    if phase in (INTERACTIVE_PHASE, "thumbnails") and timer.elapsed(INTERACTIVE_PHASE) \
+            and timer.elapsed("thumbnails"):
+        print(timer.format(), file=sys.stderr)
+        timer.remove_listener(_print_startup_report)
+
+
 def main() -> None:
+    timer = startup_timer()
+    timer.mark("imports")
+    if report_requested(sys.argv):
+        timer.add_listener(_print_startup_report)
+
+    # Perfilado opcional (--profile-startup, --profile-window, --tracemalloc…)
+    profiling, argv = ProfilingSession.from_args(sys.argv)
+    commands, argv = parse_commands(argv)
+
+    # Ya hay una instancia: se le reenvía la orden y se sale sin abrir el store
+    if send_commands(commands or [("show", {})]):
+        sys.exit(0)
+
+    profiling.begin()
+
+    # QtWidgets solo en la instancia principal: reenviar una orden no lo necesita
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+
     _enable_high_dpi()
 
-    app = QApplication(sys.argv)
+    app = QApplication(argv)
     app.setQuitOnLastWindowClosed(False)
+    timer.mark("qapplication")
 
     signal.signal(signal.SIGINT, _handle_sigint)
 
+    server = InstanceServer(parent=app)
+    if not server.listen() and send_commands(commands or [("show", {})]):
+        sys.exit(0)     # otra instancia arrancó a la vez y ganó la carrera
+
+    # Solo la ventana y la bandeja: la librería se carga tras el primer pintado
+    from ui.main_window import MainWindow
+
     win = MainWindow()
+    timer.mark("window")
+    server.commandReceived.connect(win.handle_command)
     win.show()
+    for cmd, args in commands:
+        # Tras la carga por etapas de la librería (también en cola)
+        QTimer.singleShot(0, lambda c=cmd, a=args: win.handle_command(c, a))
+    profiling.install()
+
+    from utils.instrumentation import instrumentation, start_logging_from_env
+
+    instrumentation().add_provider("startup", timer.report)
+    # Métricas en JSON-lines si DESKTOPGIF_METRICS apunta a un archivo
+    if start_logging_from_env() is not None:
+        app.aboutToQuit.connect(instrumentation().stop_logging)
 
     sys.exit(app.exec())
 
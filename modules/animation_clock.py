@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+modules/animation_clock.py – Reloj de animación único para todos los overlays.
+
+• Un solo QTimer (single-shot, preciso) por proceso en lugar de uno por GIF.
+• Cada cliente registra su próximo deadline (reloj monotónico, ms).
+• El timer se arma para el deadline más cercano; al despertar avanza a
+  todos los clientes vencidos, y a los que vencen dentro de `coalesce_ms`
+  (agrupa frames casi simultáneos en una sola activación).
+• Deadlines encadenados (deadline anterior + retardo) → sin deriva acumulada.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Dict, Protocol
+
+from PyQt6.QtCore import QObject, Qt, QTimer
+
+from utils.instrumentation import instrumentation
+
+
+def now_ms() -> float:
+    """Reloj monotónico de alta resolución, en milisegundos."""
+    return time.perf_counter() * 1000.0
+
+
+class ClockClient(Protocol):
+    def on_clock_tick(self, now: float) -> None:
+        ...
+
+
+class AnimationClock(QObject):
+    """Planificador monotónico compartido: despierta solo en el deadline más próximo."""
+
+    def __init__(self, coalesce_ms: float = 4.0, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.coalesce_ms = coalesce_ms
+        self._deadlines: Dict[ClockClient, float] = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+        self._armed_for: float | None = None
+
+        self.wakeups = 0
+        self.ticks = 0
+
+    # ---------- API ----------
+    def schedule(self, client: ClockClient, delay_ms: float, after: float | None = None) -> float:
+        """
+        Programa `client` para dentro de `delay_ms`.
+        • `after`: deadline anterior; encadena sin deriva salvo que ya vaya
+          atrasado más de un retardo completo (entonces parte de ahora).
+        Devuelve el deadline absoluto.
+        """
+        now = now_ms()
+        base = after if after is not None and now - after < delay_ms else now
+        deadline = base + delay_ms
+        self._deadlines[client] = deadline
+        if self._armed_for is None or deadline < self._armed_for:
+            self._arm(now)
+        return deadline
+
+    def cancel(self, client: ClockClient) -> None:
+        if self._deadlines.pop(client, None) is not None and not self._deadlines:
+            self._timer.stop()
+            self._armed_for = None
+
+    def is_scheduled(self, client: ClockClient) -> bool:
+        return client in self._deadlines
+
+    def deadline(self, client: ClockClient) -> float | None:
+        return self._deadlines.get(client)
+
+    def client_count(self) -> int:
+        return len(self._deadlines)
+
+    def stats(self) -> dict:
+        return {"clients": len(self._deadlines), "wakeups": self.wakeups, "ticks": self.ticks}
+
+    def reset_stats(self) -> None:
+        self.wakeups = 0
+        self.ticks = 0
+
+    # ---------- internos ----------
+    def _arm(self, now: float) -> None:
+        if not self._deadlines:
+            self._timer.stop()
+            self._armed_for = None
+            return
+        earliest = min(self._deadlines.values())
+        self._armed_for = earliest
+        self._timer.start(max(0, math.ceil(earliest - now)))
+
+    def _on_timeout(self) -> None:
+        self.wakeups += 1
+        now = now_ms()
+        limit = now + self.coalesce_ms
+        due = [c for c, d in self._deadlines.items() if d <= limit]
+        for client in due:
+            # El cliente vuelve a llamar a schedule() si sigue reproduciendo
+            self._deadlines.pop(client, None)
+            self.ticks += 1
+            try:
+                client.on_clock_tick(now)
+            except RuntimeError:
+                pass  # objeto Qt ya destruido: simplemente deja de programarse
+        self._arm(now_ms())
+
+
+_shared: AnimationClock | None = None
+
+
+def shared_clock() -> AnimationClock:
+    """Reloj único del proceso (se crea en el primer uso)."""
+    global _shared
+    if _shared is None:
+        _shared = AnimationClock()
+        instrumentation().add_provider("clock", _shared.stats)
+    return _shared
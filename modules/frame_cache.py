@@ -0,0 +1,725 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+modules/frame_cache.py – Caché de frames decodificados compartida por proceso.
+
+• Un `FrameSet` por (archivo, mtime, tamaño de archivo, tamaño destino).
+  Con `identity` (p. ej. `LibraryStore.content_id`), un archivo cuyo hash
+  completo se conoce se identifica por contenido: sus copias idénticas
+  comparten el FrameSet (un solo decode y una sola vez en memoria).
+• Los frames se decodifican bajo demanda durante el primer ciclo y se
+  guardan junto con su retardo; a partir del segundo ciclo no hay decode.
+• Todos los overlays/previews que muestran el mismo GIF al mismo tamaño
+  comparten el FrameSet (conteo de referencias).
+• Límite de memoria configurable: al superarlo se expulsan, en orden LRU,
+  los FrameSet sin referencias.
+• `prepare()` construye un FrameSet completo ya escalado (suave o rápido)
+  en un hilo de trabajo; queda en caché por nivel de escala.
+• `acquire(..., stream=True)` llena el FrameSet desde un hilo de trabajo
+  (lectura del archivo + decode) y avisa a sus oyentes a medida que llegan
+  frames: el hilo GUI nunca lee ni decodifica un GIF grande.
+• `batch()`: los `acquire(..., stream=True)` del bloque se decodifican
+  juntos al salir, en un pool de procesos con `utils.gif_decoder` (todos
+  los núcleos, fuera del proceso de la GUI). Con pocos GIF, sin NumPy, con
+  un solo núcleo o si el pool falla, cada uno va a su hilo como siempre.
+• Formato en memoria (`modules.frame_storage`, `storage=` o
+  `DESKTOPGIF_FRAME_STORAGE`): ARGB32 listo para pintar, o compacto
+  (Indexed8 + tabla de color, o rectángulos cambiados entre frames) y
+  expandido al mostrar cada frame. `stats()` da lo ahorrado frente a ARGB.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+from modules.frame_storage import (
+    FrameCompactor, FrameExpander, StoredFrame, argb_bytes, resolve_storage, stored_bytes,
+)
+from storage.path_index import canonical_path
+from utils.content_hash import ContentLookup
+from utils.instrumentation import instrumentation
+
+# (ruta o "content:<hash>", mtime (0 por contenido), tamaño de archivo, ancho, alto, suave)
+FrameKey = Tuple[str, int, int, int, int, bool]
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Por debajo, arrancar procesos no compensa: un núcleo del decodificador
+# NumPy rinde menos que uno de Qt (que ya suelta el GIL en los hilos)
+BATCH_MIN_SETS = 4
+
+
+def scale_frame(img: QImage, size: QSize | None, smooth: bool = True) -> QImage:
+    """Escala (si hace falta) y deja el frame en ARGB32 premultiplicado para pintar rápido."""
+    if size is not None and not size.isEmpty() and img.size() != size:
+        mode = (
+            Qt.TransformationMode.SmoothTransformation
+            if smooth else Qt.TransformationMode.FastTransformation
+        )
+        img = img.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio, mode)
+    return img.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+
+
+def decode_all(path: str, size: QSize | None, smooth: bool = True) -> Tuple[List[QImage], List[int]]:
+    """Decodifica y escala un ciclo completo. Sin QPixmap: apto para hilos de trabajo."""
+    frames: List[QImage] = []
+    delays: List[int] = []
+    reader = QImageReader(path)
+    metrics = instrumentation()
+    while True:
+        t0 = time.perf_counter()
+        img = reader.read()
+        if img.isNull():
+            break
+        delays.append(max(reader.nextImageDelay(), 0))
+        frames.append(scale_frame(img, size, smooth))
+        metrics.record_decode(path, (time.perf_counter() - t0) * 1000)
+    return frames, delays
+
+
+class FrameSet:
+    """Frames + retardos (ms) de un GIF a un tamaño dado."""
+
+    def __init__(
+        self,
+        cache: "FrameCache",
+        key: FrameKey,
+        path: str,
+        size: QSize | None,
+        smooth: bool = True,
+    ) -> None:
+        self.key = key
+        self.path = path
+        self.size = QSize(size) if size is not None else None
+        self.smooth = smooth
+        self.frames: List[StoredFrame] = []    # formato de `cache.storage`
+        self.delays: List[int] = []
+        self.complete = False
+        self.refcount = 0
+        self.nbytes = 0
+        self.argb_bytes = 0             # lo que ocuparían los mismos frames en ARGB32
+        self.decoded_frames = 0        # frames decodificados (no servidos de caché)
+
+        self.streaming = False         # lo está llenando un hilo de trabajo
+        self.error = ""                # motivo si no se pudo leer ningún frame
+
+        self._cache = cache
+        self._reader: QImageReader | None = None
+        self._listeners: List[Callable[[], None]] = []
+        self._cancel: threading.Event | None = None
+        self._compactor = FrameCompactor(cache.storage)    # decode en el hilo GUI
+
+    # ---------- API ----------
+    def is_valid(self) -> bool:
+        if self.streaming:
+            return True     # se sabrá al terminar: ver `error`
+        return bool(self.frames) or self._open_reader() is not None
+
+    def failed(self) -> bool:
+        return self.complete and not self.frames
+
+    def available(self, index: int) -> bool:
+        """True si `frame(index)` no tiene que esperar ni decodificar."""
+        return index < len(self.frames) or (self.complete and bool(self.frames))
+
+    def frame(self, index: int, expander: FrameExpander | None = None) -> Tuple[QImage, int] | None:
+        """
+        Frame `index` y su retardo; decodifica solo si aún no está en caché.
+        • Con un hilo de trabajo llenándolo, devuelve None si aún no llegó.
+        • `expander`: el del consumidor (un `FramePlayer` cada uno), que
+          recuerda su último frame expandido; sin él, cada llamada parte
+          del frame completo anterior.
+        """
+        while index >= len(self.frames) and not self.complete and not self.streaming:
+            if not self._decode_next():
+                break
+        if index >= len(self.frames) and not self.complete:
+            return None
+        if not self.frames:
+            return None
+        if index >= len(self.frames):
+            index %= len(self.frames)
+        # Formato compacto: se expande aquí, justo antes de pintarlo
+        expander = expander or FrameExpander()
+        return expander.expand(self.frames, index), self.delays[index]
+
+    def frame_count(self) -> int | None:
+        """Total de frames si ya se conoce (ciclo completo o cabecera)."""
+        if self.complete:
+            return len(self.frames)
+        if self.streaming:
+            return None
+        reader = self._open_reader()
+        count = reader.imageCount() if reader is not None else 0
+        return count if count > 0 else None
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """`callback()` cada vez que llegan frames nuevos o termina la carga."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self) -> None:
+        for cb in list(self._listeners):
+            cb()
+
+    # ---------- decodificación ----------
+    def _open_reader(self) -> QImageReader | None:
+        if self._reader is None and not self.complete:
+            reader = QImageReader(self.path)
+            if not reader.canRead():
+                return None
+            self._reader = reader
+        return self._reader
+
+    def _decode_next(self) -> bool:
+        reader = self._open_reader()
+        if reader is None:
+            self.complete = True
+            return False
+        t0 = time.perf_counter()
+        img = reader.read()
+        if img.isNull():
+            # Fin del primer ciclo: el lector ya no hace falta
+            self.complete = True
+            self._reader = None
+            return False
+        delay = reader.nextImageDelay()
+        self._append(self._compactor.add(scale_frame(img, self.size, self.smooth)), delay)
+        self.decoded_frames += 1
+        instrumentation().record_decode(self.path, (time.perf_counter() - t0) * 1000)
+        if not reader.canRead():
+            # Sin más frames (canRead no recorre el archivo; imageCount sí)
+            self.complete = True
+            self._reader = None
+        return True
+
+    def _append(self, frame: StoredFrame, delay: int) -> None:
+        self.frames.append(frame)
+        self.delays.append(max(delay, 0))
+        self.argb_bytes += argb_bytes(self.frames[0])     # el primero siempre es completo
+        grown = stored_bytes(frame)
+        self.nbytes += grown
+        self._cache._account(self, grown)
+
+    def _reset_frames(self) -> None:
+        self._cache._account(self, -self.nbytes)
+        self.frames, self.delays, self.nbytes, self.argb_bytes = [], [], 0, 0
+        self._compactor = FrameCompactor(self._cache.storage)
+
+    def _fill(self, frames: List[StoredFrame], delays: List[int]) -> None:
+        """Instala un ciclo completo construido fuera del hilo GUI."""
+        self._reset_frames()
+        for img, delay in zip(frames, delays):
+            self._append(img, delay)
+        self.decoded_frames += len(frames)
+        self.complete = True
+        self._reader = None
+        self._stop_stream()
+        self._notify()
+
+    def _stop_stream(self) -> None:
+        if self._cancel is not None:
+            self._cancel.set()
+            self._cancel = None
+        self.streaming = False
+
+    def _drop(self) -> None:
+        self._stop_stream()
+        # Listas nuevas (no `clear()`): los `FrameExpander` ven que cambiaron
+        self.frames, self.delays = [], []
+        self.complete = False
+        self._reader = None
+        self.nbytes = self.argb_bytes = 0
+        self._listeners.clear()
+
+
+def _emit(signals: "_BuildSignals", name: str, *args) -> None:
+    try:
+        getattr(signals, name).emit(*args)
+    except RuntimeError:
+        pass  # la caché se destruyó (cierre de la app) mientras el hilo trabajaba
+
+
+class _BuildSignals(QObject):
+    done = pyqtSignal(object, str, list, list, str)  # key, ruta, frames, delays, error
+    chunk = pyqtSignal(object, object, list, list)  # key, cancel, frames, delays
+    finished = pyqtSignal(object, object, str)  # key, cancel, error ("" = ok)
+
+
+class _ScaleJob(QRunnable):
+    """Decodifica (o reutiliza frames nativos) y escala un ciclo completo."""
+
+    def __init__(
+        self,
+        key: FrameKey,
+        path: str,
+        size: QSize | None,
+        smooth: bool,
+        source: Tuple[List[StoredFrame], List[int]] | None,
+        signals: _BuildSignals,
+        storage: str = "argb",
+    ) -> None:
+        super().__init__()
+        self._key = key
+        self._path = path
+        self._size = QSize(size) if size is not None else None
+        self._smooth = smooth
+        self._source = source
+        self._signals = signals
+        self._storage = storage
+
+    def run(self) -> None:
+        try:
+            if self._source is not None:
+                base, delays = self._source
+                frames = [scale_frame(img, self._size, self._smooth)
+                          for img in FrameExpander().expand_all(base)]
+            else:
+                frames, delays = decode_all(self._path, self._size, self._smooth)
+            error = "sin frames legibles" if os.path.isfile(self._path) else "archivo no encontrado"
+        except Exception as exc:  # noqa: BLE001
+            frames, delays, error = [], [], str(exc) or type(exc).__name__
+        stored = FrameCompactor(self._storage).add_all(frames)
+        _emit(self._signals, "done", self._key, self._path, stored, list(delays),
+              "" if stored else error)
+
+
+class _StreamJob(QRunnable):
+    """
+    Lee y decodifica un ciclo en un hilo de trabajo, entregando frames por tandas.
+    • Los `first` primeros salen de uno en uno (arranque rápido); después se
+      agrupan cada `BATCH_S` para no saturar la cola de eventos del hilo GUI.
+    """
+
+    BATCH_S = 0.05
+
+    def __init__(
+        self,
+        key: FrameKey,
+        path: str,
+        size: QSize | None,
+        smooth: bool,
+        cancel: threading.Event,
+        signals: _BuildSignals,
+        first: int = 3,
+        storage: str = "argb",
+    ) -> None:
+        super().__init__()
+        self._key = key
+        self._path = path
+        self._size = QSize(size) if size is not None else None
+        self._smooth = smooth
+        self._cancel = cancel
+        self._signals = signals
+        self._first = first
+        self._storage = storage
+
+    def run(self) -> None:
+        reader = QImageReader(self._path)
+        if not reader.canRead():
+            error = reader.errorString() if os.path.isfile(self._path) else "archivo no encontrado"
+            _emit(self._signals, "finished", self._key, self._cancel, error)
+            return
+
+        frames: List[StoredFrame] = []
+        delays: List[int] = []
+        compactor = FrameCompactor(self._storage)
+        metrics = instrumentation()
+        sent, last = 0, time.perf_counter()
+        while not self._cancel.is_set():
+            t0 = time.perf_counter()
+            img = reader.read()
+            if img.isNull():
+                break
+            delays.append(max(reader.nextImageDelay(), 0))
+            frames.append(compactor.add(scale_frame(img, self._size, self._smooth)))
+            now = time.perf_counter()
+            metrics.record_decode(self._path, (now - t0) * 1000)
+            if sent < self._first or now - last >= self.BATCH_S:
+                _emit(self._signals, "chunk", self._key, self._cancel, frames, delays)
+                sent += len(frames)
+                frames, delays, last = [], [], now
+        if frames:
+            _emit(self._signals, "chunk", self._key, self._cancel, frames, delays)
+            sent += len(frames)
+        error = "" if sent else (reader.errorString() or "sin frames legibles")
+        _emit(self._signals, "finished", self._key, self._cancel, error)
+
+
+class _BatchJob(QRunnable):
+    """
+    Decodifica varios GIF en un pool de procesos (`utils.gif_decoder`) y
+    entrega cada uno como un `_StreamJob`: "chunk" con el ciclo y "finished".
+    • Los que se cancelan mientras esperan no se decodifican.
+    • Si el pool no arranca o se rompe, los pendientes se leen con Qt aquí;
+      igual que uno cuyo proceso falla (p. ej. MemoryError). Todos reciben
+      "finished", aunque sea con error: nadie espera para siempre.
+    """
+
+    def __init__(self, items: List[Tuple[FrameKey, str, QSize | None, bool, threading.Event]],
+                 signals: _BuildSignals, jobs: int, storage: str = "argb") -> None:
+        super().__init__()
+        self._items = [(k, p, QSize(s) if s is not None else None, sm, c)
+                       for k, p, s, sm, c in items]
+        self._signals = signals
+        self._jobs = jobs
+        self._storage = storage
+
+    def run(self) -> None:
+        # Importación diferida: multiprocessing y NumPy solo si hay lote
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from concurrent.futures.process import BrokenProcessPool
+
+        from utils.gif_decoder import decode_file
+        from utils.gif_utils import rgba_to_image
+
+        pending = list(self._items)
+        # spawn: bifurcar un proceso con hilos de Qt vivos no es seguro
+        ctx = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=self._jobs, mp_context=ctx) as pool:
+                futures = {pool.submit(decode_file, item[1]): item for item in pending}
+                for future in as_completed(futures):
+                    for waiting, (*_, cancelled) in futures.items():
+                        if cancelled.is_set():
+                            waiting.cancel()
+                    key, path, size, smooth, cancel = item = futures[future]
+                    if future.cancelled() or cancel.is_set():
+                        pending.remove(item)
+                        continue
+                    try:
+                        gif = future.result()
+                        frames = [scale_frame(rgba_to_image(f, gif.opaque), size, smooth)
+                                  for f in gif.frames]
+                    except BrokenProcessPool:
+                        raise
+                    except Exception:  # noqa: BLE001
+                        continue    # solo este GIF: sigue en `pending`, se lee con Qt
+                    pending.remove(item)
+                    error = gif.error if os.path.isfile(path) else "archivo no encontrado"
+                    self._deliver(key, cancel, frames, gif.delays, error)
+        except (BrokenProcessPool, OSError, RuntimeError):
+            pass    # sin procesos (entorno congelado, límites del sistema…)
+        for key, path, size, smooth, cancel in pending:
+            if cancel.is_set():
+                continue
+            try:
+                frames, delays = decode_all(path, size, smooth)
+                error = "sin frames legibles" if os.path.isfile(path) else "archivo no encontrado"
+            except Exception as exc:  # noqa: BLE001
+                frames, delays, error = [], [], str(exc) or type(exc).__name__
+            self._deliver(key, cancel, frames, delays, error)
+
+    def _deliver(self, key: FrameKey, cancel: threading.Event, frames: List[QImage],
+                 delays: List[int], error: str) -> None:
+        if frames:
+            stored = FrameCompactor(self._storage).add_all(frames)
+            _emit(self._signals, "chunk", key, cancel, stored, list(delays))
+        _emit(self._signals, "finished", key, cancel, "" if frames else error)
+
+
+class FrameCache:
+    """Caché LRU de FrameSet con conteo de referencias y tope de memoria."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, storage: str | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.storage = resolve_storage(storage)     # "argb", "indexed" o "delta"
+        self.identity: ContentLookup | None = None     # ruta → hash de contenido
+        self._sets: OrderedDict[FrameKey, FrameSet] = OrderedDict()
+        self._bytes = 0
+
+        self._signals = _BuildSignals()
+        self._signals.done.connect(self._on_built)
+        self._signals.chunk.connect(self._on_chunk)
+        self._signals.finished.connect(self._on_stream_finished)
+        self._building: Dict[FrameKey, List[Callable[[FrameSet], None]]] = {}
+        self._batched: List[FrameSet] | None = None    # streams retenidos por `batch()`
+
+    # ---------- API ----------
+    def acquire(
+        self,
+        path: str,
+        size: QSize | None = None,
+        smooth: bool = True,
+        stream: bool = False,
+    ) -> FrameSet:
+        """
+        Devuelve (y referencia) el FrameSet compartido de `path` a `size`.
+        • `stream=True`: si está incompleto lo llena un hilo de trabajo; el
+          llamador se entera con `FrameSet.add_listener`.
+        """
+        key = self.key_for(path, size, smooth)
+        fs = self._sets.get(key)
+        if fs is None:
+            fs = FrameSet(self, key, canonical_path(path), size, smooth)
+            self._sets[key] = fs
+        else:
+            self._sets.move_to_end(key)
+        fs.refcount += 1
+        if stream and not fs.complete and not fs.streaming:
+            self._start_stream(fs)
+        return fs
+
+    @contextmanager
+    def batch(self) -> Iterator["FrameCache"]:
+        """
+        Agrupa los `acquire(..., stream=True)` del bloque: al salir del
+        bloque exterior se decodifican juntos en un pool de procesos.
+        """
+        outer = self._batched is None
+        if outer:
+            self._batched = []
+        try:
+            yield self
+        finally:
+            if outer:
+                batched, self._batched = self._batched, None
+                # Los liberados dentro del bloque ya no cargan (`release`)
+                self._dispatch([fs for fs in batched if fs.streaming])
+
+    def peek(self, path: str, size: QSize | None = None, smooth: bool = True) -> FrameSet | None:
+        """FrameSet completo ya en caché, sin referenciarlo ni decodificar."""
+        fs = self._sets.get(self.key_for(path, size, smooth))
+        return fs if fs is not None and fs.complete else None
+
+    def prepare(
+        self,
+        path: str,
+        size: QSize | None,
+        smooth: bool,
+        on_ready: Callable[[FrameSet], None],
+    ) -> bool:
+        """
+        Garantiza un FrameSet completo de `path` a `size`.
+        • Si ya existe → llama `on_ready` al momento y devuelve True.
+        • Si no → lo construye en un hilo de trabajo (a partir de los frames
+          nativos si están en caché) y llama `on_ready` al terminar.
+        • Si el archivo ya no se puede leer, `on_ready` recibe un FrameSet
+          fallido (`failed()`, con `error`) que no queda en la caché.
+        """
+        ready = self.peek(path, size, smooth)
+        if ready is not None:
+            on_ready(ready)
+            return True
+
+        key = self.key_for(path, size, smooth)
+        waiting = self._building.get(key)
+        if waiting is not None:
+            waiting.append(on_ready)
+            return False
+        self._building[key] = [on_ready]
+
+        base = self._best_source(key, size)
+        source = (list(base.frames), list(base.delays)) if base else None
+        QThreadPool.globalInstance().start(
+            _ScaleJob(key, canonical_path(path), size, smooth, source, self._signals,
+                      storage=self.storage)
+        )
+        return False
+
+    def release(self, fs: FrameSet) -> None:
+        fs.refcount = max(fs.refcount - 1, 0)
+        if not fs.refcount and (fs.failed() or fs.streaming):
+            # Un archivo ilegible no ocupa sitio; una carga a medias sin
+            # espectadores se cancela (otro acquire la reanudará)
+            if self._sets.get(fs.key) is fs:
+                self._bytes -= fs.nbytes
+                del self._sets[fs.key]
+            fs._drop()
+        self._evict()
+
+    def key_for(self, path: str, size: QSize | None, smooth: bool = True) -> FrameKey:
+        path = canonical_path(path)
+        try:
+            st = os.stat(path)
+            mtime, fsize = st.st_mtime_ns, st.st_size
+        except OSError:
+            mtime, fsize = 0, 0
+        w, h = (size.width(), size.height()) if size is not None else (0, 0)
+        smooth = smooth if size is not None else True
+        content = self.identity(path, mtime, fsize) if self.identity and fsize else ""
+        if content:
+            # Copias idénticas: misma clave sea cual sea su ruta o su mtime
+            return (f"content:{content}", 0, fsize, w, h, smooth)
+        return (path, mtime, fsize, w, h, smooth)
+
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> dict:
+        argb = sum(fs.argb_bytes for fs in self._sets.values())
+        return {
+            "sets": len(self._sets),
+            "referenced": sum(1 for fs in self._sets.values() if fs.refcount),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "storage": self.storage,
+            "argb_bytes": argb,
+            "saved_bytes": argb - self._bytes,
+        }
+
+    def clear(self) -> None:
+        """Vacía los FrameSet sin referencias."""
+        saved, self.max_bytes = self.max_bytes, 0
+        self._evict()
+        self.max_bytes = saved
+
+    # ---------- internos ----------
+    def _start_stream(self, fs: FrameSet) -> None:
+        # Lo ya decodificado en el hilo GUI se descarta: el hilo empieza de cero
+        fs._reset_frames()
+        fs._reader = None
+        fs.streaming = True
+        fs._cancel = threading.Event()
+        if self._batched is not None:
+            self._batched.append(fs)
+        else:
+            self._dispatch([fs])
+
+    def _dispatch(self, sets: List[FrameSet]) -> None:
+        jobs = min(len(sets), os.cpu_count() or 1)
+        if len(sets) >= BATCH_MIN_SETS and jobs > 1 and _decoder_available():
+            items = [(fs.key, fs.path, fs.size, fs.smooth, fs._cancel) for fs in sets]
+            QThreadPool.globalInstance().start(
+                _BatchJob(items, self._signals, jobs, storage=self.storage)
+            )
+            return
+        for fs in sets:
+            QThreadPool.globalInstance().start(
+                _StreamJob(fs.key, fs.path, fs.size, fs.smooth, fs._cancel, self._signals,
+                           storage=self.storage)
+            )
+
+    def _streaming_set(self, key: FrameKey, cancel: threading.Event) -> FrameSet | None:
+        fs = self._sets.get(key)
+        if fs is None or fs._cancel is not cancel:
+            return None     # expulsado o ya completado por otra vía
+        return fs
+
+    def _on_chunk(
+        self, key: FrameKey, cancel: threading.Event, frames: List[StoredFrame],
+        delays: List[int],
+    ) -> None:
+        fs = self._streaming_set(key, cancel)
+        if fs is None:
+            return
+        for img, delay in zip(frames, delays):
+            fs._append(img, delay)
+        fs.decoded_frames += len(frames)
+        fs._notify()
+
+    def _on_stream_finished(self, key: FrameKey, cancel: threading.Event, error: str) -> None:
+        fs = self._streaming_set(key, cancel)
+        if fs is None:
+            return
+        fs._cancel = None
+        fs.streaming = False
+        fs.complete = True
+        fs.error = error
+        fs._notify()
+        if fs.failed() and not fs.refcount:
+            self._sets.pop(key, None)
+
+    def _best_source(self, key: FrameKey, size: QSize | None) -> FrameSet | None:
+        """El FrameSet completo más grande del mismo archivo (o contenido), si no es menor que `size`."""
+        best: FrameSet | None = None
+        for k, fs in self._sets.items():
+            if k[:3] != key[:3] or not fs.complete or not fs.frames:
+                continue
+            if best is None or fs.frames[0].width() > best.frames[0].width():
+                best = fs
+        if best is None:
+            return None
+        if size is not None and best.frames[0].width() < size.width():
+            return None     # reescalar hacia arriba perdería calidad: mejor decodificar
+        return best
+
+    def _on_built(
+        self, key: FrameKey, path: str, frames: List[StoredFrame], delays: List[int],
+        error: str,
+    ) -> None:
+        callbacks = self._building.pop(key, [])
+        fs = self._sets.get(key)
+        if not frames:
+            self._on_build_failed(key, path, fs, error, callbacks)
+            return
+        if fs is None:
+            size = QSize(key[3], key[4]) if key[3] else None
+            fs = FrameSet(self, key, path, size, key[5])
+            self._sets[key] = fs
+        if not fs.complete:
+            fs._fill(frames, delays)
+        for cb in callbacks:
+            cb(fs)
+        self._evict()
+
+    def _on_build_failed(
+        self, key: FrameKey, path: str, fs: FrameSet | None, error: str,
+        callbacks: List[Callable[[FrameSet], None]],
+    ) -> None:
+        # Nada que guardar: un FrameSet vacío sin referencias no se expulsaría nunca
+        if fs is not None and fs.complete:
+            pass    # otra vía ya lo completó (o lo dio por fallido)
+        elif fs is not None and not fs.streaming and not fs.frames:
+            fs._reader = None
+            fs.complete = True
+            fs.error = error
+            fs._notify()
+            if not fs.refcount:
+                self._sets.pop(key, None)
+        else:
+            size = QSize(key[3], key[4]) if key[3] else None
+            fs = FrameSet(self, key, path, size, key[5])
+            fs.complete = True
+            fs.error = error
+        for cb in callbacks:
+            cb(fs)
+
+    def _account(self, fs: FrameSet, grown: int) -> None:
+        self._bytes += grown
+        self._evict(keep=fs)
+
+    def _evict(self, keep: FrameSet | None = None) -> None:
+        if self._bytes <= self.max_bytes:
+            return
+        for key, fs in list(self._sets.items()):
+            if self._bytes <= self.max_bytes:
+                break
+            if fs.refcount or fs is keep:
+                continue
+            self._bytes -= fs.nbytes
+            fs._drop()
+            del self._sets[key]
+
+
+def _decoder_available() -> bool:
+    """`utils.gif_decoder` importable (NumPy es opcional)."""
+    try:
+        import utils.gif_decoder  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+_shared: FrameCache | None = None
+
+
+def shared_frame_cache() -> FrameCache:
+    """Instancia única por proceso (se crea en el primer uso)."""
+    global _shared
+    if _shared is None:
+        _shared = FrameCache()
+        instrumentation().add_provider("frame_cache", _shared.stats)
+    return _shared
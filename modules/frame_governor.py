@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+modules/frame_governor.py – Presupuesto global de FPS/CPU para todos los overlays.
+
+• Cada FramePlayer en marcha se registra con su demanda (FPS nominales
+  según retardos y velocidad) y su coste medido (ms de CPU por frame:
+  avance + pintado).
+• Presupuesto: `max_fps` frames/s en total y/o `max_cpu_ms` ms de CPU por
+  segundo (0 = sin límite). Configurable por entorno:
+  DESKTOPGIF_MAX_FPS, DESKTOPGIF_MAX_CPU_MS, DESKTOPGIF_GOVERNOR_MODE.
+• Reparto: el overlay con prioridad (primer plano o último con el que se
+  interactuó) recibe primero lo que pide; el resto se reparte a partes
+  iguales ("water-filling") entre los demás.
+• Degradación: "skip" salta frames manteniendo la velocidad real de la
+  animación; "clamp" alarga el retardo (la animación va más lenta).
+• Instrumentación: `decisions()`, `stats()` y la señal `decisionMade`.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Protocol
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from utils.instrumentation import instrumentation
+
+GOVERNOR_MODES = ("skip", "clamp")
+MAX_FPS_ENV = "DESKTOPGIF_MAX_FPS"
+MAX_CPU_ENV = "DESKTOPGIF_MAX_CPU_MS"
+MODE_ENV = "DESKTOPGIF_GOVERNOR_MODE"
+
+DEFAULT_MAX_FPS = 240.0         # frames/s sumando todos los overlays
+DEFAULT_MAX_CPU_MS = 300.0      # ms de CPU por segundo (30 % de un núcleo)
+REBALANCE_MS = 500              # recálculo periódico del reparto cerca del límite
+RELAXED_REBALANCE_MS = 5000     # ... y lejos de él (menos despertares)
+COST_SMOOTHING = 0.2            # EMA del coste por frame
+HISTORY = 200                   # decisiones conservadas
+MIN_CLIENT_FPS = 2.0            # el prioritario nunca deja a los demás por debajo de esto
+
+
+class GovernedClient(Protocol):
+    label: str
+
+    def nominal_fps(self) -> float:
+        ...
+
+
+class _Allowance:
+    __slots__ = ("demand", "allowed", "step", "min_interval_ms", "cost_ms")
+
+    def __init__(self) -> None:
+        self.demand = 0.0
+        self.allowed = math.inf
+        self.step = 1
+        self.min_interval_ms = 0.0
+        self.cost_ms = 0.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(float(os.environ.get(name, default)), 0.0)
+    except ValueError:
+        return default
+
+
+def water_fill(demands: List[float], budget: float) -> List[float]:
+    """Reparte `budget` entre `demands`: nadie recibe más de lo que pide."""
+    allowed = [0.0] * len(demands)
+    order = sorted(range(len(demands)), key=lambda i: demands[i])
+    left, n = budget, len(demands)
+    for pos, i in enumerate(order):
+        share = left / (n - pos)
+        allowed[i] = min(demands[i], share)
+        left -= allowed[i]
+    return allowed
+
+
+class FrameGovernor(QObject):
+    """Limita los frames/s y la CPU del conjunto de overlays."""
+
+    decisionMade = pyqtSignal(dict)
+
+    def __init__(
+        self,
+        max_fps: float | None = None,
+        max_cpu_ms: float | None = None,
+        mode: str | None = None,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.max_fps = _env_float(MAX_FPS_ENV, DEFAULT_MAX_FPS) if max_fps is None else max_fps
+        self.max_cpu_ms = (
+            _env_float(MAX_CPU_ENV, DEFAULT_MAX_CPU_MS) if max_cpu_ms is None else max_cpu_ms
+        )
+        mode = mode or os.environ.get(MODE_ENV, "skip")
+        self.mode = mode if mode in GOVERNOR_MODES else "skip"
+
+        self._clients: Dict[GovernedClient, _Allowance] = {}
+        self._priority: GovernedClient | None = None
+        self._decisions: Deque[dict] = deque(maxlen=HISTORY)
+        self._throttled = False
+        self.rebalances = 0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REBALANCE_MS)
+        self._timer.timeout.connect(self.rebalance)
+
+    # ---------- registro ----------
+    def register(self, client: GovernedClient) -> None:
+        if client not in self._clients:
+            self._clients[client] = _Allowance()
+            self._timer.start()
+            self.rebalance()
+
+    def unregister(self, client: GovernedClient) -> None:
+        if self._clients.pop(client, None) is None:
+            return
+        if self._priority is client:
+            self._priority = None
+        if not self._clients:
+            self._timer.stop()
+        self.rebalance()
+
+    def touch(self, client: GovernedClient) -> None:
+        """`client` pasa a ser el prioritario (primer plano / última interacción)."""
+        if client in self._clients and self._priority is not client:
+            self._priority = client
+            self.rebalance()
+
+    def configure(
+        self, max_fps: float | None = None, max_cpu_ms: float | None = None, mode: str | None = None
+    ) -> None:
+        if max_fps is not None:
+            self.max_fps = max(max_fps, 0.0)
+        if max_cpu_ms is not None:
+            self.max_cpu_ms = max(max_cpu_ms, 0.0)
+        if mode in GOVERNOR_MODES:
+            self.mode = mode
+        self.rebalance()
+
+    # ---------- consultas del reproductor ----------
+    def step_for(self, client: GovernedClient, delay_ms: float) -> int:
+        """
+        Frames a avanzar en el próximo tick (>1 = salto de frames) para un
+        frame que dura `delay_ms`: se calcula con el retardo real, no con la
+        demanda media, para no saltar de más en GIFs de retardo variable.
+        """
+        allowance = self._clients.get(client)
+        if allowance is None or self.mode != "skip" or math.isinf(allowance.allowed):
+            return 1
+        return max(1, math.ceil(1000.0 / max(delay_ms, 1.0) / allowance.allowed))
+
+    def min_interval_for(self, client: GovernedClient) -> float:
+        """Intervalo mínimo entre frames en modo "clamp" (ms)."""
+        allowance = self._clients.get(client)
+        return allowance.min_interval_ms if allowance is not None and self.mode == "clamp" else 0.0
+
+    def record_cost(self, client: GovernedClient, ms: float) -> None:
+        """Coste (CPU) de un frame de `client`: media móvil exponencial."""
+        allowance = self._clients.get(client)
+        if allowance is not None:
+            if allowance.cost_ms:
+                allowance.cost_ms += COST_SMOOTHING * (ms - allowance.cost_ms)
+            else:
+                allowance.cost_ms = ms
+
+    # ---------- instrumentación ----------
+    def decisions(self) -> List[dict]:
+        return list(self._decisions)
+
+    def last_decision(self) -> dict | None:
+        return self._decisions[-1] if self._decisions else None
+
+    def is_throttling(self) -> bool:
+        return self._throttled
+
+    def stats(self) -> dict:
+        demand = sum(a.demand for a in self._clients.values())
+        granted = sum(min(a.allowed, a.demand) for a in self._clients.values())
+        return {
+            "clients": len(self._clients),
+            "mode": self.mode,
+            "max_fps": self.max_fps,
+            "max_cpu_ms": self.max_cpu_ms,
+            "demand_fps": round(demand, 2),
+            "granted_fps": round(granted, 2),
+            "est_cpu_ms": round(sum(a.cost_ms * min(a.allowed, a.demand)
+                                    for a in self._clients.values()), 2),
+            "throttling": self._throttled,
+            "rebalances": self.rebalances,
+        }
+
+    # ---------- reparto ----------
+    def rebalance(self) -> None:
+        clients = list(self._clients)
+        for client in clients:
+            self._clients[client].demand = max(client.nominal_fps(), 0.0)
+        self.rebalances += 1
+
+        allowed = self._allocate(clients, self.max_fps, lambda a: 1.0)
+        if self.max_cpu_ms:
+            by_cpu = self._allocate(clients, self.max_cpu_ms, lambda a: a.cost_ms)
+            allowed = [min(f, c) for f, c in zip(allowed, by_cpu)]
+
+        throttled = False
+        for client, fps in zip(clients, allowed):
+            a = self._clients[client]
+            if fps < a.demand - 1e-6:
+                throttled = True
+                a.allowed = max(fps, MIN_CLIENT_FPS)
+                a.step = max(1, math.ceil(a.demand / a.allowed))
+                a.min_interval_ms = 1000.0 / a.allowed
+            else:
+                a.allowed = math.inf
+                a.step = 1
+                a.min_interval_ms = 0.0
+
+        changed = throttled or self._throttled
+        self._throttled = throttled
+        if changed:
+            self._record(clients)
+        if self._clients:
+            near = throttled or self._load() > 0.5
+            self._timer.setInterval(REBALANCE_MS if near else RELAXED_REBALANCE_MS)
+
+    def _load(self) -> float:
+        """Fracción del presupuesto más ajustado que se está pidiendo."""
+        load = 0.0
+        if self.max_fps:
+            load = sum(a.demand for a in self._clients.values()) / self.max_fps
+        if self.max_cpu_ms:
+            cpu = sum(a.demand * a.cost_ms for a in self._clients.values())
+            load = max(load, cpu / self.max_cpu_ms)
+        return load
+
+    def _allocate(self, clients: List[GovernedClient], budget: float, unit) -> List[float]:  # noqa: ANN001
+        """
+        FPS permitidos por cliente para un presupuesto en "unidades por
+        segundo" (frames o ms de CPU): el prioritario primero, luego reparto.
+        """
+        if not budget:
+            return [math.inf] * len(clients)
+        costs = [unit(self._clients[c]) for c in clients]
+        demands = [self._clients[c].demand * cost for c, cost in zip(clients, costs)]
+        granted = [0.0] * len(clients)
+        left = budget
+        if self._priority in self._clients:
+            p = clients.index(self._priority)
+            reserve = sum(
+                min(demands[i], MIN_CLIENT_FPS * costs[i]) for i in range(len(clients)) if i != p
+            )
+            granted[p] = min(demands[p], max(left - reserve, 0.0))
+            left -= granted[p]
+        rest = [i for i in range(len(clients)) if clients[i] is not self._priority]
+        for i, share in zip(rest, water_fill([demands[i] for i in rest], left)):
+            granted[i] = share
+        return [
+            g / cost if cost > 0 else math.inf
+            for g, cost in zip(granted, costs)
+        ]
+
+    def _record(self, clients: List[GovernedClient]) -> None:
+        decision = {
+            "t": round(time.time(), 3),
+            "mode": self.mode,
+            "max_fps": self.max_fps,
+            "max_cpu_ms": self.max_cpu_ms,
+            "throttling": self._throttled,
+            "clients": [
+                {
+                    "label": getattr(c, "label", repr(c)),
+                    "priority": c is self._priority,
+                    "demand_fps": round(a.demand, 2),
+                    "allowed_fps": round(min(a.allowed, a.demand), 2),
+                    "step": a.step,
+                    "min_interval_ms": round(a.min_interval_ms, 2),
+                    "cost_ms": round(a.cost_ms, 3),
+                }
+                for c, a in ((c, self._clients[c]) for c in clients)
+            ],
+        }
+        self._decisions.append(decision)
+        self.decisionMade.emit(decision)
+
+
+_shared: FrameGovernor | None = None
+
+
+def shared_governor() -> FrameGovernor:
+    """Gobernador único del proceso (se crea en el primer uso)."""
+    global _shared
+    if _shared is None:
+        _shared = FrameGovernor()
+        instrumentation().add_provider("governor", _shared.stats)
+    return _shared
@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+modules/frame_player.py – Reproduce un FrameSet de la caché compartida.
+
+• Sustituye a QMovie: el primer ciclo decodifica (una vez por proceso),
+  los siguientes solo avanzan un índice sobre frames ya decodificados.
+• Velocidad en %, igual que `QMovie.setSpeed`.
+• Sin timer propio: lo despierta el reloj compartido (`modules.animation_clock`).
+• Con un FrameSet que se llena en segundo plano arranca en cuanto hay
+  `START_BUFFER_FRAMES` frames y, si alcanza al decodificador, espera
+  (sin ticks) a que lleguen más; `loadFailed` si el archivo no se pudo leer.
+• `pause()`/`resume()`: sale del reloj y vuelve en el mismo frame, con el
+  retardo que le faltaba (lo usa `modules.power_policy`).
+• Presupuesto global (`modules.frame_governor`): si el conjunto de overlays
+  se pasa, salta frames (manteniendo la velocidad real) o alarga el retardo.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from modules.animation_clock import AnimationClock, now_ms, shared_clock
+from modules.frame_cache import FrameSet
+from modules.frame_governor import FrameGovernor, shared_governor
+from modules.frame_storage import FrameExpander
+from utils.instrumentation import OverlayMetrics
+
+MIN_DELAY_MS = 10           # GIFs con retardo 0: evita un bucle ocupado
+START_BUFFER_FRAMES = 3     # frames por delante antes de (re)arrancar
+
+
+class FramePlayer(QObject):
+    frameChanged = pyqtSignal(int)
+    loadFailed = pyqtSignal(str)        # motivo
+
+    def __init__(
+        self,
+        frames: FrameSet,
+        speed: int = 100,
+        parent: QObject | None = None,
+        clock: AnimationClock | None = None,
+        governor: FrameGovernor | None = None,
+        metrics: OverlayMetrics | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.label = os.path.basename(frames.path)
+        self._frames = frames
+        self._expander = FrameExpander()    # propio: otros reproducen el mismo FrameSet
+        self._speed = max(speed, 1)
+        self._index = 0
+        self._image = QImage()
+        self._delay = 0
+        self._deadline: float | None = None
+        self._waiting = False           # reproduciendo, pero sin frames aún
+        self._resume_at = 0
+        self._paused = False
+        self._remaining: float | None = None   # ms del frame actual al pausar
+        self._step = 1                  # frames que avanza el próximo tick
+        self._paint_ms = 0.0            # coste de pintado pendiente de informar
+
+        self._clock = clock or shared_clock()
+        self._governor = governor or shared_governor()
+        self._hold = 0.0                # ms programados para el frame actual
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.target_fps_fn = self.nominal_fps
+
+    # ---------- API ----------
+    def start(self) -> None:
+        self._deadline = None
+        self._frames.add_listener(self._on_frames_loaded)
+        self._governor.register(self)
+        self._wait_for(self._index)
+        self._on_frames_loaded()
+
+    def stop(self) -> None:
+        self._waiting = False
+        self._frames.remove_listener(self._on_frames_loaded)
+        self._clock.cancel(self)
+        self._governor.unregister(self)
+
+    def is_running(self) -> bool:
+        return self._waiting or self._clock.is_scheduled(self)
+
+    def is_buffering(self) -> bool:
+        return self._waiting
+
+    def pause(self) -> bool:
+        """Detiene la reproducción recordando dónde estaba. False si no corría."""
+        if self._paused or not self.is_running():
+            return False
+        deadline = self._clock.deadline(self)
+        self._remaining = max(deadline - now_ms(), 0.0) if deadline is not None else None
+        self.stop()
+        self._paused = True
+        return True
+
+    def resume(self) -> None:
+        """Sigue en el mismo frame; solo espera lo que le faltaba al pausar."""
+        if not self._paused:
+            return
+        self._paused = False
+        if self._remaining is None:
+            self.start()            # estaba esperando frames
+            return
+        self._frames.add_listener(self._on_frames_loaded)
+        self._governor.register(self)
+        self._deadline = self._clock.schedule(self, self._remaining)
+
+    def is_paused(self) -> bool:
+        return self._paused
+
+    def clock(self) -> AnimationClock:
+        return self._clock
+
+    def governor(self) -> FrameGovernor:
+        return self._governor
+
+    def on_clock_tick(self, now: float) -> None:
+        metrics = self.metrics
+        if metrics is not None and self._deadline is not None and self._hold > 0:
+            late = now - self._deadline
+            if late > self._hold:
+                metrics.dropped += int(late // self._hold)     # frames que no llegaron a verse
+        t0 = time.perf_counter()
+        self._advance()
+        tick = (time.perf_counter() - t0) * 1000
+        self._governor.record_cost(self, tick + self._paint_ms)
+        self._paint_ms = 0.0
+        if metrics is not None:
+            metrics.tick.add(tick)
+
+    def record_paint_cost(self, ms: float) -> None:
+        """Tiempo de pintado del último frame; se suma al coste del tick siguiente."""
+        self._paint_ms += ms
+        if self.metrics is not None:
+            self.metrics.paint.add(ms)
+
+    def touch(self) -> None:
+        """El usuario interactúa con este overlay: prioridad en el presupuesto."""
+        self._governor.touch(self)
+
+    def nominal_fps(self) -> float:
+        """Frames/s que pediría sin presupuesto (retardos conocidos + velocidad)."""
+        delays = self._frames.delays
+        if not delays:
+            return 0.0      # aún sin frames: demanda desconocida
+        mean = sum(max(d, MIN_DELAY_MS) for d in delays) / len(delays)
+        return 1000.0 * self._speed / 100 / mean
+
+    def set_speed(self, speed: int) -> None:
+        self._speed = max(speed, 1)
+        if self.is_running():
+            self._governor.rebalance()
+
+    def set_frames(self, frames: FrameSet) -> None:
+        """Cambia de FrameSet (p. ej. otro tamaño) conservando el frame actual."""
+        running = self.is_running()
+        self._frames.remove_listener(self._on_frames_loaded)
+        self._frames = frames
+        self._expander.reset()      # no retener los frames del anterior
+        if running:
+            frames.add_listener(self._on_frames_loaded)
+        if self._waiting:
+            self._on_frames_loaded()
+        else:
+            self._show(self._index)
+
+    def frames(self) -> FrameSet:
+        return self._frames
+
+    def current_index(self) -> int:
+        return self._index
+
+    def current_image(self) -> QImage:
+        return self._image
+
+    def current_delay(self) -> int:
+        """Retardo del frame actual ya ajustado a la velocidad (ms)."""
+        return max(self._delay, MIN_DELAY_MS) * 100 // self._speed
+
+    # ---------- internos ----------
+    def _show(self, index: int) -> bool:
+        found = self._frames.frame(index, self._expander)
+        if found is None:
+            return False
+        count = len(self._frames.frames)
+        self._index = index % count if self._frames.complete else index
+        self._image, self._delay = found
+        self.frameChanged.emit(self._index)
+        if self.metrics is not None:
+            self.metrics.record_frame()
+        return True
+
+    def _advance(self) -> None:
+        fs = self._frames
+        nxt = self._index + self._step
+        if fs.complete and fs.frames:
+            nxt %= len(fs.frames)
+        elif self._step > 1 and nxt >= len(fs.frames):
+            nxt = max(len(fs.frames) - 1, self._index + 1)    # no saltar más allá de lo cargado
+        if self._show(nxt):
+            if self.metrics is not None and self._step > 1:
+                self.metrics.skipped += self._step - 1
+            self._schedule()
+        elif not self._frames.complete:
+            self._wait_for(nxt)     # el decodificador va por detrás
+
+    def _wait_for(self, index: int) -> None:
+        self._waiting = True
+        self._resume_at = index
+
+    def _buffered(self) -> bool:
+        fs = self._frames
+        if fs.complete or not fs.streaming:
+            return True     # sin hilo de trabajo: `frame()` decodifica al vuelo
+        return len(fs.frames) >= self._resume_at + START_BUFFER_FRAMES
+
+    def _on_frames_loaded(self) -> None:
+        if not self._waiting:
+            return
+        if self._frames.failed():
+            self.stop()
+            self.loadFailed.emit(self._frames.error or "sin frames legibles")
+            return
+        if self._buffered():
+            self._waiting = False
+            self._deadline = None
+            if self._show(self._resume_at):
+                self._governor.rebalance()      # ya hay retardos: demanda conocida
+                self._schedule()
+            elif self._frames.failed():
+                self.stop()
+                self.loadFailed.emit(self._frames.error or "sin frames legibles")
+
+    def _schedule(self) -> None:
+        self._step = self._governor.step_for(self, self.current_delay())
+        hold = self._hold_ms(self._step)
+        self._hold = max(hold, self._governor.min_interval_for(self))
+        self._deadline = self._clock.schedule(self, self._hold, after=self._deadline)
+
+    def _hold_ms(self, step: int) -> float:
+        """Tiempo en pantalla del frame actual si se saltan los `step - 1` siguientes."""
+        if step == 1:
+            return self.current_delay()
+        fs, total = self._frames, 0
+        for j in range(step):
+            i = self._index + j
+            if fs.complete and fs.delays:
+                i %= len(fs.delays)
+            delay = fs.delays[i] if i < len(fs.delays) else self._delay
+            total += max(delay, MIN_DELAY_MS)
+        return total * 100 // self._speed
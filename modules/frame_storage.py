@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+modules/frame_storage.py – Formato en memoria de los frames de la caché.
+
+• "argb" (por defecto): cada frame es una QImage ARGB32 premultiplicada,
+  lista para pintar (4 bytes por píxel).
+• "indexed": QImage Indexed8 + su tabla de color (1 byte por píxel) si el
+  frame tiene como mucho 256 colores; si no, se queda en ARGB. Los colores
+  se cuentan con NumPy (dependencia opcional): sin él, equivale a "argb".
+• "delta": un frame completo cada `KEYFRAME_EVERY` (o cuando cambia más de
+  `DELTA_MAX_AREA` del lienzo) y, entre medias, solo el rectángulo que
+  cambia respecto al anterior. Sin dependencias.
+• Sin pérdida en los dos casos: expandido, el frame es idéntico al ARGB.
+• `FrameCompactor` convierte en los hilos de trabajo, a medida que se
+  decodifica; `FrameExpander` reconstruye en el hilo GUI justo antes de
+  pintar, recordando el último frame (la reproducción es secuencial).
+  Hay uno por consumidor (`FramePlayer`): varios overlays sobre el mismo
+  juego de frames, cada uno en su índice, no se pisan.
+• Se elige con `DESKTOPGIF_FRAME_STORAGE=argb|indexed|delta`.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import List, Union
+
+from PyQt6.QtCore import QRect
+from PyQt6.QtGui import QImage, QPainter, qUnpremultiply
+
+FRAME_STORAGES = ("argb", "indexed", "delta")
+FRAME_STORAGE_ENV = "DESKTOPGIF_FRAME_STORAGE"
+
+KEYFRAME_EVERY = 32         # acota lo que hay que recomponer en un salto
+DELTA_MAX_AREA = 0.5        # más cambio que esto: frame completo
+
+_ARGB = QImage.Format.Format_ARGB32_Premultiplied
+
+
+@dataclass
+class FrameDelta:
+    """Rectángulo que cambia respecto al frame anterior (`patch` nula: ninguno)."""
+    x: int
+    y: int
+    patch: QImage
+
+
+StoredFrame = Union[QImage, FrameDelta]
+
+
+def resolve_storage(mode: str | None = None) -> str:
+    """Formato efectivo: el de `mode` o el entorno; "indexed" cae a "argb" sin NumPy."""
+    mode = mode or os.environ.get(FRAME_STORAGE_ENV, "argb")
+    if mode not in FRAME_STORAGES:
+        mode = "argb"
+    if mode == "indexed" and _numpy() is None:
+        return "argb"
+    return mode
+
+
+def stored_bytes(frame: StoredFrame) -> int:
+    """Memoria de un frame guardado (píxeles + tabla de color)."""
+    if isinstance(frame, FrameDelta):
+        return frame.patch.sizeInBytes()
+    return frame.sizeInBytes() + 4 * frame.colorCount()
+
+
+def argb_bytes(frame: QImage) -> int:
+    """Lo que ocuparía en ARGB32 un frame completo de las dimensiones de `frame`."""
+    return 4 * frame.width() * frame.height()
+
+
+def dirty_rect(previous: QImage, image: QImage, max_area: int | None = None) -> QRect | None:
+    """
+    Rectángulo mínimo con los píxeles que difieren (vacío si son iguales;
+    32 bits). None en cuanto supera `max_area` píxeles: no hace falta más.
+    """
+    bpl = image.bytesPerLine()
+    old = previous.constBits().asstring(previous.sizeInBytes())
+    new = image.constBits().asstring(image.sizeInBytes())
+    top, bottom, left, right = -1, -1, bpl, -1
+    for y in range(image.height()):
+        start = y * bpl
+        a, b = old[start:start + bpl], new[start:start + bpl]
+        if a == b:
+            continue
+        # XOR de la fila como entero: el bit más bajo y el más alto a 1
+        # dan el primer y el último byte distintos
+        diff = int.from_bytes(a, "little") ^ int.from_bytes(b, "little")
+        left = min(left, ((diff & -diff).bit_length() - 1) // 32)
+        right = max(right, (diff.bit_length() - 1) // 32)
+        if top < 0:
+            top = y
+        bottom = y
+        if max_area is not None and (right - left + 1) * (bottom - top + 1) > max_area:
+            return None
+    if top < 0:
+        return QRect()
+    return QRect(left, top, right - left + 1, bottom - top + 1)
+
+
+class FrameCompactor:
+    """Convierte, en orden, los frames ARGB32 premultiplicados de una animación."""
+
+    def __init__(self, storage: str = "argb") -> None:
+        self.storage = storage
+        self._previous: QImage | None = None
+        self._since_key = 0
+
+    def add(self, image: QImage) -> StoredFrame:
+        if self.storage == "indexed":
+            indexed = _to_indexed(image)
+            return indexed if indexed is not None else image
+        if self.storage == "delta":
+            return self._delta(image)
+        return image
+
+    def add_all(self, images: List[QImage]) -> List[StoredFrame]:
+        return [self.add(img) for img in images]
+
+    def _delta(self, image: QImage) -> StoredFrame:
+        previous, self._previous = self._previous, image
+        self._since_key += 1
+        if previous is None or self._since_key >= KEYFRAME_EVERY \
+                or previous.size() != image.size():
+            self._since_key = 0
+            return image
+        rect = dirty_rect(previous, image, int(DELTA_MAX_AREA * image.width() * image.height()))
+        if rect is None:
+            self._since_key = 0
+            return image
+        return FrameDelta(rect.x(), rect.y(), image.copy(rect) if not rect.isEmpty() else QImage())
+
+
+class FrameExpander:
+    """
+    Devuelve frames guardados como QImage ARGB32 premultiplicada.
+    • Recuerda el último frame reconstruido: avanzar de uno en uno solo
+      pinta el rectángulo nuevo; un salto recompone desde el frame completo
+      anterior (a lo sumo `KEYFRAME_EVERY` - 1 rectángulos).
+    • Lo recordado vale para una lista `frames` concreta: otra lista (otro
+      FrameSet, o el mismo tras reconstruirse) empieza de cero.
+    """
+
+    def __init__(self) -> None:
+        self._frames: List[StoredFrame] | None = None
+        self._index = -1
+        self._image = QImage()
+
+    def reset(self) -> None:
+        self._frames, self._index, self._image = None, -1, QImage()
+
+    def expand(self, frames: List[StoredFrame], index: int) -> QImage:
+        if frames is not self._frames:
+            self.reset()
+            self._frames = frames
+        elif index == self._index:
+            return self._image
+        frame = frames[index]
+        if isinstance(frame, QImage):
+            image = frame if frame.format() == _ARGB else frame.convertToFormat(_ARGB)
+            self._index, self._image = index, image
+            return image
+
+        start = index
+        while isinstance(frames[start], FrameDelta):
+            start -= 1
+        if start <= self._index < index:
+            base, first = self._image, self._index + 1
+        else:
+            base, first = self.expand(frames, start), start + 1
+        patches = [d for d in frames[first:index + 1] if not d.patch.isNull()]
+        image = base
+        if patches:
+            image = base.copy()
+            painter = QPainter(image)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+            for delta in patches:
+                painter.drawImage(delta.x, delta.y, delta.patch)
+            painter.end()
+        self._index, self._image = index, image
+        return image
+
+    def expand_all(self, frames: List[StoredFrame]) -> List[QImage]:
+        return [self.expand(frames, i) for i in range(len(frames))]
+
+
+# ---------- internos ----------
+def _numpy():  # noqa: ANN202
+    try:
+        import numpy  # type: ignore[import-not-found]
+    except ImportError:
+        return None
+    return numpy
+
+
+def _to_indexed(image: QImage) -> QImage | None:
+    """Indexed8 equivalente a `image` (ARGB32 premultiplicada) o None si no es exacto."""
+    np = _numpy()
+    if np is None or image.format() != _ARGB:
+        return None
+    width, height = image.width(), image.height()
+    pixels = np.frombuffer(image.constBits().asstring(image.sizeInBytes()), np.uint32)
+    colors, inverse = np.unique(pixels, return_inverse=True)
+    if len(colors) > 256:
+        return None
+    data = inverse.astype(np.uint8).tobytes()
+    indexed = QImage(data, width, height, width, QImage.Format.Format_Indexed8).copy()
+    # La tabla de Indexed8 no va premultiplicada: un semitransparente puede
+    # no volver idéntico (redondeo); entonces se queda en ARGB
+    indexed.setColorTable([qUnpremultiply(int(c)) for c in colors])
+    if indexed.convertToFormat(_ARGB) != image:
+        return None
+    return indexed
@@ -8,25 +8,111 @@ modules/overlay.py – Ventana flotante para mostrar un GIF reescalable.
 • Menú contextual con escalas rápidas, opacidad y velocidad.
 • Modo fantasma solo se activa/desactiva desde la biblioteca.
 • Callback opcional `on_close(x, y, scale, opacity, speed, ghost)` para persistir estado.
+• Opacidad por ventana (compositor) o pintando con QPainter.setOpacity;
+  QGraphicsOpacityEffect queda solo como modo "effect" explícito.
+• Los frames salen de la caché compartida (`modules.frame_cache`): un GIF
+  abierto en varios overlays, o reabierto, no se vuelve a decodificar.
+• Carga asíncrona: lectura y decode en un hilo de trabajo; la ventana nace
+  con su tamaño final (metadatos en caché o cabecera GIF) y reproduce en
+  cuanto hay frames.
+  Un archivo ilegible se notifica con `loadFailed` y la ventana se cierra.
+• Ahorro de energía (`modules.power_policy`): la animación se pausa si la
+  ventana no se ve o tras un periodo de inactividad.
+• Presupuesto global de FPS/CPU (`modules.frame_governor`): el overlay con
+  el que se interactuó por última vez tiene prioridad.
 """
 
 from __future__ import annotations
 
+import os
+import time
 from typing import Callable, Optional, cast
 
-from PyQt6.QtCore import QPoint, QSize, Qt
-from PyQt6.QtGui import QAction, QContextMenuEvent, QMouseEvent, QMovie
+from PyQt6.QtCore import QEvent, QPoint, QSize, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import (
+    QAction,
+    QContextMenuEvent,
+    QGuiApplication,
+    QImage,
+    QMouseEvent,
+    QPainter,
+    QPaintEvent,
+)
 from PyQt6.QtWidgets import (
-    QLabel,
     QMainWindow,
     QMenu,
     QSlider,
+    QWidget,
     QWidgetAction,
     QGraphicsOpacityEffect
 )
 
+from modules.animation_clock import AnimationClock
+from modules.frame_cache import FrameCache, FrameSet, shared_frame_cache
+from modules.frame_player import FramePlayer
+from modules.power_policy import PowerPolicy
+from utils.instrumentation import instrumentation
+from utils.gif_utils import gif_header_size
+
+OPACITY_MODES = ("auto", "window", "painter", "effect")
+OPACITY_MODE_ENV = "DESKTOPGIF_OPACITY_MODE"
+
+# Plataformas donde setWindowOpacity lo aplica el compositor sin coste por frame
+_WINDOW_OPACITY_PLATFORMS = {"windows", "cocoa", "wayland"}
+
+
+def window_opacity_supported() -> bool:
+    return QGuiApplication.platformName().lower() in _WINDOW_OPACITY_PLATFORMS
+
+
+def resolve_opacity_mode(mode: str) -> str:
+    """Modo efectivo: "auto"/"window" caen a "painter" si la plataforma no lo soporta."""
+    if mode not in OPACITY_MODES:
+        mode = "auto"
+    if mode in ("auto", "window"):
+        return "window" if window_opacity_supported() else "painter"
+    return mode
+
+
+class _FrameView(QWidget):
+    """Pinta el frame actual (QImage premultiplicada) sin pasar por QLabel/QMovie."""
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._image = QImage()
+        self._opacity = 1.0
+        self.on_painted: Callable[[float], None] | None = None     # ms de pintado
+
+    def set_image(self, image: QImage) -> None:
+        self._image = image
+        self.update()
+
+    def set_opacity(self, value: float) -> None:
+        """Opacidad aplicada al pintar (modo "painter"): sin pasada fuera de pantalla."""
+        self._opacity = value
+        self.update()
+
+    def paintEvent(self, event: QPaintEvent) -> None:  # noqa: N802
+        if self._image.isNull():
+            return
+        t0 = time.perf_counter()
+        painter = QPainter(self)
+        if self._opacity < 1.0:
+            painter.setOpacity(self._opacity)
+        if self._image.size() == self.size():
+            painter.drawImage(0, 0, self._image)
+        else:
+            painter.drawImage(self.rect(), self._image)
+        painter.end()
+        if self.on_painted is not None:
+            self.on_painted((time.perf_counter() - t0) * 1000)
+
 
 class GifOverlay(QMainWindow):
+    closed = pyqtSignal(str)          # gif_path, al cerrarse la ventana
+    loaded = pyqtSignal(str)          # gif_path, primer frame en pantalla
+    loadFailed = pyqtSignal(str, str)  # gif_path, motivo
+
     def __init__(
         self,
         gif_path: str,
@@ -35,6 +121,13 @@ class GifOverlay(QMainWindow):
         speed: int = 100,
         ghost: bool = False,
         on_close: Optional[Callable[[int, int, int, float, int, bool], None]] = None,
+        frame_cache: FrameCache | None = None,
+        clock: AnimationClock | None = None,
+        smooth_scaling: bool = True,
+        opacity_mode: str | None = None,
+        pause_when_hidden: bool = True,
+        idle_pause_s: int = 0,
+        original_size: QSize | None = None,
     ) -> None:
         super().__init__()
         self.gif_path = gif_path
@@ -42,11 +135,17 @@ class GifOverlay(QMainWindow):
         self.opacity_value = max(0.1, min(opacity, 1.0))
         self.speed_value = max(10, min(speed, 400))
         self.ghost_enabled = ghost
+        self.smooth_scaling = smooth_scaling
+        self.opacity_mode = resolve_opacity_mode(
+            opacity_mode or os.environ.get(OPACITY_MODE_ENV, "auto")
+        )
         self._on_close = on_close
 
         # Para arrastre
         self._drag_origin: QPoint | None = None
         self._original_size: QSize | None = None
+        self._loaded = False
+        self._failed = False
 
         # ---------- Config ventana ----------
         self.setWindowFlags(
@@ -57,21 +156,41 @@ class GifOverlay(QMainWindow):
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, True)
 
         # ---------- Cargar GIF ----------
-        self._label = QLabel(self)
-        self._movie = QMovie(self.gif_path)
-
-        if not self._movie.isValid():
-            raise FileNotFoundError(f"GIF inválido o no encontrado: {gif_path}")
+        # Tamaño original: el de los metadatos en caché de la librería o, si
+        # no se pasó, los 10 bytes de cabecera (sin decodificar); otros
+        # formatos lo toman del primer frame
+        if original_size is not None and not original_size.isEmpty():
+            self._original_size = QSize(original_size)
+        else:
+            header = gif_header_size(self.gif_path)
+            if header is not None:
+                self._original_size = QSize(*header)
 
-        self._label.setMovie(self._movie)
+        self._label = _FrameView(self)
         self.setCentralWidget(self._label)
 
-        self._movie.frameChanged.connect(self._on_first_frame)
-        self._movie.start()
+        # El archivo se lee y decodifica en un hilo de trabajo
+        self._cache = frame_cache or shared_frame_cache()
+        self._frames: FrameSet = self._cache.acquire(
+            self.gif_path, self._target_size(), self.smooth_scaling, stream=True
+        )
+        self.metrics = instrumentation().add_overlay(self._frames.path)
+        self.metrics.cache_bytes_fn = self._cache_bytes
+        self._player = FramePlayer(
+            self._frames, self.speed_value, parent=self, clock=clock, metrics=self.metrics
+        )
+        self._player.frameChanged.connect(self._on_frame)
+        self._player.loadFailed.connect(self._on_load_failed)
+        self._label.on_painted = self._player.record_paint_cost
+        self._player.start()
+        self.apply_scale(self.scale_percent)
+        self.power = PowerPolicy(self, self._player, pause_when_hidden, idle_pause_s)
 
         # ---------- Opacidad ----------
-        self._opacity_effect = QGraphicsOpacityEffect(self)
-        self._label.setGraphicsEffect(self._opacity_effect)
+        self._opacity_effect: QGraphicsOpacityEffect | None = None
+        if self.opacity_mode == "effect":
+            self._opacity_effect = QGraphicsOpacityEffect(self)
+            self._label.setGraphicsEffect(self._opacity_effect)
         self.set_opacity(self.opacity_value)
 
         # ---------- Velocidad ----------
@@ -81,31 +200,101 @@ class GifOverlay(QMainWindow):
         self.set_ghost_mode(self.ghost_enabled)
 
     # ------------------------------------------------------------------
-    def _on_first_frame(self) -> None:
-        self._original_size = self._movie.currentPixmap().size()
-        self.apply_scale(self.scale_percent)
-        self._movie.frameChanged.disconnect(self._on_first_frame)
+    def _on_frame(self, _index: int) -> None:
+        self._label.set_image(self._player.current_image())
+        if self._original_size is None:
+            # Cabecera sin tamaño: se toma del primer frame decodificado
+            self._original_size = self._player.current_image().size()
+            self.apply_scale(self.scale_percent)
+        if not self._loaded:
+            self._loaded = True
+            self.loaded.emit(self.gif_path)
 
-    # ------------------------------------------------------------------
-    def apply_scale(self, percent: int) -> None:
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def is_failed(self) -> bool:
+        """True si el GIF no se pudo leer: la ventana ya no se muestra y se cerrará."""
+        return self._failed
+
+    def _cache_bytes(self) -> int:
+        frames = getattr(self, "_frames", None)
+        return frames.nbytes if frames is not None else 0
+
+    def _on_load_failed(self, reason: str) -> None:
+        # Puede llegar durante __init__ (archivo ya conocido como ilegible):
+        # se difiere para que el llamador alcance a conectar la señal
+        self._on_close = None       # nada que persistir de una ventana sin GIF
+        self._failed = True         # ya no se vuelve a mostrar (`is_failed`)
+        self.hide()
+        QTimer.singleShot(0, lambda: self._fail(reason))
+
+    def _fail(self, reason: str) -> None:
+        self.loadFailed.emit(self.gif_path, reason)
+        self.close()
+
+    def _target_size(self) -> QSize | None:
         if self._original_size is None:
-            return
-        self.scale_percent = max(percent, 1)
+            return None
         w = self._original_size.width() * self.scale_percent // 100
         h = self._original_size.height() * self.scale_percent // 100
-        new_size = QSize(max(w, 1), max(h, 1))
-        self._movie.setScaledSize(new_size)
+        return QSize(max(w, 1), max(h, 1))
+
+    # ------------------------------------------------------------------
+    def apply_scale(self, percent: int) -> None:
+        """
+        Cambia de escala sin reescalar en cada tick.
+        • La ventana toma el tamaño nuevo al instante (el frame actual se
+          estira mientras tanto).
+        • El juego de frames pre-escalado se construye una vez en segundo
+          plano y queda en caché: volver a un preset ya usado es inmediato.
+        """
+        self.scale_percent = max(percent, 1)
+        new_size = self._target_size()
+        if new_size is None:
+            return
         self.setFixedSize(new_size)
+        if self._frames.size != new_size or self._frames.smooth != self.smooth_scaling:
+            self._cache.prepare(
+                self.gif_path, new_size, self.smooth_scaling, self._on_scaled_ready
+            )
+
+    def set_smooth_scaling(self, enabled: bool) -> None:
+        self.smooth_scaling = enabled
+        self.apply_scale(self.scale_percent)
+
+    def _on_scaled_ready(self, frames: FrameSet) -> None:
+        if getattr(self, "_frames", None) is None:
+            return  # overlay cerrado mientras se construía
+        if frames.size != self._target_size() or frames.smooth != self.smooth_scaling:
+            return  # la escala cambió otra vez; llegará otro aviso
+        if frames.failed():
+            # El archivo ya no se lee: se sigue con el ciclo actual (estirado);
+            # si tampoco hay ciclo, se avisa como cualquier carga fallida
+            if self._frames.failed():
+                self._on_load_failed(frames.error)
+            return
+        old = self._frames
+        self._frames = self._cache.acquire(self.gif_path, frames.size, frames.smooth)
+        self._player.set_frames(self._frames)
+        self._cache.release(old)
 
     # ------------------------------------------------------------------
     def set_opacity(self, value: float) -> None:
         self.opacity_value = max(0.1, min(value, 1.0))
-        if hasattr(self, "_opacity_effect"):
+        if not hasattr(self, "_opacity_effect"):
+            return
+        if self._opacity_effect is not None:
             self._opacity_effect.setOpacity(self.opacity_value)
+        elif self.opacity_mode == "window":
+            self.setWindowOpacity(self.opacity_value)
+        else:
+            self._label.set_opacity(self.opacity_value)
 
     def set_speed(self, speed: int) -> None:
         self.speed_value = max(10, min(speed, 400))
-        self._movie.setSpeed(self.speed_value)
+        if hasattr(self, "_player"):
+            self._player.set_speed(self.speed_value)
 
     def set_ghost_mode(self, enabled: bool) -> None:
         """Modo fantasma (solo activado desde la biblioteca)."""
@@ -115,10 +304,18 @@ class GifOverlay(QMainWindow):
             self.setWindowFlags(flags | Qt.WindowType.WindowTransparentForInput)
         else:
             self.setWindowFlags(flags & ~Qt.WindowType.WindowTransparentForInput)
-        self.show()  # Reaplicar flags
+        if not self.is_failed():
+            self.show()  # Reaplicar flags
 
     # ------------------------------------------------------------------
+    def changeEvent(self, event: QEvent) -> None:
+        if (event.type() == QEvent.Type.ActivationChange and self.isActiveWindow()
+                and hasattr(self, "_player")):
+            self._player.touch()        # primer plano: prioridad en el presupuesto
+        super().changeEvent(event)
+
     def mousePressEvent(self, event: QMouseEvent) -> None:
+        self._player.touch()
         if event.button() == Qt.MouseButton.LeftButton:
             self._drag_origin = event.globalPosition().toPoint()
 
@@ -137,6 +334,7 @@ class GifOverlay(QMainWindow):
         if self.ghost_enabled:
             # En modo fantasma no mostrar menú
             return
+        self._player.touch()
 
         menu = QMenu(self)
 
@@ -148,6 +346,12 @@ class GifOverlay(QMainWindow):
             act.setChecked(pct == self.scale_percent)
             act.triggered.connect(lambda _=False, p=pct: self.apply_scale(p))
             scale_menu.addAction(act)
+        scale_menu.addSeparator()
+        act_smooth = QAction("Suavizado", self)
+        act_smooth.setCheckable(True)
+        act_smooth.setChecked(self.smooth_scaling)
+        act_smooth.triggered.connect(self.set_smooth_scaling)
+        scale_menu.addAction(act_smooth)
 
         # Opacidad
         menu.addSeparator()
@@ -188,4 +392,14 @@ class GifOverlay(QMainWindow):
                 self.speed_value,
                 self.ghost_enabled
             )
+        self._release_frames()
         super().closeEvent(event)
+        self.closed.emit(self.gif_path)
+
+    def _release_frames(self) -> None:
+        if getattr(self, "_frames", None) is not None:
+            instrumentation().remove_overlay(self.metrics)
+            self.power.detach()
+            self._player.stop()
+            self._cache.release(self._frames)
+            self._frames = None  # type: ignore[assignment]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+modules/overlay_manager.py – Varios overlays simultáneos, uno por GIF.
+
+• Abrir un GIF ya abierto lo trae al frente en vez de duplicarlo.
+• Todos comparten el mismo reloj de animación y la misma caché de frames.
+• La carga es asíncrona: un archivo ilegible llega como `overlayFailed`.
+  Si ya se sabía ilegible, la ventana no se muestra ni emite `overlayOpened`.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QSize, pyqtSignal
+
+from modules.animation_clock import AnimationClock, shared_clock
+from modules.overlay import GifOverlay
+from storage.models import GifEntry, metadata_fresh
+from storage.path_index import canonical_path
+
+OnClose = Callable[[int, int, int, float, int, bool], None]
+
+
+class OverlayManager(QObject):
+    """Registro de overlays abiertos indexado por ruta canónica."""
+
+    overlayOpened = pyqtSignal(str)
+    overlayClosed = pyqtSignal(str)
+    overlayFailed = pyqtSignal(str, str)    # ruta, motivo
+
+    def __init__(self, clock: AnimationClock | None = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._clock = clock or shared_clock()
+        self._overlays: Dict[str, GifOverlay] = {}
+
+    # ---------- API ----------
+    def open(self, entry: GifEntry, on_close: Optional[OnClose] = None) -> GifOverlay:
+        """Muestra `entry`; si ya está abierto lo activa y lo devuelve."""
+        path = canonical_path(entry.path)
+        overlay = self._overlays.get(path)
+        if overlay is not None:
+            overlay.raise_()
+            overlay.activateWindow()
+            return overlay
+
+        overlay = GifOverlay(
+            gif_path=entry.path,
+            scale_percent=entry.scale,
+            opacity=entry.opacity,
+            speed=entry.speed,
+            ghost=entry.ghost,
+            on_close=on_close,
+            clock=self._clock,
+            pause_when_hidden=entry.pause_when_hidden,
+            idle_pause_s=entry.idle_pause_s,
+            # Metadatos vigentes: la ventana nace a su tamaño sin leer el archivo
+            original_size=QSize(entry.width, entry.height)
+            if entry.frames and metadata_fresh(entry) else None,
+        )
+        overlay.closed.connect(lambda _p, key=path: self._forget(key))
+        overlay.loadFailed.connect(lambda _p, reason, key=path: self.overlayFailed.emit(key, reason))
+        self._overlays[path] = overlay
+        if overlay.is_failed():
+            # Ilegible ya en el constructor: no llega a mostrarse; `overlayFailed`
+            # (diferido) lo notifica y el cierre lo quita del registro
+            return overlay
+        overlay.move(entry.pos_x, entry.pos_y)
+        overlay.show()
+        self.overlayOpened.emit(path)
+        return overlay
+
+    def get(self, raw_path: str) -> GifOverlay | None:
+        return self._overlays.get(canonical_path(raw_path))
+
+    def close(self, raw_path: str) -> None:
+        overlay = self.get(raw_path)
+        if overlay is not None:
+            overlay.close()
+
+    def close_all(self) -> None:
+        for overlay in list(self._overlays.values()):
+            overlay.close()
+
+    def overlays(self) -> List[GifOverlay]:
+        return list(self._overlays.values())
+
+    def paths(self) -> List[str]:
+        return list(self._overlays)
+
+    def count(self) -> int:
+        return len(self._overlays)
+
+    def clock(self) -> AnimationClock:
+        return self._clock
+
+    # ---------- internos ----------
+    def _forget(self, path: str) -> None:
+        overlay = self._overlays.pop(path, None)
+        if overlay is not None:
+            overlay.deleteLater()
+            self.overlayClosed.emit(path)
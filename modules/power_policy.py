@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+modules/power_policy.py – Pausa la animación de un overlay que nadie ve.
+
+• Motivos de pausa: ventana oculta/minimizada, fuera de todas las
+  pantallas, no expuesta (tapada por completo, según el compositor) o
+  sesión inactiva más de `idle_pause_s` segundos.
+• En pausa el FramePlayer sale del reloj compartido: cero ticks, cero
+  decode. Al reanudar sigue en el mismo frame con el retardo que le quedaba.
+• `saved_wakeups()` estima los ticks evitados (tiempo en pausa / retardo
+  del frame); `PowerPolicy.saved_total` acumula los de todo el proceso.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import Set
+
+from PyQt6.QtCore import QEvent, QObject, QRect, QTimer
+from PyQt6.QtGui import QGuiApplication, QWindow
+from PyQt6.QtWidgets import QWidget
+
+from modules.animation_clock import now_ms
+from modules.frame_player import FramePlayer
+from utils.instrumentation import instrumentation
+
+IDLE_POLL_MS = 1000             # sondeo de actividad mientras está en pausa por inactividad
+
+_INPUT_EVENTS = {
+    QEvent.Type.MouseMove, QEvent.Type.MouseButtonPress, QEvent.Type.KeyPress,
+    QEvent.Type.Wheel, QEvent.Type.TouchBegin,
+}
+_VISIBILITY_EVENTS = {
+    QEvent.Type.Show, QEvent.Type.Hide, QEvent.Type.Move, QEvent.Type.Resize,
+    QEvent.Type.WindowStateChange, QEvent.Type.Expose,
+}
+
+
+# ---------- actividad del usuario ----------
+class _ActivityTracker(QObject):
+    """Último evento de entrada visto por la aplicación (filtro global)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.last_input = time.monotonic()
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:  # noqa: N802
+        if event.type() in _INPUT_EVENTS:
+            self.last_input = time.monotonic()
+        return False
+
+
+_tracker: _ActivityTracker | None = None
+
+
+def _activity_tracker() -> _ActivityTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = _ActivityTracker()
+        app = QGuiApplication.instance()
+        if app is not None:
+            app.installEventFilter(_tracker)
+    return _tracker
+
+
+def _system_idle_seconds() -> float | None:
+    """Inactividad de toda la sesión (solo Windows); None si no se puede saber."""
+    if sys.platform != "win32":
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    class _LastInput(ctypes.Structure):
+        _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+    info = _LastInput()
+    info.cbSize = ctypes.sizeof(_LastInput)
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):  # type: ignore[attr-defined]
+        return None
+    ticks = ctypes.windll.kernel32.GetTickCount()  # type: ignore[attr-defined]
+    return ((ticks - info.dwTime) & 0xFFFFFFFF) / 1000.0
+
+
+def idle_seconds() -> float:
+    """Segundos sin entrada del usuario (sesión si el SO lo expone; si no, la app)."""
+    system = _system_idle_seconds()
+    if system is not None:
+        return system
+    return time.monotonic() - _activity_tracker().last_input
+
+
+def _power_stats() -> dict:
+    return {"saved_wakeups": round(PowerPolicy.saved_total, 1)}
+
+
+# ---------- política ----------
+class PowerPolicy(QObject):
+    """Pausa/reanuda el `player` de `window` según su visibilidad e inactividad."""
+
+    saved_total = 0.0           # ticks evitados por todas las políticas (estimación)
+
+    def __init__(
+        self,
+        window: QWidget,
+        player: FramePlayer,
+        pause_when_hidden: bool = True,
+        idle_pause_s: int = 0,
+    ) -> None:
+        super().__init__(window)
+        self._window = window
+        self._player = player
+        self.pause_when_hidden = pause_when_hidden
+        self.idle_pause_s = max(idle_pause_s, 0)
+
+        self._reasons: Set[str] = set()
+        self._paused_at: float | None = None
+        self._saved = 0.0
+        self._handle: QWindow | None = None
+        self._exposed_once = False      # recién mostrada aún no está expuesta: no es "tapada"
+
+        # Agrupa las ráfagas de Move/Resize/Expose en una sola evaluación
+        self._evaluate_timer = QTimer(self)
+        self._evaluate_timer.setSingleShot(True)
+        self._evaluate_timer.setInterval(0)
+        self._evaluate_timer.timeout.connect(self.evaluate)
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(self._check_idle)
+
+        window.installEventFilter(self)
+        _activity_tracker()
+        instrumentation().add_provider("power", _power_stats)
+        self._arm_idle_timer()
+
+    # ---------- API ----------
+    def configure(self, pause_when_hidden: bool, idle_pause_s: int) -> None:
+        self.pause_when_hidden = pause_when_hidden
+        self.idle_pause_s = max(idle_pause_s, 0)
+        self._reasons.discard("idle")
+        self._arm_idle_timer()
+        self.evaluate()
+
+    def is_paused(self) -> bool:
+        return self._paused_at is not None
+
+    def reasons(self) -> Set[str]:
+        return set(self._reasons)
+
+    def saved_wakeups(self) -> float:
+        """Ticks evitados por este overlay, incluida la pausa en curso."""
+        return self._saved + self._pending_savings()
+
+    def evaluate(self) -> None:
+        """Recalcula los motivos de pausa y aplica el cambio de estado."""
+        reasons = {r for r in self._reasons if r == "idle"}
+        if self.pause_when_hidden:
+            reasons |= self._visibility_reasons()
+        self._reasons = reasons
+        if reasons and self._paused_at is None:
+            self._pause()
+        elif not reasons and self._paused_at is not None:
+            self._resume()
+
+    def detach(self) -> None:
+        """Fin de la vida del overlay: contabiliza la pausa en curso."""
+        self._idle_timer.stop()
+        self._evaluate_timer.stop()
+        self._window.removeEventFilter(self)
+        if self._paused_at is not None:
+            saved = self._pending_savings()
+            self._saved += saved
+            PowerPolicy.saved_total += saved
+            self._paused_at = None
+
+    # ---------- eventos ----------
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:  # noqa: N802
+        if event.type() in _VISIBILITY_EVENTS:
+            if obj is self._window and self._window.windowHandle() is not self._handle:
+                self._watch_handle()     # setWindowFlags recrea la ventana nativa
+            self._evaluate_timer.start()
+        return False
+
+    def _watch_handle(self) -> None:
+        # La exposición (tapada/destapada) solo la recibe la QWindow nativa
+        handle = self._window.windowHandle()
+        if handle is not None:
+            handle.installEventFilter(self)
+            self._handle = handle
+
+    # ---------- internos ----------
+    def _visibility_reasons(self) -> Set[str]:
+        window = self._window
+        if not window.isVisible() or window.isMinimized():
+            return {"hidden"}
+        if not self._on_any_screen(window.frameGeometry()):
+            return {"offscreen"}
+        handle = window.windowHandle()
+        if handle is not None:
+            if handle.isExposed():
+                self._exposed_once = True
+            elif self._exposed_once:
+                return {"occluded"}
+        return set()
+
+    @staticmethod
+    def _on_any_screen(rect: QRect) -> bool:
+        screens = QGuiApplication.screens()
+        return not screens or any(s.geometry().intersects(rect) for s in screens)
+
+    def _arm_idle_timer(self, delay_ms: int | None = None) -> None:
+        if not self.idle_pause_s:
+            self._idle_timer.stop()
+            return
+        if delay_ms is None:
+            remaining = self.idle_pause_s - idle_seconds()
+            delay_ms = max(int(remaining * 1000), IDLE_POLL_MS)
+        self._idle_timer.start(delay_ms)
+
+    def _check_idle(self) -> None:
+        idle = self.idle_pause_s and idle_seconds() >= self.idle_pause_s
+        if idle:
+            self._reasons.add("idle")
+            self._arm_idle_timer(IDLE_POLL_MS)      # detectar la vuelta del usuario
+        else:
+            self._reasons.discard("idle")
+            self._arm_idle_timer()
+        self.evaluate()
+
+    def _pause(self) -> None:
+        if self._player.pause():
+            self._paused_at = now_ms()
+
+    def _resume(self) -> None:
+        saved = self._pending_savings()
+        self._saved += saved
+        PowerPolicy.saved_total += saved
+        self._paused_at = None
+        self._player.resume()
+
+    def _pending_savings(self) -> float:
+        if self._paused_at is None:
+            return 0.0
+        return (now_ms() - self._paused_at) / max(self._player.current_delay(), 1)
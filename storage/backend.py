@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+storage/backend.py – Interfaz de backends de persistencia para LibraryStore.
+
+• `load()`          → todas las entradas.
+• `write_all()`     → reemplaza el contenido completo.
+• `write_changes()` → aplica solo lo modificado/eliminado; por defecto
+                      reescribe todo (los backends incrementales lo sobrescriben).
+"""
+
+from __future__ import annotations
+
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Set
+
+from storage.models import GifEntry
+
+BACKEND_ENV = "DESKTOPGIF_BACKEND"
+
+
+class StorageBackend(ABC):
+    name = "abstract"
+
+    @abstractmethod
+    def load(self) -> List[GifEntry]:
+        ...
+
+    @abstractmethod
+    def write_all(self, entries: List[GifEntry]) -> None:
+        ...
+
+    def write_changes(
+        self, entries: Dict[str, GifEntry], changed: Set[str], removed: Set[str]
+    ) -> None:
+        self.write_all(list(entries.values()))
+
+    def close(self) -> None:
+        pass
+
+
+def default_backend() -> StorageBackend:
+    """SQLite salvo que `DESKTOPGIF_BACKEND=json`."""
+    if os.environ.get(BACKEND_ENV, "sqlite").lower() == "json":
+        from storage.json_backend import JsonBackend
+        return JsonBackend()
+    from storage.sqlite_backend import SqliteBackend
+    return SqliteBackend()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+storage/duplicates.py – Copias idénticas dentro de la librería.
+
+• Agrupa las entradas por hash rápido (tamaño + cabeza y cola) y por hash
+  completo (`utils.content_hash`), ambos guardados en la propia entrada.
+• `unresolved()`: entradas cuyo hash rápido coincide con el de otra y
+  aún no tienen el completo; solo esas se leen enteras (fuera del hilo GUI).
+• Dos entradas son copias solo si coincide el hash completo.
+• Incremental (`storage.store_index`): `attach(store)` anota las rutas
+  cambiadas y `sync()` las aplica.
+• Sin dependencias de Qt.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+from storage.models import GifEntry
+from storage.path_index import canonical_path
+from storage.store_index import StoreIndex
+
+__all__ = ["DuplicateIndex"]
+
+Identity = Tuple[str, str, int, int]    # (hash rápido, hash completo, mtime_ns, tamaño)
+
+
+class DuplicateIndex(StoreIndex):
+    """Grupos de entradas con el mismo contenido sobre un `LibraryStore`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._ids: Dict[str, Identity] = {}
+        self._by_quick: Dict[str, Set[str]] = {}
+        self._by_content: Dict[str, Set[str]] = {}
+        self._colliding: Set[str] = set()       # hashes rápidos con más de una entrada
+
+    # ---------- API ----------
+    def unresolved(self) -> List[Tuple[str, int, int]]:
+        """(ruta, mtime_ns, tamaño) de las entradas a las que les falta el hash completo."""
+        self.sync()
+        todo = []
+        for quick in self._colliding:
+            for path in self._by_quick[quick]:
+                _, content, mtime_ns, size = self._ids[path]
+                if not content:
+                    todo.append((path, mtime_ns, size))
+        return todo
+
+    def copies(self, raw_path: str) -> List[str]:
+        """Las otras entradas con el mismo contenido que `raw_path` (ordenadas)."""
+        path = canonical_path(raw_path)
+        ident = self._ids.get(path)
+        group = self._by_content.get(ident[1], ()) if ident is not None else ()
+        return sorted(p for p in group if p != path)
+
+    def is_duplicate(self, path: str) -> bool:
+        """Tiene al menos una copia (ruta canónica; sin ordenar nada)."""
+        ident = self._ids.get(path)
+        return ident is not None and len(self._by_content.get(ident[1], ())) > 1
+
+    def groups(self) -> List[List[str]]:
+        """Grupos de copias idénticas (cada uno ordenado), aplicando antes los cambios."""
+        self.sync()
+        return sorted(sorted(g) for g in self._by_content.values() if len(g) > 1)
+
+    def redundant(self) -> int:
+        """Entradas de sobra: en cada grupo de copias, todas menos una."""
+        return sum(len(g) - 1 for g in self._by_content.values() if len(g) > 1)
+
+    # ---------- internos ----------
+    def _indexed(self) -> Iterable[str]:
+        return self._ids
+
+    def _put(self, entry: GifEntry) -> None:
+        ident = (entry.quick_hash, entry.content_hash, entry.mtime_ns, entry.file_size)
+        old = self._ids.get(entry.path)
+        if old == ident:
+            return      # otro cambio (velocidad, etiquetas…): nada que reagrupar
+        if old is not None:
+            self._drop(entry.path)
+        if not entry.quick_hash:
+            return      # sin metadatos aún, o archivo no válido
+        self._ids[entry.path] = ident
+        group = self._by_quick.setdefault(entry.quick_hash, set())
+        group.add(entry.path)
+        if len(group) > 1:
+            self._colliding.add(entry.quick_hash)
+        if entry.content_hash:
+            self._by_content.setdefault(entry.content_hash, set()).add(entry.path)
+
+    def _drop(self, path: str) -> None:
+        ident = self._ids.pop(path, None)
+        if ident is None:
+            return
+        quick, content = ident[0], ident[1]
+        group = self._by_quick[quick]
+        group.discard(path)
+        if len(group) < 2:
+            self._colliding.discard(quick)
+        if not group:
+            del self._by_quick[quick]
+        if content:
+            group = self._by_content[content]
+            group.discard(path)
+            if not group:
+                del self._by_content[content]
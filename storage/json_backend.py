@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+storage/json_backend.py – Backend JSON (formato histórico de library.json).
+
+• Reescribe el archivo completo en cada volcado, de forma atómica.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import List
+
+from storage.backend import StorageBackend
+from storage.models import GifEntry, entry_from_dict
+
+CONFIG_FILE = Path(__file__).parent / "library.json"
+
+
+class JsonBackend(StorageBackend):
+    name = "json"
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = Path(path or CONFIG_FILE)
+
+    def load(self) -> List[GifEntry]:
+        if not self.path.exists():
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return [entry_from_dict(d) for d in data]
+
+    def write_all(self, entries: List[GifEntry]) -> None:
+        data = [asdict(e) for e in entries]
+        self._write_atomic(json.dumps(data, indent=2, ensure_ascii=False))
+
+    def _write_atomic(self, text: str) -> None:
+        # Temporal en el mismo directorio para que os.replace sea atómico
+        fd, tmp = tempfile.mkstemp(
+            dir=self.path.parent, prefix=self.path.name, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
@@ -1,90 +1,410 @@
 #!/usr/bin/env python
 # coding: utf-8
 """
-storage/library_store.py – Persiste la librería de GIFs en JSON.
+storage/library_store.py – Librería de GIFs sobre un backend intercambiable.
+
+• Backends: SQLite (por defecto, incremental) o JSON (`DESKTOPGIF_BACKEND=json`).
+• Escritura diferida (write-behind): los cambios marcan la librería como
+  sucia y se vuelcan una sola vez tras `write_delay` segundos.
+• `flush()` fuerza el volcado; `batch()` agrupa operaciones masivas.
+• Metadatos de cada GIF (dimensiones, frames, duración, tamaño) en caché
+  en la propia entrada, revalidados por mtime/tamaño (`refresh_metadata`).
+• Identidad por contenido: el hash rápido llega con los metadatos; el
+  completo, calculado fuera (`set_content_hashes`), solo cuando dos hashes
+  rápidos coinciden. `content_id()` lo ofrece a las cachés de miniaturas
+  y de frames para que copias idénticas compartan entradas.
+• Cada volcado es atómico (transacción SQLite o archivo temporal + rename).
+  Si falla (base de datos bloqueada, disco lleno…), los cambios vuelven a
+  quedar pendientes y se reintenta tras `RETRY_DELAY` segundos.
+• `subscribe()`: avisa de las rutas cambiadas y quitadas, una vez por
+  operación o al salir del `batch()`/`deferred()` exterior (índices en memoria).
 """
 
 from __future__ import annotations
 
-import json
-from dataclasses import asdict, dataclass
-from pathlib import Path
-from typing import Dict, List
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+from storage.backend import StorageBackend, default_backend
+from storage.json_backend import CONFIG_FILE  # noqa: F401  (compatibilidad)
+from storage.models import GifEntry, metadata_fresh, normalize_tags
+from storage.path_index import canonical_path
+from utils.instrumentation import instrumentation
+
+if TYPE_CHECKING:
+    from utils.gif_meta import GifMeta
+
+__all__ = ["CONFIG_FILE", "ChangeListener", "GifEntry", "LibraryStore"]
+
+ChangeListener = Callable[[Set[str], Set[str]], None]   # (cambiadas, quitadas)
 
-CONFIG_FILE = Path(__file__).parent / "library.json"
+RETRY_DELAY = 2.0           # segundos hasta reintentar un volcado fallido
 
+# Campos de GifEntry que son caché del archivo, no ajustes del usuario
+METADATA_FIELDS = ("width", "height", "frames", "duration_ms", "file_size", "mtime_ns",
+                   "quick_hash", "content_hash")
 
-@dataclass
-class GifEntry:
-    path: str            # ruta absoluta, única
-    scale: int = 100
-    pos_x: int = 100
-    pos_y: int = 100
-    opacity: float = 1.0
-    speed: int = 100
-    ghost: bool = False
+log = logging.getLogger(__name__)
 
 
 class LibraryStore:
     """Carga y guarda objetos GifEntry – evita duplicados."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        write_delay: float | None = 0.5,
+        backend: StorageBackend | None = None,
+    ) -> None:
+        """`write_delay` None o 0 → cada cambio se escribe al momento."""
         self._items: Dict[str, GifEntry] = {}
+        self.write_delay = write_delay
+        self.backend = backend or default_backend()
+
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._changed: Set[str] = set()
+        self._removed: Set[str] = set()
+        self._batch_depth = 0
+        self._timer: threading.Timer | None = None
+
+        self._listeners: List[ChangeListener] = []
+        self._notify_changed: Set[str] = set()
+        self._notify_removed: Set[str] = set()
+
         self.load()
 
     # ---------- API ----------
     def items(self) -> List[GifEntry]:
         return list(self._items.values())
 
-    def add(self, raw_path: str) -> None:
-        path = str(Path(raw_path).resolve())
-        if path not in self._items:
-            self._items[path] = GifEntry(path)
-            self.save()
+    def add(self, raw_path: str) -> GifEntry:
+        path = canonical_path(raw_path)
+        entry = self._items.get(path)
+        if entry is None:
+            entry = self._items[path] = GifEntry(path)
+            self._mark_dirty(path)
+        return entry
+
+    def add_many(self, raw_paths: Iterable[str]) -> List[GifEntry]:
+        """
+        Añade varias rutas con un único volcado (una transacción). A diferencia
+        de `batch()`, respeta `write_delay`: el volcado ocurre después, en el
+        hilo del temporizador, y no bloquea al que llama (p. ej. el hilo GUI).
+        """
+        with self.deferred():
+            return [self.add(p) for p in raw_paths]
 
     def remove(self, raw_path: str) -> None:
-        path = str(Path(raw_path).resolve())
+        path = canonical_path(raw_path)
         if path in self._items:
             del self._items[path]
-            self.save()
+            self._mark_dirty(path, removed=True)
 
     def update(self, entry: GifEntry) -> None:
         self._items[entry.path] = entry
-        self.save()
+        self._mark_dirty(entry.path)
 
     def get(self, raw_path: str) -> GifEntry | None:
-        return self._items.get(str(Path(raw_path).resolve()))
+        return self._items.get(canonical_path(raw_path))
+
+    def put_entries(self, entries: Iterable[GifEntry], overwrite: bool = False) -> List[GifEntry]:
+        """
+        Incorpora entradas preparadas en otro proceso (`cli.py add/import`
+        con la app abierta). Las nuevas entran tal cual; las que ya estaban
+        se sustituyen con `overwrite` y, si no, solo toman los metadatos.
+        Devuelve las entradas nuevas o modificadas (un único volcado).
+        """
+        updated: List[GifEntry] = []
+        with self.deferred():
+            for entry in entries:
+                entry.path = canonical_path(entry.path)
+                current = self._items.get(entry.path)
+                if current is None or overwrite:
+                    if entry == current:
+                        continue
+                    self._items[entry.path] = current = entry
+                else:
+                    values = [getattr(entry, f) for f in METADATA_FIELDS]
+                    if values == [getattr(current, f) for f in METADATA_FIELDS]:
+                        continue
+                    for name, value in zip(METADATA_FIELDS, values):
+                        setattr(current, name, value)
+                self._mark_dirty(entry.path)
+                updated.append(current)
+        return updated
+
+    # ---------- avisos ----------
+    def subscribe(self, listener: ChangeListener) -> None:
+        """`listener(cambiadas, quitadas)` tras cada cambio (rutas canónicas)."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: ChangeListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
 
     # ---------- persistencia ----------
     def load(self) -> None:
-        if CONFIG_FILE.exists():
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self._items = {
-                d["path"]: GifEntry(**{
-                    **{
-                        "scale": 100,
-                        "pos_x": 100,
-                        "pos_y": 100,
-                        "opacity": 1.0,
-                        "speed": 100,
-                        "ghost": False
-                    },
-                    **d
-                })
-                for d in data
-            }
-
-    def save(self) -> None:
-        data = [asdict(e) for e in self._items.values()]
-        CONFIG_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False))
+        with self._lock:
+            old = self._items
+            self._items = {e.path: e for e in self.backend.load()}
+            self._changed.clear()
+            self._removed.clear()
+            self._dirty = False
+            if self._listeners:
+                # Recarga: todo puede haber cambiado; lo que ya no está, quitado
+                self._notify_changed = set(self._items)
+                self._notify_removed = {p for p in old if p not in self._items}
+        self._notify()
+
+    def save(self) -> bool:
+        """
+        Reescribe todo ya, esté sucia o no. Devuelve False si el backend
+        falla: lo pendiente sigue pendiente (reintento programado).
+        """
+        with self._lock:
+            self._cancel_timer()
+            changed, removed = self._changed, self._removed
+            self._changed, self._removed = set(), set()
+            self._dirty = False
+            # list() sobre el dict es atómico bajo el GIL: instantánea segura
+            t0 = time.perf_counter()
+            try:
+                self.backend.write_all(list(self._items.values()))
+            except Exception:  # noqa: BLE001  (p. ej. sqlite3.OperationalError, OSError)
+                log.exception("no se pudo guardar la librería (%s); se reintentará",
+                              self.backend.name)
+                self._restore_pending(changed, removed)
+                return False
+            instrumentation().store.record("save", (time.perf_counter() - t0) * 1000)
+            return True
+
+    def flush(self) -> bool:
+        """
+        Vuelca los cambios pendientes. Devuelve True si hubo escritura; si el
+        backend falla, los cambios siguen pendientes (reintento programado).
+        """
+        with self._lock:
+            self._cancel_timer()
+            if not self._dirty:
+                return False
+            changed, removed = self._changed, self._removed
+            self._changed, self._removed = set(), set()
+            self._dirty = False
+            t0 = time.perf_counter()
+            try:
+                self.backend.write_changes(self._items, changed, removed)
+            except Exception:  # noqa: BLE001  (p. ej. sqlite3.OperationalError, OSError)
+                log.exception("no se pudo guardar la librería (%s); se reintentará",
+                              self.backend.name)
+                self._restore_pending(changed, removed)
+                return False
+            instrumentation().store.record("flush", (time.perf_counter() - t0) * 1000)
+            return True
+
+    def close(self) -> None:
+        """Cierre ordenado: cancela el temporizador y vuelca una única vez."""
+        self.flush()
+        with self._lock:
+            self._cancel_timer()    # sin reintentos sobre un backend cerrado
+        self.backend.close()
+
+    def is_dirty(self) -> bool:
+        return self._dirty
+
+    @contextmanager
+    def batch(self) -> Iterator["LibraryStore"]:
+        """Agrupa operaciones: una sola escritura al salir del bloque exterior."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+            self._notify()
+
+    @contextmanager
+    def deferred(self) -> Iterator["LibraryStore"]:
+        """Como `batch()`, pero el volcado final respeta `write_delay`."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._dirty and not self._batch_depth:
+                    self._schedule_flush()
+            self._notify()
+
+    # ---------- metadatos ----------
+    def set_metadata(self, metas: Iterable[GifMeta]) -> List[GifEntry]:
+        """
+        Copia metadatos ya extraídos a sus entradas (un único volcado).
+        Un archivo inválido también se anota (frames=0): no se vuelve a
+        analizar hasta que cambie. Devuelve las entradas modificadas.
+        """
+        updated: List[GifEntry] = []
+        with self.deferred():
+            for meta in metas:
+                entry = self._items.get(canonical_path(meta.path))
+                if entry is None or not meta.mtime_ns:
+                    continue
+                quick, content = (meta.quick_hash, meta.content_hash) if meta.valid else ("", "")
+                if not content and quick == entry.quick_hash and \
+                        (meta.mtime_ns, meta.size) == (entry.mtime_ns, entry.file_size):
+                    content = entry.content_hash    # el completo sigue valiendo
+                values = (meta.width, meta.height, meta.frames, meta.duration_ms,
+                          meta.size, meta.mtime_ns) if meta.valid else \
+                    (0, 0, 0, 0, meta.size, meta.mtime_ns)
+                values += (quick, content)
+                if values == (entry.width, entry.height, entry.frames, entry.duration_ms,
+                              entry.file_size, entry.mtime_ns, entry.quick_hash,
+                              entry.content_hash):
+                    continue
+                (entry.width, entry.height, entry.frames, entry.duration_ms,
+                 entry.file_size, entry.mtime_ns, entry.quick_hash, entry.content_hash) = values
+                self._mark_dirty(entry.path)
+                updated.append(entry)
+        return updated
+
+    def refresh_metadata(self, raw_path: str) -> GifEntry | None:
+        """Revalida (y si hace falta extrae) los metadatos de una entrada, en este hilo."""
+        from utils.gif_meta import probe
+
+        entry = self.get(raw_path)
+        if entry is None or metadata_fresh(entry):
+            return entry
+        self.set_metadata([probe(entry.path)])
+        return entry
+
+    def metadata_snapshot(self) -> Dict[str, Tuple[int, int] | None]:
+        """ruta → (mtime_ns, tamaño) de sus metadatos en caché (None si no tiene)."""
+        return {
+            e.path: (e.mtime_ns, e.file_size)
+            if e.mtime_ns and (e.quick_hash or not e.frames) else None
+            for e in list(self._items.values())
+        }
+
+    # ---------- identidad por contenido ----------
+    def set_content_hashes(self, results: Iterable[Tuple[str, int, int, str]]) -> List[GifEntry]:
+        """
+        Anota hashes completos (ruta, mtime_ns, tamaño, hash) calculados
+        fuera; se ignoran los de otra versión del archivo. Devuelve las
+        entradas modificadas.
+        """
+        updated: List[GifEntry] = []
+        with self.deferred():
+            for raw_path, mtime_ns, size, digest in results:
+                entry = self._items.get(canonical_path(raw_path))
+                if entry is None or not digest or entry.content_hash == digest or \
+                        (entry.mtime_ns, entry.file_size) != (mtime_ns, size):
+                    continue
+                entry.content_hash = digest
+                self._mark_dirty(entry.path)
+                updated.append(entry)
+        return updated
+
+    def content_id(self, raw_path: str, mtime_ns: int, size: int) -> str:
+        """
+        Hash completo de `raw_path` si corresponde a esa versión del archivo
+        ("" si no se conoce). Apto para hilos de trabajo (solo lee).
+        """
+        entry = self._items.get(raw_path) or self._items.get(canonical_path(raw_path))
+        if entry is None or (entry.mtime_ns, entry.file_size) != (mtime_ns, size):
+            return ""
+        return entry.content_hash
+
+    def stale_metadata(self) -> List[str]:
+        """Entradas sin metadatos o cuyo archivo cambió (hace un `stat` por entrada)."""
+        return [e.path for e in list(self._items.values()) if not metadata_fresh(e)]
+
+    # ---------- write-behind ----------
+    def _mark_dirty(self, path: str, removed: bool = False) -> None:
+        with self._lock:
+            if removed:
+                self._changed.discard(path)
+                self._removed.add(path)
+            else:
+                self._removed.discard(path)
+                self._changed.add(path)
+            if self._listeners and removed:
+                self._notify_changed.discard(path)
+                self._notify_removed.add(path)
+            elif self._listeners:
+                self._notify_removed.discard(path)
+                self._notify_changed.add(path)
+            self._dirty = True
+            if not self._batch_depth:
+                self._schedule_flush()
+        self._notify()
+
+    def _notify(self) -> None:
+        """Entrega los avisos acumulados (nunca dentro de un `batch()`)."""
+        with self._lock:
+            if self._batch_depth or not (self._notify_changed or self._notify_removed):
+                return
+            changed, removed = self._notify_changed, self._notify_removed
+            self._notify_changed, self._notify_removed = set(), set()
+        for listener in list(self._listeners):
+            listener(changed, removed)
+
+    def _schedule_flush(self) -> None:
+        with self._lock:
+            if not self.write_delay:
+                self.flush()
+                return
+            self._cancel_timer()
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _restore_pending(self, changed: Set[str], removed: Set[str]) -> None:
+        """Devuelve a pendientes un volcado fallido; lo marcado después manda."""
+        with self._lock:
+            self._changed |= {p for p in changed if p not in self._removed}
+            self._removed |= {p for p in removed if p not in self._changed}
+            self._dirty = True
+            self._cancel_timer()
+            # Temporizador aunque `write_delay` sea 0: reintentar al momento
+            # volvería a fallar (y en bucle)
+            self._timer = threading.Timer(max(self.write_delay or 0, RETRY_DELAY), self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    # ---------- etiquetas ----------
+    def set_tags(self, raw_path: str, tags: Iterable[str]) -> List[str]:
+        """Sustituye las etiquetas de la entrada. Devuelve las guardadas (normalizadas)."""
+        path = canonical_path(raw_path)
+        entry = self._items.get(path)
+        if entry is None:
+            return []
+        tags = normalize_tags(tags)
+        if tags != entry.tags:
+            entry.tags = tags
+            self._mark_dirty(path)
+        return tags
+
+    def get_tags(self, raw_path: str) -> List[str]:
+        entry = self.get(raw_path)
+        return list(entry.tags) if entry else []
 
     # ---------- opacidad ----------
     def set_opacity(self, raw_path: str, opacity: float) -> None:
-        path = str(Path(raw_path).resolve())
+        path = canonical_path(raw_path)
         if path in self._items:
             self._items[path].opacity = opacity
-            self.save()
+            self._mark_dirty(path)
 
     def get_opacity(self, raw_path: str) -> float:
         entry = self.get(raw_path)
@@ -92,10 +412,10 @@ class LibraryStore:
 
     # ---------- velocidad ----------
     def set_speed(self, raw_path: str, speed: int) -> None:
-        path = str(Path(raw_path).resolve())
+        path = canonical_path(raw_path)
         if path in self._items:
             self._items[path].speed = speed
-            self.save()
+            self._mark_dirty(path)
 
     def get_speed(self, raw_path: str) -> int:
         entry = self.get(raw_path)
@@ -103,11 +423,20 @@ class LibraryStore:
 
     # ---------- ghost mode ----------
     def set_ghost(self, raw_path: str, ghost: bool) -> None:
-        path = str(Path(raw_path).resolve())
+        path = canonical_path(raw_path)
         if path in self._items:
             self._items[path].ghost = ghost
-            self.save()
+            self._mark_dirty(path)
 
     def get_ghost(self, raw_path: str) -> bool:
         entry = self.get(raw_path)
         return entry.ghost if entry else False
+
+    # ---------- ahorro de energía ----------
+    def set_power(self, raw_path: str, pause_when_hidden: bool, idle_pause_s: int) -> None:
+        path = canonical_path(raw_path)
+        if path in self._items:
+            entry = self._items[path]
+            entry.pause_when_hidden = pause_when_hidden
+            entry.idle_pause_s = max(idle_pause_s, 0)
+            self._mark_dirty(path)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+storage/models.py – Modelo de datos de la librería (sin dependencias de Qt).
+
+• Ajustes de reproducción por GIF, etiquetas del usuario y, en caché, los
+  metadatos del archivo (`utils.gif_meta`): válidos mientras coincidan su
+  mtime y su tamaño. Entre ellos, la identidad del contenido
+  (`utils.content_hash`): copias idénticas en carpetas distintas.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+@dataclass
+class GifEntry:
+    path: str            # ruta absoluta, única
+    scale: int = 100
+    pos_x: int = 100
+    pos_y: int = 100
+    opacity: float = 1.0
+    speed: int = 100
+    ghost: bool = False
+    pause_when_hidden: bool = True   # ahorro de energía: pausa si no se ve
+    idle_pause_s: int = 0            # pausa tras N s sin actividad (0 = nunca)
+    tags: List[str] = field(default_factory=list)   # etiquetas del usuario
+    # ---------- metadatos en caché (0 = aún no extraídos) ----------
+    width: int = 0
+    height: int = 0
+    frames: int = 0
+    duration_ms: int = 0
+    file_size: int = 0               # bytes en disco al extraerlos
+    mtime_ns: int = 0                # mtime del archivo al extraerlos
+    quick_hash: str = ""             # tamaño + cabeza y cola del archivo
+    content_hash: str = ""           # contenido completo ("" = sin calcular)
+
+
+def entry_from_dict(data: Dict[str, Any]) -> GifEntry:
+    """Crea un GifEntry ignorando claves desconocidas (archivos de otras versiones)."""
+    known = {f.name for f in fields(GifEntry)}
+    return GifEntry(**{k: v for k, v in data.items() if k in known})
+
+
+def normalize_tags(tags: Iterable[str]) -> List[str]:
+    """Sin espacios sobrantes, vacías ni repetidas (sin distinguir mayúsculas); conserva el orden."""
+    seen: Dict[str, str] = {}
+    for tag in tags:
+        tag = " ".join(tag.split()).lstrip("#")
+        if tag and tag.lower() not in seen:
+            seen[tag.lower()] = tag
+    return list(seen.values())
+
+
+def file_stat(path: str) -> Tuple[int, int] | None:
+    """(mtime_ns, tamaño) del archivo o None si no existe."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def metadata_fresh(entry: GifEntry, stat: Tuple[int, int] | None = None) -> bool:
+    """True si los metadatos en caché corresponden al archivo actual."""
+    if not entry.mtime_ns or (entry.frames and not entry.quick_hash):
+        return False    # sin extraer, o de una versión que no guardaba el hash
+    stat = stat or file_stat(entry.path)
+    return stat == (entry.mtime_ns, entry.file_size)
+
+
+def decoded_bytes(entry: GifEntry, scale: int | None = None) -> int:
+    """
+    Memoria del ciclo completo decodificado (ARGB32) a `scale` % (por
+    defecto, la de la entrada): lo que ocupará en la caché de frames.
+    """
+    scale = entry.scale if scale is None else scale
+    w = entry.width * scale // 100
+    h = entry.height * scale // 100
+    return w * h * 4 * entry.frames
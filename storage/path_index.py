@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+storage/path_index.py – Rutas canónicas memoizadas e índice ruta → ítem → GifEntry.
+
+• `canonical_path()` resuelve cada ruta una sola vez por proceso
+  (`Path.resolve()` toca el sistema de archivos en cada llamada).
+• `PathIndex` es el índice que comparten la vista de la librería y el
+  store: búsquedas O(1) en vez de recorrer la lista resolviendo rutas.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Generic, Iterator, TypeVar
+
+from storage.models import GifEntry
+
+T = TypeVar("T")
+
+_resolved: Dict[str, str] = {}
+
+
+def canonical_path(raw_path: str | Path) -> str:
+    """Ruta absoluta resuelta (memoizada). Idempotente: canonical(canonical(p)) == canonical(p)."""
+    raw = str(raw_path)
+    path = _resolved.get(raw)
+    if path is None:
+        path = str(Path(raw).resolve())
+        _resolved[raw] = path
+        _resolved[path] = path
+    return path
+
+
+def forget_path(raw_path: str | Path) -> None:
+    """Olvida la resolución memoizada (p. ej. si un enlace simbólico cambió)."""
+    _resolved.pop(str(raw_path), None)
+
+
+def clear_path_cache() -> None:
+    _resolved.clear()
+
+
+@dataclass
+class IndexedItem(Generic[T]):
+    item: T
+    entry: GifEntry | None
+
+
+class PathIndex(Generic[T]):
+    """Ruta canónica → (ítem de la vista, GifEntry del store)."""
+
+    def __init__(self) -> None:
+        self._by_path: Dict[str, IndexedItem[T]] = {}
+
+    def __contains__(self, raw_path: object) -> bool:
+        if not isinstance(raw_path, (str, Path)):
+            return False
+        return canonical_path(raw_path) in self._by_path
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_path)
+
+    def put(self, raw_path: str | Path, item: T, entry: GifEntry | None) -> str:
+        path = canonical_path(raw_path)
+        self._by_path[path] = IndexedItem(item, entry)
+        return path
+
+    def pop(self, raw_path: str | Path) -> IndexedItem[T] | None:
+        return self._by_path.pop(canonical_path(raw_path), None)
+
+    def item(self, raw_path: str | Path) -> T | None:
+        found = self._by_path.get(canonical_path(raw_path))
+        return found.item if found else None
+
+    def entry(self, raw_path: str | Path) -> GifEntry | None:
+        found = self._by_path.get(canonical_path(raw_path))
+        return found.entry if found else None
+
+    def set_entry(self, raw_path: str | Path, entry: GifEntry | None) -> None:
+        found = self._by_path.get(canonical_path(raw_path))
+        if found is not None:
+            found.entry = entry
+
+    def clear(self) -> None:
+        self._by_path.clear()
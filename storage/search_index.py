@@ -0,0 +1,418 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+storage/search_index.py – Índice de búsqueda en memoria sobre la librería.
+
+• Texto (sin distinguir mayúsculas): nombre del archivo sin extensión,
+  carpetas de su ruta y etiquetas. Cada palabra de la consulta debe
+  aparecer como subcadena: trigramas (intersección de conjuntos y
+  verificación) desde 3 letras, prefijo de palabra con 1–2.
+• Las carpetas se indexan una vez cada una, no una vez por GIF.
+• `#etiqueta` busca solo en las etiquetas (por prefijo).
+• Metadatos en listas ordenadas (`bisect`): `ancho>300`, `alto<=200`,
+  `frames>=10`, `dur<2` (segundos; `dur>500ms`), `mb>5`, `kb<300`, `640x480`.
+• Incremental (`storage.store_index`): `attach(store)` se suscribe a los
+  cambios del store y solo anota las rutas; se aplican en `sync()` (o en
+  la siguiente consulta) comparando lo indexado: cambiar la velocidad u
+  opacidad no reindexa nada.
+• Sin dependencias de Qt.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from bisect import bisect_left, bisect_right
+from operator import eq, ge, gt, itemgetter, le, lt
+from typing import Dict, Iterable, List, Set, Tuple
+
+from storage.models import GifEntry
+from storage.path_index import canonical_path
+from storage.store_index import StoreIndex
+
+__all__ = ["SearchIndex"]
+
+# campo numérico → posición en la tupla de valores del documento
+_FIELDS = {"w": 0, "h": 1, "frames": 2, "dur": 3, "size": 4}
+_ALIASES = {
+    "w": "w", "ancho": "w", "width": "w",
+    "h": "h", "alto": "h", "height": "h",
+    "f": "frames", "frames": "frames",
+    "d": "dur", "dur": "dur", "duracion": "dur", "duración": "dur",
+    "mb": "size", "kb": "size",
+}
+_NUMERIC = re.compile(
+    r"^(?P<field>[a-zñóú]+)\s*(?P<op><=|>=|<|>|=|:)\s*(?P<value>\d+(?:[.,]\d+)?)(?P<unit>ms|s)?$"
+)
+_OPS = {">": gt, ">=": ge, "<": lt, "<=": le, "=": eq, ":": eq}
+_DIMS = re.compile(r"^(\d+)[x×](\d+)$")
+_WORDS = re.compile(r"[^\W_]+")     # "mi_gato-2" → mi, gato, 2
+
+Docs = Set[int]
+Condition = Tuple[str, str, float]      # (campo, operador, valor)
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Trigramas de cada segmento ("\n" separa segmentos: no hay trigramas a caballo)."""
+    grams = {text[i:i + 3] for i in range(len(text) - 2)}
+    if "\n" in text:
+        grams = {g for g in grams if "\n" not in g}
+    return grams
+
+
+def _prefixed(words: List[str], prefix: str) -> List[str]:
+    """Palabras de la lista ordenada `words` que empiezan por `prefix`."""
+    lo = bisect_left(words, prefix)
+    hi = bisect_left(words, prefix + "\uffff", lo)
+    return words[lo:hi]
+
+
+class _TextIndex:
+    """
+    Textos (uno por id) → ids, a través de sus palabras: los trigramas se
+    indexan una vez por palabra distinta, no por texto (nombres como
+    `gato_baile-0123` comparten casi todas sus palabras).
+    """
+
+    def __init__(self) -> None:
+        self.texts: List[str] = []                  # id → texto (minúsculas)
+        self.words: Dict[str, Docs] = {}            # palabra → ids
+        self.grams: Dict[str, Set[str]] = {}        # trigrama → palabras
+        self._sorted: List[str] | None = []         # palabras ordenadas (None = por ordenar)
+
+    def put(self, doc: int, text: str) -> None:
+        texts = self.texts
+        if doc >= len(texts):
+            texts.extend([""] * (doc + 1 - len(texts)))
+        texts[doc] = text
+        words = self.words
+        for word in set(_WORDS.findall(text)):
+            docs = words.get(word)
+            if docs is None:
+                words[word] = {doc}
+                self._add_word(word)
+            else:
+                docs.add(doc)
+
+    def drop(self, doc: int) -> None:
+        text = self.texts[doc]
+        self.texts[doc] = ""
+        for word in set(_WORDS.findall(text)):
+            docs = self.words.get(word)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del self.words[word]
+                    self._drop_word(word)
+
+    def match(self, needle: str) -> Docs:
+        """Ids cuyo texto contiene `needle` (en minúsculas, sin espacios)."""
+        parts = _WORDS.findall(needle)
+        if not parts:
+            return set()
+        found = self._match_word(parts[0])
+        for part in parts[1:]:
+            if not found:
+                return found
+            found &= self._match_word(part)
+        if len(parts) > 1 or parts[0] != needle:
+            # Con separadores ("gato_baile"): las palabras, seguidas y tal cual
+            texts = self.texts
+            found = {d for d in found if needle in texts[d]}
+        return found
+
+    def _match_word(self, part: str) -> Docs:
+        """Ids con una palabra que empieza por `part` (1–2 letras) o que la contiene."""
+        if len(part) < 3:
+            if self._sorted is None:
+                self._sorted = sorted(self.words)
+            candidates: Iterable[str] = _prefixed(self._sorted, part)
+        else:
+            sets = []
+            for gram in _trigrams(part):
+                words = self.grams.get(gram)
+                if not words:
+                    return set()
+                sets.append(words)
+            sets.sort(key=len)
+            candidates = set(sets[0]).intersection(*sets[1:])
+            if len(part) > 3:       # con 3 letras el trigrama ya es la palabra buscada
+                candidates = [w for w in candidates if part in w]
+        found: Docs = set()
+        for word in candidates:
+            found |= self.words[word]
+        return found
+
+    def _add_word(self, word: str) -> None:
+        self._sorted = None
+        grams = self.grams
+        for gram in _trigrams(word):
+            words = grams.get(gram)
+            if words is None:
+                grams[gram] = {word}
+            else:
+                words.add(word)
+
+    def _drop_word(self, word: str) -> None:
+        self._sorted = None
+        for gram in _trigrams(word):
+            words = self.grams.get(gram)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self.grams[gram]
+
+
+class _Column:
+    """
+    Un campo numérico de los documentos, ordenado, con su documento en
+    paralelo. Tras cambios masivos queda `stale` y se reordena al consultarlo.
+    """
+
+    def __init__(self, position: int) -> None:
+        self.position = position        # posición en la tupla de valores del documento
+        self.values: List[int] = []
+        self.docs: List[int] = []
+        self.stale = False
+
+    def load(self, rows: List[Tuple[int, ...] | None]) -> None:
+        i = self.position
+        pairs = sorted((v[i], d) for d, v in enumerate(rows) if v is not None)
+        self.values = [v for v, _ in pairs]
+        self.docs = [d for _, d in pairs]
+        self.stale = False
+
+    def move(self, doc: int, old: Tuple[int, ...] | None, new: Tuple[int, ...] | None) -> None:
+        if self.stale:
+            return
+        i = self.position
+        if old is not None:
+            lo = bisect_left(self.values, old[i])
+            hi = bisect_right(self.values, old[i], lo)
+            try:
+                at = self.docs.index(doc, lo, hi)
+            except ValueError:
+                pass
+            else:
+                del self.values[at]
+                del self.docs[at]
+        if new is not None:
+            at = bisect_right(self.values, new[i])
+            self.values.insert(at, new[i])
+            self.docs.insert(at, doc)
+
+    def select(self, op: str, value: float) -> Docs:
+        first = bisect_left(self.values, value)             # primer valor >= value
+        after = bisect_right(self.values, value, first)     # primer valor > value
+        lo, hi = {
+            ">": (after, len(self.values)), ">=": (first, len(self.values)),
+            "<": (0, first), "<=": (0, after),
+        }.get(op, (first, after))
+        return set(self.docs[lo:hi])
+
+
+class SearchIndex(StoreIndex):
+    """Búsqueda incremental sobre las entradas de un `LibraryStore`."""
+
+    BULK = 100      # más cambios por `sync()`: las columnas numéricas se reordenan al consultarlas
+    NARROW = 2000   # con menos candidatos, los términos siguientes se comprueban uno a uno
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._ids: Dict[str, int] = {}              # ruta canónica → documento
+        self._paths: List[str | None] = []          # documento → ruta (None = libre)
+        self._free: List[int] = []
+        self._tags: List[Tuple[str, ...]] = []      # documento → etiquetas (minúsculas)
+        self._values: List[Tuple[int, ...] | None] = []   # documento → (w, h, frames, dur, size)
+        self._names = _TextIndex()                  # documento → nombre + etiquetas
+        # Carpetas: una entrada por carpeta, con sus documentos
+        self._dir_ids: Dict[str, int] = {}
+        self._dir_docs: List[Docs] = []
+        self._dir_of: List[int] = []                # documento → carpeta
+        self._dirs = _TextIndex()                   # carpeta → componentes de su ruta
+        self._tag_docs: Dict[str, Docs] = {}
+        self._numeric: Dict[str, _Column] = {f: _Column(i) for f, i in _FIELDS.items()}
+
+    # ---------- API ----------
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def index(self, entries: Iterable[GifEntry]) -> None:
+        """Indexa (o actualiza) entradas sueltas, sin store."""
+        entries = list(entries)
+        self._bulk(len(entries))
+        for entry in entries:
+            self._put(entry)
+
+    def remove(self, raw_paths: Iterable[str]) -> None:
+        for path in raw_paths:
+            self._drop(canonical_path(path))
+
+    def query(self, text: str) -> Set[str] | None:
+        """
+        Rutas que cumplen todos los términos de `text`; None si no hay
+        términos (sin filtro). Aplica antes los cambios pendientes.
+        """
+        terms = text.lower().split()
+        if not terms:
+            return None
+        self.sync()
+        found: Docs | None = None
+        for term in terms:
+            if found is None:
+                found = self._match(term)
+            elif len(found) < self.NARROW:
+                found = self._narrow(found, term)
+            else:
+                found &= self._match(term)
+            if not found:
+                return set()
+        if len(found) == 1:
+            return {self._paths[found.pop()]}     # type: ignore[arg-type]
+        return set(itemgetter(*found)(self._paths))
+
+    # ---------- internos ----------
+    def _indexed(self) -> Iterable[str]:
+        return self._ids
+
+    def _match(self, term: str) -> Docs:
+        if term.startswith("#"):
+            return self._match_tag(term[1:])
+        conditions = self._conditions(term)
+        if conditions is not None:
+            found: Docs | None = None
+            for fld, op, value in conditions:
+                column = self._numeric[fld]
+                if column.stale:
+                    column.load(self._values)
+                docs = column.select(op, value)
+                found = docs if found is None else found & docs
+            return found or set()
+        found = self._names.match(term)
+        dir_docs = self._dir_docs
+        for d in self._dirs.match(term):
+            found |= dir_docs[d]
+        return found
+
+    def _match_tag(self, prefix: str) -> Docs:
+        found: Docs = set()
+        for tag, docs in self._tag_docs.items():
+            if tag.startswith(prefix):
+                found |= docs
+        return found
+
+    def _narrow(self, found: Docs, term: str) -> Docs:
+        """Como `found & _match(term)`, comprobando cada candidato en vez de consultar el índice."""
+        conditions = self._conditions(term)
+        if conditions is not None:
+            values = self._values
+            return {
+                d for d in found
+                if values[d] is not None and all(
+                    _OPS[op](values[d][_FIELDS[fld]], value)    # type: ignore[index]
+                    for fld, op, value in conditions)
+            }
+        if term.startswith("#") or len(term) < 3:
+            return found & self._match(term)
+        names, dirs, dir_of = self._names.texts, self._dirs.texts, self._dir_of
+        return {d for d in found if term in names[d] or term in dirs[dir_of[d]]}
+
+    def _conditions(self, term: str) -> List[Condition] | None:
+        """Condiciones del término numérico o None si `term` no lo es (se busca como texto)."""
+        dims = _DIMS.match(term)
+        if dims:
+            return [("w", "=", int(dims.group(1))), ("h", "=", int(dims.group(2)))]
+        m = _NUMERIC.match(term)
+        if m is None or m.group("field") not in _ALIASES:
+            return None
+        name = m.group("field")
+        fld = _ALIASES[name]
+        value = float(m.group("value").replace(",", "."))
+        if fld == "dur":
+            value *= 1 if m.group("unit") == "ms" else 1000
+        elif name == "mb":
+            value *= 1024 * 1024
+        elif name == "kb":
+            value *= 1024
+        return [(fld, m.group("op"), value)]
+
+    def _before_sync(self, changes: int) -> None:
+        self._bulk(changes)
+
+    def _bulk(self, changes: int) -> None:
+        # Reordenar una columna entera es más barato que muchos `insert` en ella
+        if changes > self.BULK:
+            for column in self._numeric.values():
+                column.stale = True
+
+    def _put(self, entry: GifEntry) -> None:
+        path = entry.path
+        tags = tuple(t.lower() for t in entry.tags)
+        values = (entry.width, entry.height, entry.frames, entry.duration_ms,
+                  entry.file_size) if entry.frames else None
+        doc = self._ids.get(path)
+        if doc is None:
+            doc = self._new_doc(path)
+            self._index_text(doc, path, tags)
+        elif tags != self._tags[doc]:
+            self._unindex_tags(doc)
+            self._names.drop(doc)
+            self._index_text(doc, path, tags)
+        old = self._values[doc]
+        if values != old:
+            self._values[doc] = values
+            for column in self._numeric.values():
+                column.move(doc, old, values)
+
+    def _new_doc(self, path: str) -> int:
+        if self._free:
+            doc = self._free.pop()
+            self._paths[doc] = path
+        else:
+            doc = len(self._paths)
+            self._paths.append(path)
+            self._tags.append(())
+            self._values.append(None)
+            self._dir_of.append(-1)
+        self._ids[path] = doc
+        folder = os.path.dirname(path)
+        dir_id = self._dir_ids.get(folder)
+        if dir_id is None:
+            dir_id = self._dir_ids[folder] = len(self._dir_docs)
+            self._dir_docs.append(set())
+            parts = folder.replace("\\", "/").lower().split("/")
+            self._dirs.put(dir_id, "\n".join(p for p in parts if p))
+        self._dir_docs[dir_id].add(doc)
+        self._dir_of[doc] = dir_id
+        return doc
+
+    def _index_text(self, doc: int, path: str, tags: Tuple[str, ...]) -> None:
+        stem = os.path.splitext(os.path.basename(path))[0].lower()
+        self._names.put(doc, "\n".join((stem,) + tags))
+        self._tags[doc] = tags
+        for tag in tags:
+            self._tag_docs.setdefault(tag, set()).add(doc)
+
+    def _unindex_tags(self, doc: int) -> None:
+        for tag in self._tags[doc]:
+            docs = self._tag_docs.get(tag)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del self._tag_docs[tag]
+        self._tags[doc] = ()
+
+    def _drop(self, path: str) -> None:
+        doc = self._ids.pop(path, None)
+        if doc is None:
+            return
+        self._unindex_tags(doc)
+        self._names.drop(doc)
+        for column in self._numeric.values():
+            column.move(doc, self._values[doc], None)
+        self._values[doc] = None
+        self._dir_docs[self._dir_of[doc]].discard(doc)
+        self._dir_of[doc] = -1
+        self._paths[doc] = None
+        self._free.append(doc)
+
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+storage/sqlite_backend.py – Backend SQLite con actualizaciones por fila.
+
+• Una fila por GifEntry; las columnas salen de los campos del dataclass
+  (las columnas nuevas se agregan con ALTER TABLE al abrir).
+• UPSERT por fila y DELETE puntual: `set_speed` toca una sola fila.
+• WAL + synchronous=NORMAL: escrituras cortas sin bloquear lecturas.
+• Migración única desde library.json (marcada con PRAGMA user_version).
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import astuple, fields
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Set, get_type_hints
+
+from storage.backend import StorageBackend
+from storage.json_backend import CONFIG_FILE, JsonBackend
+from storage.models import GifEntry
+
+DB_FILE = Path(__file__).parent / "library.db"
+
+SCHEMA_VERSION = 1
+
+_SQL_TYPES = {int: "INTEGER", float: "REAL", bool: "INTEGER", str: "TEXT"}
+
+
+class SqliteBackend(StorageBackend):
+    name = "sqlite"
+
+    # Columnas consultadas para ordenar/filtrar (ajustes y metadatos en caché;
+    # `quick_hash` agrupa copias idénticas); `path` ya es PRIMARY KEY
+    INDEXED_COLUMNS: Sequence[str] = (
+        "scale", "speed", "ghost", "width", "height", "frames", "duration_ms",
+        "file_size", "quick_hash",
+    )
+
+    def __init__(self, path: Path | None = None, migrate_from: Path | None = None) -> None:
+        self.path = Path(path or DB_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        hints = get_type_hints(GifEntry)
+        self._columns = [f.name for f in fields(GifEntry)]
+        self._types = {c: hints[c] for c in self._columns}
+
+        self._ensure_schema()
+        self._migrate_json(Path(migrate_from or CONFIG_FILE))
+
+        cols = ", ".join(self._columns)
+        marks = ", ".join("?" for _ in self._columns)
+        updates = ", ".join(f"{c}=excluded.{c}" for c in self._columns if c != "path")
+        self._upsert_sql = (
+            f"INSERT INTO entries ({cols}) VALUES ({marks}) "
+            f"ON CONFLICT(path) DO UPDATE SET {updates}"
+        )
+
+    # ---------- StorageBackend ----------
+    def load(self) -> List[GifEntry]:
+        cols = ", ".join(self._columns)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {cols} FROM entries ORDER BY rowid").fetchall()
+        return [self._from_row(r) for r in rows]
+
+    def write_all(self, entries: List[GifEntry]) -> None:
+        with self._lock, self._transaction():
+            self._conn.execute("DELETE FROM entries")
+            self._conn.executemany(self._upsert_sql, [self._to_row(e) for e in entries])
+
+    def write_changes(
+        self, entries: Dict[str, GifEntry], changed: Set[str], removed: Set[str]
+    ) -> None:
+        rows = [self._to_row(entries[p]) for p in changed if p in entries]
+        with self._lock, self._transaction():
+            if removed:
+                self._conn.executemany(
+                    "DELETE FROM entries WHERE path = ?", [(p,) for p in removed]
+                )
+            if rows:
+                self._conn.executemany(self._upsert_sql, rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------- esquema ----------
+    def _ensure_schema(self) -> None:
+        defs = ", ".join(
+            f"{c} {_SQL_TYPES.get(self._types[c], 'TEXT')}"
+            + (" PRIMARY KEY" if c == "path" else "")
+            for c in self._columns
+        )
+        with self._transaction():
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS entries ({defs})")
+            existing = {r[1] for r in self._conn.execute("PRAGMA table_info(entries)")}
+            for c in self._columns:
+                if c not in existing:
+                    sql_type = _SQL_TYPES.get(self._types[c], "TEXT")
+                    self._conn.execute(f"ALTER TABLE entries ADD COLUMN {c} {sql_type}")
+            for c in self.INDEXED_COLUMNS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_entries_{c} ON entries({c})")
+
+    def _migrate_json(self, json_file: Path) -> None:
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        entries = JsonBackend(json_file).load() if json_file.exists() else []
+        with self._transaction():
+            if entries:
+                self._conn.executemany(
+                    self._upsert_sql_for_migration(), [self._to_row(e) for e in entries]
+                )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _upsert_sql_for_migration(self) -> str:
+        # Rutas duplicadas en el JSON histórico: gana la última, igual que al cargarlo
+        cols = ", ".join(self._columns)
+        marks = ", ".join("?" for _ in self._columns)
+        return f"INSERT OR REPLACE INTO entries ({cols}) VALUES ({marks})"
+
+    # ---------- conversión ----------
+    def _to_row(self, entry: GifEntry) -> tuple:
+        return tuple(
+            json.dumps(v) if isinstance(v, (list, dict)) else v for v in astuple(entry)
+        )
+
+    def _from_row(self, row: Sequence[Any]) -> GifEntry:
+        values: Dict[str, Any] = {}
+        for c, v in zip(self._columns, row):
+            if v is None:
+                continue  # columna agregada después: usa el valor por defecto
+            t = self._types[c]
+            if t is bool:
+                v = bool(v)
+            elif t not in _SQL_TYPES:
+                v = json.loads(v)
+            values[c] = v
+        return GifEntry(**values)
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._conn)
+
+
+class _Transaction:
+    """BEGIN/COMMIT explícitos (la conexión está en modo autocommit)."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._conn.execute("BEGIN")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # noqa: ANN001
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+storage/store_index.py – Base de los índices en memoria que siguen a un LibraryStore.
+
+• `attach(store)` se suscribe a los cambios del store y solo anota las
+  rutas (O(cambios)); `sync()` las aplica, por tandas si se pide.
+• Cada índice implementa `_put(entry)` (añadir o actualizar), `_drop(path)`
+  y `_indexed()` (rutas que ya tiene); `_before_sync(n)` avisa de cuántas
+  entradas se van a aplicar.
+• Lo usan `storage.search_index` y `storage.duplicates`.
+• Sin dependencias de Qt.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Iterable, Set
+
+from storage.library_store import LibraryStore
+from storage.models import GifEntry
+
+__all__ = ["StoreIndex"]
+
+
+class StoreIndex(ABC):
+    """Índice incremental sobre las entradas de un `LibraryStore`."""
+
+    def __init__(self) -> None:
+        self._store: LibraryStore | None = None
+        self._pending_changed: Set[str] = set()
+        self._pending_removed: Set[str] = set()
+
+    # ---------- API ----------
+    def attach(self, store: LibraryStore) -> None:
+        """Indexa `store` (en `sync()`) y sigue sus cambios."""
+        self.detach()
+        self._store = store
+        store.subscribe(self._on_store_changed)
+        # Lo ya indexado que no esté en `store` se quita en `sync()`
+        self._pending_changed.update(self._indexed())
+        self._pending_changed.update(e.path for e in store.items())
+
+    def detach(self) -> None:
+        if self._store is not None:
+            self._store.unsubscribe(self._on_store_changed)
+            self._store = None
+
+    def pending(self) -> int:
+        """Cambios del store aún sin aplicar."""
+        return len(self._pending_changed) + len(self._pending_removed)
+
+    def sync(self, limit: int | None = None) -> int:
+        """Aplica hasta `limit` cambios pendientes (todos si None). Devuelve los que quedan."""
+        if self._pending_removed:
+            for path in self._pending_removed:
+                self._drop(path)
+            self._pending_removed.clear()
+        count = len(self._pending_changed)
+        if limit is not None and limit < count:
+            paths = [self._pending_changed.pop() for _ in range(limit)]
+        else:
+            paths, self._pending_changed = list(self._pending_changed), set()
+        self._before_sync(len(paths))
+        get = self._store.get if self._store is not None else (lambda p: None)
+        for path in paths:
+            entry = get(path)
+            if entry is None:
+                self._drop(path)
+            else:
+                self._put(entry)
+        return len(self._pending_changed)
+
+    # ---------- internos ----------
+    def _on_store_changed(self, changed: Set[str], removed: Set[str]) -> None:
+        # Solo anota (O(cambios)): el trabajo se hace en `sync()`
+        self._pending_changed -= removed
+        self._pending_removed |= removed
+        self._pending_removed -= changed
+        self._pending_changed |= changed
+
+    def _before_sync(self, changes: int) -> None:
+        pass
+
+    @abstractmethod
+    def _indexed(self) -> Iterable[str]:
+        ...
+
+    @abstractmethod
+    def _put(self, entry: GifEntry) -> None:
+        ...
+
+    @abstractmethod
+    def _drop(self, path: str) -> None:
+        ...
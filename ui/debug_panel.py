@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+ui/debug_panel.py – Panel de rendimiento (métricas de `utils.instrumentation`).
+
+• Tabla por overlay: FPS objetivo/logrados, decode y pintado (p50/p95),
+  frames perdidos/saltados y memoria de caché.
+• Resumen del proceso: RSS, caché de frames, reloj, presupuesto y store.
+• Se refresca solo mientras está visible; botón para registrar en JSON-lines.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QHideEvent, QShowEvent
+from PyQt6.QtWidgets import (
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from utils.instrumentation import instrumentation
+
+LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
+
+COLUMNS = (
+    "GIF", "FPS obj.", "FPS", "Decode p50/p95 (ms)", "Pintado p50/p95 (ms)",
+    "Perdidos", "Saltados", "Caché (MB)",
+)
+
+
+def _pair(summary: dict | None) -> str:
+    if not summary or not summary["count"]:
+        return "–"
+    return f"{summary['p50']:.2f} / {summary['p95']:.2f}"
+
+
+class PerformancePanel(QWidget):
+    REFRESH_MS = 1000
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+
+        self.summary = QLabel()
+        self.summary.setWordWrap(True)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setStretchLastSection(True)
+
+        self.btn_log = QPushButton("Registrar en JSONL")
+        self.btn_log.setCheckable(True)
+        self.btn_log.toggled.connect(self._toggle_logging)
+        self.log_label = QLabel()
+
+        bar = QHBoxLayout()
+        bar.addWidget(self.btn_log)
+        bar.addWidget(self.log_label, 1)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.summary)
+        layout.addWidget(self.table, 1)
+        layout.addLayout(bar)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    # ---------- refresco ----------
+    def refresh(self) -> None:
+        snap = instrumentation().snapshot()
+        overlays = snap["overlays"]
+
+        self.table.setRowCount(len(overlays))
+        for row, ov in enumerate(overlays):
+            values = (
+                ov["key"],
+                f"{ov['target_fps']:.1f}",
+                f"{ov['achieved_fps']:.1f}",
+                _pair(ov["decode_ms"]),
+                _pair(ov["paint_ms"]),
+                str(ov["dropped"]),
+                str(ov["skipped"]),
+                f"{ov['cache_mb']:.1f}",
+            )
+            for col, text in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+
+        lines = [f"<b>RSS:</b> {snap['rss_mb']:.1f} MB"]
+        cache = snap.get("frame_cache")
+        if cache:
+            lines.append(
+                f"<b>Caché de frames:</b> {cache['bytes'] / 2**20:.1f} / "
+                f"{cache['max_bytes'] / 2**20:.0f} MB en {cache['sets']} juegos"
+            )
+            if cache.get("storage", "argb") != "argb":
+                lines.append(
+                    f"<b>Formato {cache['storage']}:</b> "
+                    f"{cache['saved_bytes'] / 2**20:.1f} MB menos que en ARGB "
+                    f"({cache['argb_bytes'] / 2**20:.1f} MB)"
+                )
+        clock = snap.get("clock")
+        if clock:
+            lines.append(f"<b>Reloj:</b> {clock['wakeups']} despertares, {clock['ticks']} ticks")
+        governor = snap.get("governor")
+        if governor:
+            state = "limitando" if governor["throttling"] else "holgado"
+            lines.append(
+                f"<b>Presupuesto:</b> {governor['granted_fps']:.0f} / "
+                f"{governor['demand_fps']:.0f} FPS pedidos ({state})"
+            )
+        power = snap.get("power")
+        if power:
+            lines.append(f"<b>Ahorro:</b> {power['saved_wakeups']:.0f} despertares evitados")
+        for kind, stats in snap["store"].items():
+            lines.append(
+                f"<b>Store ({kind}):</b> {stats['count']} volcados, "
+                f"p50 {stats['p50']:.1f} ms, p95 {stats['p95']:.1f} ms"
+            )
+        self.summary.setText("<br>".join(lines))
+
+    # ---------- registro ----------
+    def _toggle_logging(self, enabled: bool) -> None:
+        metrics = instrumentation()
+        if enabled:
+            path = LOG_DIR / time.strftime("metrics-%Y%m%d-%H%M%S.jsonl")
+            metrics.start_logging(path)
+            self.log_label.setText(str(path))
+        else:
+            metrics.stop_logging()
+            self.log_label.clear()
+
+    # ---------- visibilidad ----------
+    def showEvent(self, event: QShowEvent) -> None:  # noqa: N802
+        self.refresh()
+        self._timer.start()
+        # Sincroniza con un registro iniciado desde fuera (p. ej. DESKTOPGIF_METRICS)
+        path = instrumentation().logging_path()
+        self.btn_log.blockSignals(True)
+        self.btn_log.setChecked(path is not None)
+        self.btn_log.blockSignals(False)
+        self.log_label.setText(str(path) if path is not None else "")
+        super().showEvent(event)
+
+    def hideEvent(self, event: QHideEvent) -> None:  # noqa: N802
+        self._timer.stop()
+        super().hideEvent(event)
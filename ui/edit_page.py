@@ -2,12 +2,15 @@
 # coding: utf-8
 """
 ui/edit_page.py – Panel de Edición (placeholder para futuro).
+
+• Aloja, opcionalmente, el panel de rendimiento (`ui.debug_panel`); se
+  crea la primera vez que se pide, así no cuesta nada si no se usa.
 """
 
 from __future__ import annotations
 
 from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QLabel, QWidget, QVBoxLayout
+from PyQt6.QtWidgets import QLabel, QPushButton, QWidget, QVBoxLayout
 
 
 class EditPage(QWidget):
@@ -17,6 +20,24 @@ class EditPage(QWidget):
         lbl = QLabel("<h2>Panel de Edición</h2><p>Próximamente…</p>")
         lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
+        self.btn_debug = QPushButton("Mostrar panel de rendimiento")
+        self.btn_debug.setCheckable(True)
+        self.btn_debug.toggled.connect(self._toggle_debug)
+        self._debug_panel: QWidget | None = None
+
         layout = QVBoxLayout()
         layout.addWidget(lbl)
+        layout.addWidget(self.btn_debug, alignment=Qt.AlignmentFlag.AlignHCenter)
         self.setLayout(layout)
+
+    def _toggle_debug(self, visible: bool) -> None:
+        if self._debug_panel is None:
+            from ui.debug_panel import PerformancePanel
+            self._debug_panel = PerformancePanel(self)
+            layout = self.layout()
+            assert layout is not None
+            layout.addWidget(self._debug_panel)
+        self._debug_panel.setVisible(visible)
+        self.btn_debug.setText(
+            "Ocultar panel de rendimiento" if visible else "Mostrar panel de rendimiento"
+        )
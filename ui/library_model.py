@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+ui/library_model.py – Modelo de la librería para una vista virtualizada.
+
+• `LibraryModel` (QAbstractListModel): una fila por ruta canónica; la
+  GifEntry se lee del `LibraryStore` al pintar. Sin ítems ni QIcon por
+  entrada: memoria y población no crecen con el tamaño de la librería.
+• El orden lo mantiene el propio modelo (clave por fila, `bisect` al
+  insertar): ordenar 50k filas con un `lessThan` en Python tarda segundos.
+• El filtro también (`set_filter`: predicado sobre la entrada y/o conjunto
+  de rutas de una búsqueda): las filas visibles son una subsecuencia del
+  orden completo, recalculada de una vez. Un QSortFilterProxyModel tarda
+  segundos en volver a mostrar 100k filas dispersas.
+• Miniaturas: solo las que la vista pide (`set_thumbnail`); `keep_thumbnails`
+  suelta las de filas que quedaron lejos del área visible.
+"""
+
+from __future__ import annotations
+
+import os
+from bisect import bisect_left, bisect_right
+from typing import AbstractSet, Callable, Dict, Iterable, List, Set, Tuple
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+from PyQt6.QtGui import QIcon, QPixmap
+
+from storage.library_store import GifEntry, LibraryStore
+from storage.path_index import PathIndex, canonical_path
+
+PATH_ROLE = Qt.ItemDataRole.UserRole            # ruta canónica
+ORDER_ROLE = Qt.ItemDataRole.UserRole + 1       # orden de inserción
+
+SortKey = Callable[[str, int, "GifEntry | None"], tuple]   # (ruta, orden, entrada) → clave
+Accepts = Callable[["GifEntry | None"], bool]
+
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def tooltip(path: str, entry: GifEntry | None, copies: Iterable[str] = ()) -> str:
+    lines = [os.path.basename(path)]
+    if entry is not None and entry.frames:
+        lines.append(
+            f"{entry.width}×{entry.height} · {entry.frames} frames · "
+            f"{entry.duration_ms / 1000:.1f} s · {format_bytes(entry.file_size)}"
+        )
+    if entry is not None and entry.tags:
+        lines.append(" ".join(f"#{t}" for t in entry.tags))
+    copies = list(copies)
+    if copies:
+        more = f" y {len(copies) - 1} más" if len(copies) > 1 else ""
+        lines.append(f"Copia idéntica de {copies[0]}{more}")
+    return "\n".join(lines)
+
+
+def insertion_order(path: str, seq: int, entry: GifEntry | None) -> tuple:
+    return (seq,)
+
+
+class LibraryModel(QAbstractListModel):
+    """Filas visibles de la librería, en el orden de la vista, respaldadas por el store."""
+
+    BULK_REFRESH = 500          # más filas cambiadas que esto: sin `dataChanged`
+
+    def __init__(
+        self, store: LibraryStore, placeholder: QIcon, parent: QObject | None = None
+    ) -> None:
+        super().__init__(parent)
+        self._store = store
+        self._placeholder = placeholder
+        # Todas las entradas, ordenadas, y su clave de orden
+        self._order: List[str] = []
+        self._keys: List[tuple] = []
+        self._key_of: Dict[str, tuple] = {}
+        # Filas visibles: subsecuencia de `_order` que pasa el filtro
+        self._paths: List[str] = []             # fila → ruta canónica
+        self._vkeys: List[tuple] | None = []    # fila → clave de orden (None = por recalcular)
+        self._rows: Dict[str, int] | None = {}  # ruta → fila (None = por recalcular)
+        # ruta canónica → orden de inserción → GifEntry con la que se añadió
+        self._index: PathIndex[int] = PathIndex()
+        self._added = 0
+        self._sort_key: SortKey = insertion_order
+        self._accepts: Accepts | None = None
+        self._only: AbstractSet[str] | None = None
+        self._thumbs: Dict[str, QIcon] = {}
+        # ruta → sus copias idénticas (solo para el tooltip; p. ej. `DuplicateIndex.copies`)
+        self.copies_of: Callable[[str], List[str]] | None = None
+
+    # ---------- QAbstractListModel ----------
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):  # noqa: ANN201
+        row = index.row()
+        if not index.isValid() or row >= len(self._paths):
+            return None
+        path = self._paths[row]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._thumbs.get(path, self._placeholder)
+        if role == PATH_ROLE:
+            return path
+        if role == Qt.ItemDataRole.ToolTipRole:
+            copies = self.copies_of(path) if self.copies_of is not None else ()
+            return tooltip(path, self.entry(path), copies)
+        if role == ORDER_ROLE:
+            return self._index.item(path)
+        return None
+
+    # ---------- filas ----------
+    def __contains__(self, raw_path: object) -> bool:
+        """Está en el modelo (visible o no)."""
+        return raw_path in self._index
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def path_at(self, row: int) -> str:
+        return self._paths[row]
+
+    def paths_at(self, rows: Iterable[int]) -> List[str]:
+        return [self._paths[r] for r in rows]
+
+    def paths(self) -> List[str]:
+        """Rutas visibles, en orden."""
+        return list(self._paths)
+
+    def entry(self, raw_path: str) -> GifEntry | None:
+        # El store manda (`update()` puede sustituir la entrada); el índice, de respaldo
+        return self._store.get(raw_path) or self._index.entry(raw_path)
+
+    def row_of(self, raw_path: str) -> int:
+        """Fila visible de `raw_path` o -1 (no está o no pasa el filtro)."""
+        if self._rows is None:
+            self._rows = {p: i for i, p in enumerate(self._paths)}
+        return self._rows.get(canonical_path(raw_path), -1)
+
+    def add(self, entries: Iterable[GifEntry]) -> int:
+        """Añade las entradas que no estén ya, en su sitio según el orden. Devuelve cuántas."""
+        new: List[Tuple[tuple, str]] = []
+        for entry in entries:
+            path = canonical_path(entry.path)
+            if path in self._index:
+                continue
+            seq, self._added = self._added, self._added + 1
+            self._index.put(path, seq, entry)
+            new.append((self._sort_key(path, seq, entry), path))
+        if not new:
+            return 0
+        new.sort()
+        self._key_of.update((p, k) for k, p in new)
+        if not self._keys or new[0][0] >= self._keys[-1]:
+            self._keys.extend(k for k, _ in new)
+            self._order.extend(p for _, p in new)
+        else:
+            for key, path in new:
+                at = bisect_right(self._keys, key)
+                self._keys.insert(at, key)
+                self._order.insert(at, path)
+        self._insert_rows([(k, p) for k, p in new if self._shown(p)])
+        return len(new)
+
+    def remove(self, raw_paths: Iterable[str]) -> List[str]:
+        """Quita las rutas presentes. Devuelve las quitadas."""
+        removed = list(dict.fromkeys(
+            p for p in map(canonical_path, raw_paths) if p in self._index
+        ))
+        if not removed:
+            return removed
+        self._remove_rows(removed)
+        if len(removed) > self.BULK_REFRESH:
+            gone = set(removed)
+            keep = [i for i, p in enumerate(self._order) if p not in gone]
+            self._order = [self._order[i] for i in keep]
+            self._keys = [self._keys[i] for i in keep]
+        else:
+            for path in removed:
+                at = self._position(path)
+                del self._order[at]
+                del self._keys[at]
+        for path in removed:
+            del self._key_of[path]
+            self._index.pop(path)
+            self._thumbs.pop(path, None)
+        return removed
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._order.clear()
+        self._keys.clear()
+        self._key_of.clear()
+        self._paths.clear()
+        self._vkeys = []
+        self._rows = {}
+        self._index.clear()
+        self._thumbs.clear()
+        self._added = 0
+        self.endResetModel()
+
+    def refresh(self, raw_paths: Iterable[str]) -> bool:
+        """
+        Avisa a la vista de que cambiaron las entradas de `raw_paths`: con un
+        filtro activo, las que ahora lo pasan (o dejan de pasarlo) aparecen
+        (o desaparecen). Con más de `BULK_REFRESH` no hace nada y devuelve
+        False: lo visible (tooltip) se calcula al pedirlo y un `dataChanged`
+        de miles de filas le cuesta a QListView ~0,1 s; quien filtre debe
+        reaplicar el filtro (`set_filter`).
+        """
+        paths = [canonical_path(p) for p in raw_paths if p in self._index]
+        if len(paths) > self.BULK_REFRESH:
+            return False
+        filtered = self.is_filtered()
+        shown: List[Tuple[tuple, str]] = []
+        hidden: List[str] = []
+        for path in paths:
+            row = self.row_of(path)
+            if filtered and not self._shown(path):
+                if row >= 0:
+                    hidden.append(path)
+            elif row < 0:
+                shown.append((self._key_of[path], path))
+            else:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+        self._remove_rows(hidden)
+        self._insert_rows(sorted(shown))
+        return True
+
+    # ---------- orden ----------
+    def set_sort_key(self, key: SortKey) -> None:
+        """Reordena todas las filas con `key` (las nuevas se insertan ya en su sitio)."""
+        self._sort_key = key
+        keys = [key(p, self._index.item(p) or 0, self.entry(p)) for p in self._order]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._key_of = dict(zip(self._order, keys))
+        if order == list(range(len(order))):
+            self._keys = keys
+            self._vkeys = None
+            return
+        self._order = [self._order[i] for i in order]
+        self._keys = [keys[i] for i in order]
+        # Mismas filas visibles, en el nuevo orden
+        visible = set(self._paths)
+        paths = self._order if len(visible) == len(self._order) else \
+            [p for p in self._order if p in visible]
+        self.layoutAboutToBeChanged.emit([], QAbstractListModel.LayoutChangeHint.VerticalSortHint)
+        new_row = {p: i for i, p in enumerate(paths)}
+        for index in self.persistentIndexList():
+            if index.isValid():
+                self.changePersistentIndex(
+                    index, self.index(new_row[self._paths[index.row()]])
+                )
+        self._paths = list(paths)
+        self._vkeys = None
+        self._rows = new_row
+        self.layoutChanged.emit([], QAbstractListModel.LayoutChangeHint.VerticalSortHint)
+
+    # ---------- filtro ----------
+    def set_filter(
+        self, accepts: Accepts | None = None, only: AbstractSet[str] | None = None
+    ) -> None:
+        """
+        Muestra solo las entradas de `only` (rutas canónicas, p. ej. una
+        búsqueda) que cumplan `accepts(entry)`. None = sin esa condición.
+        """
+        self._accepts = accepts
+        self._only = only
+        self.beginResetModel()
+        if only is not None and len(only) < len(self._order) // 8:
+            # Pocas coincidencias: se ordenan ellas en vez de recorrer todo
+            key_of = self._key_of
+            paths = sorted((p for p in only if p in key_of), key=key_of.__getitem__)
+        elif only is not None:
+            paths = [p for p in self._order if p in only]
+        else:
+            paths = list(self._order)
+        if accepts is not None:
+            entry = self.entry
+            paths = [p for p in paths if accepts(entry(p))]
+        self._paths = paths
+        self._vkeys = None
+        self._rows = None
+        self.endResetModel()
+
+    def is_filtered(self) -> bool:
+        return self._accepts is not None or self._only is not None
+
+    def _shown(self, path: str) -> bool:
+        if self._only is not None and path not in self._only:
+            return False
+        return self._accepts is None or self._accepts(self.entry(path))
+
+    # ---------- internos ----------
+    def _position(self, path: str) -> int:
+        """Posición de `path` en `_order` (claves únicas: llevan el orden de inserción)."""
+        at = bisect_left(self._keys, self._key_of[path])
+        if at < len(self._order) and self._order[at] == path:
+            return at
+        return self._order.index(path)
+
+    def _insert_rows(self, new: List[Tuple[tuple, str]]) -> None:
+        """Inserta filas visibles (`new` ordenadas por clave) en su sitio."""
+        if not new:
+            return
+        if self._vkeys is None:
+            self._vkeys = [self._key_of[p] for p in self._paths]
+        first = len(self._paths)
+        if not self._vkeys or new[0][0] >= self._vkeys[-1]:
+            # Caso habitual (orden de inserción): un único bloque al final
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            self._vkeys.extend(k for k, _ in new)
+            self._paths.extend(p for _, p in new)
+            if self._rows is not None:
+                self._rows.update((p, first + i) for i, (_, p) in enumerate(new))
+            self.endInsertRows()
+            return
+        for key, path in new:
+            row = bisect_right(self._vkeys, key)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._vkeys.insert(row, key)
+            self._paths.insert(row, path)
+            self._rows = None
+            self.endInsertRows()
+
+    def _remove_rows(self, paths: Iterable[str]) -> None:
+        """Quita las filas visibles de `paths`, por tramos contiguos."""
+        rows = sorted({r for r in map(self.row_of, paths) if r >= 0})
+        if not rows:
+            return
+        # De la última a la primera: las filas anteriores no se desplazan
+        while rows:
+            last = rows.pop()
+            first = last
+            while rows and rows[-1] == first - 1:
+                first = rows.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._paths[first:last + 1]
+            if self._vkeys is not None:
+                del self._vkeys[first:last + 1]
+            self.endRemoveRows()
+        self._rows = None
+
+    # ---------- miniaturas ----------
+    def has_thumbnail(self, path: str) -> bool:
+        return path in self._thumbs
+
+    def set_thumbnail(self, raw_path: str, pix: QPixmap) -> None:
+        row = self.row_of(raw_path)
+        if row < 0:
+            return
+        self._thumbs[self._paths[row]] = QIcon(pix)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def forget_thumbnail(self, raw_path: str) -> None:
+        self._thumbs.pop(canonical_path(raw_path), None)
+
+    def keep_thumbnails(self, paths: Set[str]) -> int:
+        """Suelta las miniaturas fuera de `paths` (filas lejos de la vista). Devuelve cuántas."""
+        drop = [p for p in self._thumbs if p not in paths]
+        for path in drop:
+            del self._thumbs[path]
+        return len(drop)
+
+    def thumbnail_count(self) -> int:
+        return len(self._thumbs)
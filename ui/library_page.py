@@ -2,126 +2,633 @@
 # coding: utf-8
 """
 ui/library_page.py – Librería persistente con miniaturas de GIF.
+
+• Vista virtualizada (`ui.library_model`): QListView sobre un modelo
+  respaldado por el store, sin un ítem ni un QIcon por entrada.
+• `populate()` rellena el modelo por tandas sin bloquear el bucle de eventos
+  (`populated` al terminar, `thumbnailsDone` con las miniaturas visibles).
+• Miniaturas solo de las filas visibles y de una pantalla más por arriba y
+  por abajo; las peticiones que salen de ese margen se cancelan y las
+  miniaturas a más de `KEEP_PAGES` pantallas se sueltan (RSS acotada).
+• El gestor de overlays (y su cadena de importaciones) se crea al abrir
+  el primer GIF.
+• Carpetas vigiladas (`utils.folder_watcher`): se escanean en segundo
+  plano, sus GIF entran en un solo lote y los cambios posteriores (nuevos,
+  modificados, borrados) se reflejan solos. Se reanudan tras `populated`.
+• Metadatos en caché de cada GIF (`GifEntry`): ordenar y filtrar sin abrir
+  los archivos; se revalidan en segundo plano tras cada carga. Abrir un
+  GIF cuyo ciclo decodificado no cabe en la caché de frames pide confirmación.
+• Búsqueda (`storage.search_index`): nombre, carpetas, etiquetas y
+  metadatos; el índice sigue los cambios del store y se completa por
+  tandas tras `thumbnailsDone`. El resultado filtra el modelo, sin recrear filas.
+• Copias idénticas (`storage.duplicates`): al importar se comparan los
+  hashes rápidos; si coinciden, el hash completo se calcula en segundo
+  plano. Las copias se señalan (aviso, tooltip, filtro «Duplicados») y
+  comparten miniatura y frames decodificados.
 """
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Iterator, cast
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Set, Tuple, cast
 
-from PyQt6.QtCore import QPoint, Qt, QSize
-from PyQt6.QtGui import QAction, QIcon, QKeyEvent, QPixmap
+from PyQt6.QtCore import QCoreApplication, QPoint, QSize, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QAction, QKeyEvent, QPixmap, QShowEvent
 from PyQt6.QtWidgets import (
+    QComboBox,
     QFileDialog,
-    QListWidget,
-    QListWidgetItem,
+    QInputDialog,
+    QLabel,
+    QLineEdit,
+    QListView,
     QMenu,
+    QMessageBox,
     QStyle,
     QToolBar,
     QVBoxLayout,
     QWidget,
 )
 
-from modules.overlay import GifOverlay
-from storage.library_store import GifEntry, LibraryStore
-from utils.gif_utils import first_frame_as_pixmap
+from storage.duplicates import DuplicateIndex
+from storage.library_store import ChangeListener, GifEntry, LibraryStore
+from storage.models import decoded_bytes
+from storage.path_index import canonical_path
+from storage.search_index import SearchIndex
+from storage.store_index import StoreIndex
+from ui.library_model import PATH_ROLE, LibraryModel, format_bytes, insertion_order
+from utils.folder_watcher import FolderWatcher
+from utils.gif_meta import GifMeta
+from utils.thumb_cache import THUMB_SIZE, ThumbnailCache
+from utils.thumb_loader import ThumbnailLoader
+
+if TYPE_CHECKING:
+    from modules.overlay import GifOverlay
+    from modules.overlay_manager import OverlayManager
+
+
+def _store_detacher(
+    store: LibraryStore, listener: ChangeListener, *indexes: StoreIndex
+) -> Callable[[], None]:
+    def detach() -> None:
+        store.unsubscribe(listener)
+        for index in indexes:
+            index.detach()
+    return detach
 
 
 class LibraryPage(QWidget):
     """Página con la librería de GIFs importados."""
 
-    THUMB_SIZE = QSize(96, 96)
+    THUMB_SIZE = THUMB_SIZE
+    IDLE_PRESETS = {"Nunca": 0, "1 min": 60, "5 min": 300, "15 min": 900}
+    POPULATE_CHUNK = 2000       # filas añadidas por vuelta del bucle de eventos
+    GRID = QSize(THUMB_SIZE.width() + 20, THUMB_SIZE.height() + 20)
+    PREFETCH_PAGES = 1          # pantallas de miniaturas pedidas por delante y por detrás
+    KEEP_PAGES = 3              # más lejos que esto, las miniaturas se sueltan
+    SEARCH_CHUNK = 1000         # entradas indexadas por vuelta del bucle de eventos
+    DUPLICATES_CHUNK = 5000     # entradas agrupadas por contenido por vuelta
+    LAYOUT_BATCH = 2000         # filas dispuestas por vuelta del bucle de eventos
+    SORT_MODES = ("Agregado", "Nombre", "Tamaño", "Dimensiones", "Frames", "Duración", "Memoria")
+    FILTERS = ("Todos", "Animados", "Estáticos", "Más de 5 MB", "Exceden la memoria",
+               "Duplicados")
+    BIG_FILE = 5 * 1024 * 1024
+
+    populated = pyqtSignal()
+    thumbnailsDone = pyqtSignal()
 
     def __init__(self, store: LibraryStore) -> None:
         super().__init__()
         self._store = store
-        self._overlay: GifOverlay | None = None
+        self._overlays: OverlayManager | None = None
+        self._queue: List[GifEntry] | None = None     # entradas pendientes de `populate`
+        self._populated = False
+        self._thumbs = ThumbnailCache()
+        self._thumbs.identity = store.content_id   # copias idénticas: una miniatura
+        self._sort_mode = self.SORT_MODES[0]
+        self._filter_mode = self.FILTERS[0]
+        self._search = SearchIndex()
+        self._search.attach(store)
+        self._hits: Set[str] | None = None      # rutas de la búsqueda (None = sin buscar)
+        self._dups = DuplicateIndex()
+        self._dups.attach(store)
+        self._dup_count = 0
+        self._hash_requested: Dict[str, Tuple[int, int]] = {}   # ruta → versión pedida
+        store.subscribe(self._on_store_changed)
+        # El store sobrevive a la página: al destruirla se suelta de él (el
+        # cierre no toca widgets, ya borrados en C++)
+        self.destroyed.connect(
+            _store_detacher(store, self._on_store_changed, self._search, self._dups)
+        )
+
+        # ---------- miniaturas asíncronas ----------
+        self._loader = ThumbnailLoader(self._thumbs, self.THUMB_SIZE, parent=self)
+        self._loader.thumbnailReady.connect(self._on_thumbnail)
+        self._loader.idle.connect(self._on_loader_idle)
 
         # ---------- barra de herramientas ----------
         self.toolbar = QToolBar()
         act_add = QAction("Cargar", self)
         style = cast(QStyle, self.style())
+        self.model = LibraryModel(
+            store, style.standardIcon(style.StandardPixmap.SP_FileIcon), parent=self
+        )
+        self.model.copies_of = self._dups.copies
         act_add.setIcon(style.standardIcon(style.StandardPixmap.SP_DialogOpenButton))
         self.toolbar.addAction(act_add)
+        act_watch = QAction("Vigilar carpeta…", self)
+        act_watch.setIcon(style.standardIcon(style.StandardPixmap.SP_DirOpenIcon))
+        self.toolbar.addAction(act_watch)
+        self._act_unwatch = QAction("Dejar de vigilar", self)
+        self._act_unwatch.setEnabled(False)
+        self.toolbar.addAction(self._act_unwatch)
+        self.toolbar.addSeparator()
+        self._sort_combo = QComboBox()
+        self._sort_combo.addItems(self.SORT_MODES)
+        self._sort_combo.setToolTip("Ordenar por")
+        self.toolbar.addWidget(self._sort_combo)
+        self._filter_combo = QComboBox()
+        self._filter_combo.addItems(self.FILTERS)
+        self._filter_combo.setToolTip("Mostrar")
+        self.toolbar.addWidget(self._filter_combo)
+        self._search_box = QLineEdit()
+        self._search_box.setPlaceholderText("Buscar…  #etiqueta  ancho>300  dur<2")
+        self._search_box.setToolTip(
+            "Nombre, carpetas o etiquetas (#etiqueta); todas las palabras deben coincidir.\n"
+            "Metadatos: ancho, alto, frames, dur (s o ms), mb, kb con < <= > >= =; "
+            "o dimensiones exactas (640x480)."
+        )
+        self._search_box.setClearButtonEnabled(True)
+        self._search_box.setMaximumWidth(260)
+        self.toolbar.addWidget(self._search_box)
+        # Filtra al dejar de escribir, no en cada tecla
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self._apply_search)
+        # Índice de búsqueda al día por tandas, sin bloquear
+        self._index_timer = QTimer(self)
+        self._index_timer.setSingleShot(True)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._sync_search)
+        self.thumbnailsDone.connect(self._index_timer.start)   # lo visible, antes
+        # Copias: tras ráfagas de cambios (importaciones, metadatos, hashes)
+        self._dups_timer = QTimer(self)
+        self._dups_timer.setSingleShot(True)
+        self._dups_timer.setInterval(300)
+        self._dups_timer.timeout.connect(self._check_duplicates)
+        self._scan_label = QLabel()
+        self.toolbar.addWidget(self._scan_label)
+        # Reordenar/refiltrar tras ráfagas de metadatos nuevos
+        self._view_timer = QTimer(self)
+        self._view_timer.setSingleShot(True)
+        self._view_timer.setInterval(250)
+        self._view_timer.timeout.connect(self._apply_view)
+
+        # ---------- carpetas vigiladas ----------
+        self._watcher = FolderWatcher(parent=self)
+        self._watcher.filesAdded.connect(self._on_files_added)
+        self._watcher.filesChanged.connect(self._on_files_changed)
+        self._watcher.filesRemoved.connect(self._on_files_removed)
+        self._watcher.scanProgress.connect(self._on_scan_progress)
+        self._watcher.scanFinished.connect(self._on_scan_finished)
+        self._watcher.metadataReady.connect(self._on_metadata)
+        self._watcher.hashesReady.connect(self._on_hashes)
+        self._watch_restored = False
+        app = QCoreApplication.instance()
+        if app is not None:
+            # Sin esperar a que termine un escaneo largo al salir
+            app.aboutToQuit.connect(self._watcher.stop)
 
-        # ---------- lista ----------
-        self.list_widget = QListWidget()
-        self.list_widget.setViewMode(QListWidget.ViewMode.IconMode)
-        self.list_widget.setIconSize(self.THUMB_SIZE)
-        self.list_widget.setResizeMode(QListWidget.ResizeMode.Adjust)
-        self.list_widget.setSpacing(10)
-        self.list_widget.setMovement(QListWidget.Movement.Static)
-        self.list_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        # ---------- lista (virtualizada) ----------
+        self.list_view = QListView()
+        self.list_view.setViewMode(QListView.ViewMode.IconMode)
+        self.list_view.setIconSize(self.THUMB_SIZE)
+        self.list_view.setGridSize(self.GRID)
+        self.list_view.setUniformItemSizes(True)   # disposición sin consultar cada fila
+        # Tras filtrar, la disposición se rehace por tandas: 100k filas de una
+        # vez bloquean ~0,3 s el bucle de eventos
+        self.list_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.list_view.setBatchSize(self.LAYOUT_BATCH)
+        self.list_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.list_view.setMovement(QListView.Movement.Static)
+        self.list_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.list_view.setModel(self.model)
+        # Miniaturas del área visible, tras cada desplazamiento o cambio de filas
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(30)
+        self._visible_timer.timeout.connect(self._update_thumbnails)
+        self._scroll_value = -1
+        bar = self.list_view.verticalScrollBar()
+        bar.valueChanged.connect(self._schedule_thumbnails)
+        bar.rangeChanged.connect(self._schedule_thumbnails)
+        self.model.rowsInserted.connect(self._schedule_thumbnails)
+        self.model.rowsRemoved.connect(self._schedule_thumbnails)
+        self.model.layoutChanged.connect(self._schedule_thumbnails)
+        self.model.modelReset.connect(self._schedule_thumbnails)
 
         layout = QVBoxLayout(self)
         layout.addWidget(self.toolbar)
-        layout.addWidget(self.list_widget)
+        layout.addWidget(self.list_view)
 
         # ---------- conexiones ----------
         act_add.triggered.connect(self._add_gifs)
-        self.list_widget.customContextMenuRequested.connect(self._show_menu)
-        self.list_widget.installEventFilter(self)
+        act_watch.triggered.connect(self._watch_folder)
+        self._act_unwatch.triggered.connect(self._show_unwatch_menu)
+        self._sort_combo.currentIndexChanged.connect(self._apply_sort)
+        self._filter_combo.currentIndexChanged.connect(self._apply_filter)
+        self._search_box.textChanged.connect(lambda _: self._search_timer.start())
+        self.list_view.customContextMenuRequested.connect(self._show_menu)
+        self.list_view.installEventFilter(self)
+
+    # ---------- carga inicial ----------
+    def populate(self) -> None:
+        """Añade las entradas del store por tandas (una vez)."""
+        if self._queue is not None or self._populated:
+            return
+        self._queue = self._store.items()
+        self._queue.reverse()       # se consumen desde el final
+        self._populate_chunk()
+
+    def reload(self) -> None:
+        """Vuelve a leer la librería del disco y rehace la lista (los overlays siguen)."""
+        self._store.flush()
+        self._store.load()
+        self._loader.cancel_all()
+        self._queue = None
+        self._populated = False
+        self.model.clear()
+        self.populate()
+
+    def is_populated(self) -> bool:
+        return self._populated
+
+    def _enqueue(self, entries: Iterable[GifEntry]) -> None:
+        """Añade entradas al modelo por tandas (tras la carga inicial)."""
+        if self._queue is None:
+            self._queue = []
+            QTimer.singleShot(0, self._populate_chunk)
+        self._queue[:0] = reversed(list(entries))
+
+    def _populate_chunk(self) -> None:
+        queue = self._queue
+        if queue is None:
+            return
+        self.model.add([queue.pop() for _ in range(min(self.POPULATE_CHUNK, len(queue)))])
+        if queue:
+            QTimer.singleShot(0, self._populate_chunk)
+            return
+        self._queue = None
+        if self._populated:
+            return
+        self._populated = True
+        self.populated.emit()
+        self._update_thumbnails()
+        if not self._loader.pending_count():
+            self.thumbnailsDone.emit()
+        self._dups_timer.start()
+        known = self._store.metadata_snapshot()
+        if not self._watch_restored:
+            self._watch_restored = True
+            self._watcher.restore(known=known)
+            self._update_watch_actions()
+        # Lo de las carpetas vigiladas lo revalida su propio escaneo
+        self._watcher.refresh_metadata(
+            {p: st for p, st in known.items() if not self._watcher.covers(p)}
+        )
+
+    def _on_loader_idle(self) -> None:
+        # Entre tandas el pool puede vaciarse: solo cuenta al final
+        if self._populated:
+            self.thumbnailsDone.emit()
+
+    # ---------- overlays ----------
+    def _overlay_manager(self) -> OverlayManager:
+        if self._overlays is None:
+            from modules.frame_cache import shared_frame_cache
+            from modules.overlay_manager import OverlayManager
 
-        # ---------- carga inicial ----------
-        for entry in self._store.items():
-            self._add_item(Path(entry.path))
+            # Copias idénticas: un solo FrameSet (un decode, una vez en memoria)
+            shared_frame_cache().identity = self._store.content_id
+            self._overlays = OverlayManager(parent=self)
+            self._overlays.overlayFailed.connect(self._on_overlay_failed)
+        return self._overlays
+
+    def _open_overlay(self, path: str) -> GifOverlay | None:
+        return self._overlays.get(path) if self._overlays is not None else None
 
     # ===================================================
     def _add_gifs(self) -> None:
         paths, _ = QFileDialog.getOpenFileNames(
             self, "Agregar GIF(s)", "", "GIF Files (*.gif)"
         )
-        for p in paths:
-            self._store.add(p)
-            self._add_item(Path(p))
+        with self._store.batch():
+            entries = [self._store.add(p) for p in paths]
+        self.model.add(entries)
+        self._watcher.refresh_metadata({canonical_path(p): None for p in paths})
+
+    # ---------- carpetas vigiladas ----------
+    def _watch_folder(self) -> None:
+        folder = QFileDialog.getExistingDirectory(self, "Vigilar carpeta")
+        if folder:
+            self._watcher.add_root(folder, known=self._store.metadata_snapshot())
+            self._update_watch_actions()
+
+    def _show_unwatch_menu(self) -> None:
+        menu = QMenu(self)
+        for root in self._watcher.roots():
+            act = cast(QAction, menu.addAction(root))
+            act.triggered.connect(lambda _=False, r=root: self._unwatch(r))
+        menu.exec(self.cursor().pos())
+
+    def _unwatch(self, root: str) -> None:
+        # Los GIF ya importados se quedan en la librería
+        self._watcher.remove_root(root)
+        self._update_watch_actions()
+
+    def _update_watch_actions(self) -> None:
+        self._act_unwatch.setEnabled(bool(self._watcher.roots()))
+
+    def _on_files_added(self, metas: List[GifMeta]) -> None:
+        # Una sola transacción para todo el lote, volcada fuera del hilo GUI
+        with self._store.deferred():
+            entries = self._store.add_many(m.path for m in metas)
+            self._store.set_metadata(metas)
+        self._enqueue(e for e in entries if e.path not in self.model)
+
+    def _on_files_changed(self, metas: List[GifMeta]) -> None:
+        self._on_metadata(metas)
+        for meta in metas:
+            key = canonical_path(meta.path)
+            # La clave de la miniatura incluye mtime y tamaño: se regenera
+            self._loader.cancel(key)
+            self.model.forget_thumbnail(key)
+        self._schedule_thumbnails()
+
+    def _on_files_removed(self, paths: List[str]) -> None:
+        self._remove(paths)
+
+    def _on_scan_progress(self, root: str, done: int, total: int) -> None:
+        if total:
+            self._scan_label.setText(f"  Escaneando {Path(root).name}: {done}/{total}")
+
+    def _on_scan_finished(self, root: str, stats: dict) -> None:
+        if self._watcher.is_scanning():
+            return
+        self._scan_label.setText(
+            f"  {Path(root).name}: {stats['files']} GIF "
+            f"(+{stats['added']} −{stats['removed']})"
+        )
+
+    # ---------- metadatos: orden, filtro y memoria ----------
+    def _on_metadata(self, metas: List[GifMeta]) -> None:
+        # El tooltip se calcula al pedirlo; el modelo reevalúa el filtro de cada fila
+        notified = self.model.refresh([e.path for e in self._store.set_metadata(metas)])
+        if self._sort_combo.currentIndex() > 1 or \
+                (self._filter_combo.currentIndex() and not notified):
+            self._view_timer.start()
+
+    def _sort_key(self, path: str, seq: int, entry: GifEntry | None) -> tuple:
+        mode = self._sort_mode
+        if mode == "Agregado" or entry is None:
+            return (seq,)
+        name = os.path.basename(path).lower()
+        if mode == "Nombre":
+            return (name, seq)
+        # Numéricos: de mayor a menor, sin metadatos al final
+        value = {
+            "Tamaño": entry.file_size,
+            "Dimensiones": entry.width * entry.height,
+            "Frames": entry.frames,
+            "Duración": entry.duration_ms,
+            "Memoria": decoded_bytes(entry),
+        }[mode]
+        return (-value, name, seq)
+
+    def _matches(self, entry: GifEntry | None) -> bool:
+        mode = self._filter_mode
+        if mode == "Todos" or entry is None:
+            return True
+        if mode == "Animados":
+            return entry.frames > 1
+        if mode == "Estáticos":
+            return entry.frames == 1
+        if mode == "Más de 5 MB":
+            return entry.file_size > self.BIG_FILE
+        if mode == "Duplicados":
+            return self._dups.is_duplicate(entry.path)
+        return decoded_bytes(entry) > self._memory_budget()
+
+    def _apply_view(self) -> None:
+        """Reordena el modelo y reaplica el filtro (sin recrear filas)."""
+        self._apply_sort()
+        self._apply_filter()
+
+    def _apply_sort(self) -> None:
+        self._sort_mode = self._sort_combo.currentText()
+        # Con un orden activo, las filas nuevas se insertan ya en su sitio
+        self.model.set_sort_key(
+            self._sort_key if self._sort_combo.currentIndex() else insertion_order
+        )
+
+    def _apply_filter(self) -> None:
+        self._filter_mode = self._filter_combo.currentText()
+        self.model.set_filter(
+            self._matches if self._filter_combo.currentIndex() else None, self._hits
+        )
+
+    # ---------- búsqueda ----------
+    def _apply_search(self) -> None:
+        """Consulta el índice y filtra la vista (solo si el resultado cambió)."""
+        hits = self._search.query(self._search_box.text())
+        if hits != self._hits:
+            self._hits = hits
+            self._apply_filter()
+
+    def _sync_search(self) -> None:
+        if self._search.sync(limit=self.SEARCH_CHUNK):
+            self._index_timer.start()
+
+    def _on_store_changed(self, changed: Set[str], removed: Set[str]) -> None:
+        # El índice ya anotó las rutas: con una búsqueda activa se repite
+        # (nuevos resultados, metadatos, etiquetas); si no, se indexa por tandas
+        if self._search_box.text().strip():
+            self._search_timer.start()
+        elif self._populated:
+            self._index_timer.start()
+        if self._populated:
+            self._dups_timer.start()
+
+    # ---------- copias idénticas ----------
+    def _check_duplicates(self) -> None:
+        """Agrupa por contenido (por tandas) y pide el hash completo de las coincidencias."""
+        if self._dups.sync(limit=self.DUPLICATES_CHUNK):
+            QTimer.singleShot(0, self._check_duplicates)
+            return
+        todo = [
+            item for item in self._dups.unresolved()
+            if self._hash_requested.get(item[0]) != item[1:]
+        ]
+        if todo:
+            # Una sola petición por versión: un archivo ilegible no se reintenta
+            self._hash_requested.update((p, (m, s)) for p, m, s in todo)
+            self._watcher.hash_files(todo)
+        count = self._dups.redundant()
+        if count == self._dup_count:
+            return
+        if count > self._dup_count:
+            self._scan_label.setText(f"  {count} copias idénticas (Mostrar: Duplicados)")
+        self._dup_count = count
+        if self._filter_mode == "Duplicados":
+            self._view_timer.start()
+
+    def _on_hashes(self, results: List[Tuple[str, int, int, str]]) -> None:
+        # El store avisa de las entradas anotadas: `_check_duplicates` reagrupa
+        self._store.set_content_hashes(results)
+
+    def _remove_copies(self, path: str) -> None:
+        """Quita de la librería (no del disco) las otras copias de `path`."""
+        # Las de carpetas vigiladas volverían a entrar en el próximo escaneo
+        self._remove([p for p in self._dups.copies(path) if not self._watcher.covers(p)])
+
+    def _edit_tags(self, path: str) -> None:
+        text, ok = QInputDialog.getText(
+            self, "Etiquetas", f"{Path(path).name}\nEtiquetas separadas por comas:",
+            text=", ".join(self._store.get_tags(path)),
+        )
+        if ok:
+            self._store.set_tags(path, text.split(","))
+            self.model.refresh([path])
+
+    def _memory_budget(self) -> int:
+        from modules.frame_cache import shared_frame_cache
+
+        return shared_frame_cache().max_bytes
+
+    def _confirm_memory(self, entry: GifEntry) -> bool:
+        """Pide confirmación si el ciclo decodificado no cabe en la caché de frames."""
+        need, budget = decoded_bytes(entry), self._memory_budget()
+        if need <= budget:
+            return True
+        answer = QMessageBox.question(
+            self, "GIF muy grande",
+            f"{Path(entry.path).name} ocupa unos {format_bytes(need)} decodificado "
+            f"({entry.frames} frames de {entry.width * entry.scale // 100}×"
+            f"{entry.height * entry.scale // 100}), más que el límite de la caché "
+            f"de frames ({format_bytes(budget)}).\n\n"
+            "¿Abrirlo igualmente?",
+        )
+        return answer == QMessageBox.StandardButton.Yes
 
     def _show_menu(self, pos: QPoint) -> None:
-        item = self.list_widget.itemAt(pos)
-        if item is None:
+        index = self.list_view.indexAt(pos)
+        if not index.isValid():
             return
+        path = index.data(PATH_ROLE)
 
         menu = QMenu(self)
         act_run = menu.addAction("Ejecutar")
         act_del = menu.addAction("Eliminar")
+        act_tags = menu.addAction("Etiquetas…")
+        copies = [p for p in self._dups.copies(path) if not self._watcher.covers(p)]
+        act_copies = menu.addAction(f"Quitar copias idénticas ({len(copies)})") \
+            if copies else None
         menu.addSeparator()
         act_toggle_ghost = menu.addAction("Alternar modo fantasma")
 
-        chosen = menu.exec(self.list_widget.mapToGlobal(pos))
+        # Ahorro de energía (por GIF)
+        entry = self._store.get(path) or GifEntry(path)
+        power_menu = cast(QMenu, menu.addMenu("Ahorro de energía"))
+        act_hidden = cast(QAction, power_menu.addAction("Pausar si no se ve"))
+        act_hidden.setCheckable(True)
+        act_hidden.setChecked(entry.pause_when_hidden)
+        idle_menu = cast(QMenu, power_menu.addMenu("Pausar tras inactividad"))
+        idle_actions = {}
+        for label, seconds in self.IDLE_PRESETS.items():
+            act = cast(QAction, idle_menu.addAction(label))
+            act.setCheckable(True)
+            act.setChecked(entry.idle_pause_s == seconds)
+            idle_actions[act] = seconds
+
+        chosen = menu.exec(self.list_view.mapToGlobal(pos))
 
         if chosen is act_run:
-            self._execute(item)
+            self._execute(path)
         elif chosen is act_del:
-            self._remove_item(item)
+            self._remove([path])
+        elif chosen is act_tags:
+            self._edit_tags(path)
+        elif act_copies is not None and chosen is act_copies:
+            self._remove_copies(path)
         elif chosen is act_toggle_ghost:
-            path = item.data(Qt.ItemDataRole.UserRole)
             current = self._store.get_ghost(path)
             new_state = not current
             self._store.set_ghost(path, new_state)
 
             # 🔹 Si el GIF está abierto, aplicar el cambio en vivo
-            if self._overlay and self._overlay.isVisible():
-                # Verifica que el overlay actual sea este GIF
-                if str(Path(self._overlay.gif_path).resolve()) == str(Path(path).resolve()):
-                    self._overlay.set_ghost_mode(new_state)
+            overlay = self._open_overlay(path)
+            if overlay and overlay.isVisible():
+                overlay.set_ghost_mode(new_state)
+        elif chosen is act_hidden:
+            self._set_power(path, act_hidden.isChecked(), entry.idle_pause_s)
+        elif chosen in idle_actions:
+            self._set_power(path, entry.pause_when_hidden, idle_actions[chosen])
+
+    def _set_power(self, path: str, pause_when_hidden: bool, idle_pause_s: int) -> None:
+        self._store.set_power(path, pause_when_hidden, idle_pause_s)
+        overlay = self._open_overlay(path)
+        if overlay is not None:
+            overlay.power.configure(pause_when_hidden, idle_pause_s)
 
     # ===================================================
-    def _execute(self, item: QListWidgetItem) -> None:
-        path = item.data(Qt.ItemDataRole.UserRole)
-        entry = self._store.get(path) or GifEntry(path)
-        if self._overlay and self._overlay.isVisible():
-            self._overlay.close()
-        self._overlay = GifOverlay(
-            gif_path=entry.path,
-            scale_percent=entry.scale,
-            opacity=entry.opacity,
-            speed=entry.speed,
-            ghost=entry.ghost,
+    def _execute(self, path: str, confirm: bool = True) -> None:
+        entry = self.model.entry(path) or GifEntry(path)
+        if confirm and not self._confirm_memory(entry):
+            return
+        # Varios GIF pueden estar abiertos a la vez; reabrir uno lo trae al frente
+        self._overlay_manager().open(
+            entry,
             on_close=lambda x, y, s, o, sp, g: self._save_state(
                 entry.path, x, y, s, o, sp, g
             ),
         )
-        self._overlay.move(entry.pos_x, entry.pos_y)
-        self._overlay.show()
+
+    def play(self, paths: List[str]) -> None:
+        """Abre cada GIF (añadiéndolo a la librería si no estaba)."""
+        from modules.frame_cache import shared_frame_cache
+
+        paths = [p for p in paths if Path(p).is_file()]
+        with self._store.batch():
+            entries = [self._store.add(p) for p in paths]
+        self.model.add(entries)
+        # Varios a la vez: sus frames se decodifican juntos (`FrameCache.batch`)
+        with shared_frame_cache().batch():
+            for entry in entries:
+                # Orden explícita de otra instancia: sin diálogos
+                self._execute(entry.path, confirm=False)
+
+    def put_entries(self, entries: List[GifEntry], overwrite: bool = False) -> None:
+        """Entradas preparadas por `cli.py add/import` (ver `LibraryStore.put_entries`)."""
+        updated = self._store.put_entries(entries, overwrite)
+        notified = self.model.refresh([e.path for e in updated if e.path in self.model])
+        if self._sort_combo.currentIndex() > 1 or \
+                (self._filter_combo.currentIndex() and not notified):
+            self._view_timer.start()
+        self._enqueue(e for e in updated if e.path not in self.model)
+
+    def remove_paths(self, paths: List[str]) -> None:
+        """Quita de la librería (no del disco) las rutas que estén."""
+        self._remove(paths)
+
+    def close_all_overlays(self) -> None:
+        if self._overlays is not None:
+            self._overlays.close_all()
+
+    def _on_overlay_failed(self, path: str, reason: str) -> None:
+        QMessageBox.warning(
+            self, "GIF inválido", f"No se pudo abrir:\n{path}\n\n{reason}"
+        )
 
     def _save_state(
         self, path: str, x: int, y: int, scale: int,
@@ -131,33 +638,76 @@ class LibraryPage(QWidget):
         entry.pos_x, entry.pos_y, entry.scale = x, y, scale
         entry.opacity, entry.speed, entry.ghost = opacity, speed, ghost
         self._store.update(entry)
+        self.model.refresh([path])
 
-    # ===================================================
-    def _add_item(self, path: Path) -> None:
-        if any(Path(i.data(Qt.ItemDataRole.UserRole)).resolve() == path.resolve()
-               for i in self._iter_items()):
+    # ---------- miniaturas del área visible ----------
+    def _schedule_thumbnails(self, *_args: int) -> None:
+        if not self._visible_timer.isActive():
+            self._visible_timer.start()
+
+    def _visible_rows(self) -> Tuple[int, int]:
+        """Primera y última fila en pantalla ((0, -1) si no se ve)."""
+        count = self.model.rowCount()
+        view = self.list_view
+        if not count or not view.isVisible():
+            return 0, -1
+        # Rejilla fija de izquierda a derecha: la posición sale del desplazamiento
+        grid, size = view.gridSize(), view.viewport().size()
+        cols = max(size.width() // grid.width(), 1)
+        top = view.verticalScrollBar().value() // grid.height()
+        lines = size.height() // grid.height() + 2
+        return min(top * cols, count - 1), min((top + lines) * cols, count) - 1
+
+    def _update_thumbnails(self) -> None:
+        """Pide las miniaturas visibles (y su margen) y suelta las lejanas."""
+        first, last = self._visible_rows()
+        if last < first:
             return
-        pix: QPixmap = first_frame_as_pixmap(path, self.THUMB_SIZE)
-        icon = QIcon(pix)
-        item = QListWidgetItem(icon, "")
-        item.setData(Qt.ItemDataRole.UserRole, str(path.resolve()))
-        item.setToolTip(path.name)
-        self.list_widget.addItem(item)
-
-    def _remove_item(self, item: QListWidgetItem) -> None:
-        path = item.data(Qt.ItemDataRole.UserRole)
-        self._store.remove(path)
-        self.list_widget.takeItem(self.list_widget.row(item))
-
-    def _iter_items(self) -> Iterator[QListWidgetItem]:
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item is not None:
-                yield item
+        page, count = last - first + 1, self.model.rowCount()
+        # Mientras se desplaza, solo lo visible; el margen, al detenerse
+        value = self.list_view.verticalScrollBar().value()
+        settled, self._scroll_value = value == self._scroll_value, value
+        if not settled:
+            self._visible_timer.start()
+        ahead = page * self.PREFETCH_PAGES if settled else 0
+        # Primero lo visible, después hacia abajo y por último hacia arriba
+        wanted = self.model.paths_at([
+            *range(first, last + 1),
+            *range(last + 1, min(last + 1 + ahead, count)),
+            *range(first - 1, max(first - ahead, 0) - 1, -1),
+        ])
+        self._loader.retain(wanted)
+        for path in wanted:
+            if not self.model.has_thumbnail(path):
+                self._loader.request(path)
+        keep = page * self.KEEP_PAGES
+        if self.model.thumbnail_count() > page + 2 * keep:
+            self.model.keep_thumbnails(set(self.model.paths_at(
+                range(max(first - keep, 0), min(last + 1 + keep, count))
+            )))
+
+    def _on_thumbnail(self, path: str, pix: QPixmap) -> None:
+        self.model.set_thumbnail(path, pix)
+
+    def _remove(self, paths: List[str]) -> None:
+        with self._store.batch():
+            for path in paths:
+                self._loader.cancel(canonical_path(path))
+                self._store.remove(path)
+        self.model.remove(paths)
+
+    def thumbnail_timings(self) -> dict:
+        """Tiempo hasta la primera miniatura y hasta completar todas (ms)."""
+        return self._loader.timings()
+
+    def showEvent(self, evt: QShowEvent) -> None:
+        super().showEvent(evt)
+        self._schedule_thumbnails()
 
     def eventFilter(self, src, evt):  # noqa: ANN001
-        if src is self.list_widget and isinstance(evt, QKeyEvent):
-            if evt.key() == Qt.Key.Key_Delete and (item := self.list_widget.currentItem()):
-                self._remove_item(item)
+        if src is self.list_view and isinstance(evt, QKeyEvent):
+            index = self.list_view.currentIndex()
+            if evt.key() == Qt.Key.Key_Delete and index.isValid():
+                self._remove([index.data(PATH_ROLE)])
                 return True
         return super().eventFilter(src, evt)
@@ -3,11 +3,19 @@
 #ui/main_window.py
 """
 ui/main_window.py – Ventana principal de DesktopGIF.
+
+• Arranque por etapas: primero la ventana (menú + bandeja) y, ya pintada,
+  la librería, que se rellena por tandas; sus miniaturas llegan después.
+• Las páginas se construyen la primera vez que se navega a ellas y sus
+  módulos (store, overlays, caché…) se importan en ese momento.
+• Cada etapa se anota en `utils.startup_timing`.
+• `handle_command` atiende las órdenes reenviadas por otras instancias
+  (`utils.single_instance`).
 """
 
 from __future__ import annotations
 
-from typing import Dict, cast
+from typing import TYPE_CHECKING, Dict, cast
 
 from PyQt6.QtCore import QEasingCurve, QEvent, QPropertyAnimation, Qt, QTimer, QSize
 from PyQt6.QtGui import QIcon
@@ -15,6 +23,7 @@ from PyQt6.QtWidgets import (
     QApplication,
     QFrame,
     QHBoxLayout,
+    QLabel,
     QMainWindow,
     QMenu,
     QPushButton,
@@ -25,9 +34,14 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
-from storage.library_store import LibraryStore
-from ui.library_page import LibraryPage
-from ui.edit_page import EditPage
+from utils.startup_timing import INTERACTIVE_PHASE, WINDOW_PHASE, startup_timer
+
+if TYPE_CHECKING:
+    from PyQt6.QtGui import QShowEvent
+
+    from storage.library_store import LibraryStore
+    from ui.edit_page import EditPage
+    from ui.library_page import LibraryPage
 
 
 class MainWindow(QMainWindow):
@@ -44,7 +58,10 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("DesktopGIF – Librería y Edición")
         self.resize(960, 640)
 
-        self._store = LibraryStore()
+        self._store: LibraryStore | None = None
+        self.page_library: LibraryPage | None = None
+        self.page_edit: EditPage | None = None
+        self._started = False
         self._menu_anim: QPropertyAnimation | None = None
         self._menu_expanded = False
 
@@ -84,13 +101,11 @@ class MainWindow(QMainWindow):
             )
             menu_layout.addWidget(btn)
 
-        # ---------- páginas ----------
+        # ---------- páginas (se construyen al navegar a ellas) ----------
         self.pages = QStackedWidget()
-        self.page_library = LibraryPage(self._store)
-        self.page_edit = EditPage()
-
-        self.pages.addWidget(self.page_library)
-        self.pages.addWidget(self.page_edit)
+        self._loading = QLabel("Cargando librería…")
+        self._loading.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.pages.addWidget(self._loading)
 
         # ---------- layout raíz ----------
         root_layout = QHBoxLayout()
@@ -106,15 +121,95 @@ class MainWindow(QMainWindow):
         # ---------- conexiones ----------
         self.btn_toggle.clicked.connect(self._toggle_menu)
         self.btn_library.clicked.connect(
-            lambda: self.pages.setCurrentWidget(self.page_library)
+            lambda: self.pages.setCurrentWidget(self._library_page())
         )
         self.btn_edit.clicked.connect(
-            lambda: self.pages.setCurrentWidget(self.page_edit)
+            lambda: self.pages.setCurrentWidget(self._edit_page())
         )
 
         # ---------- bandeja ----------
         self._init_tray()
 
+    # ------------------------------------------------------------------
+    # Arranque por etapas
+    # ------------------------------------------------------------------
+    def showEvent(self, event: QShowEvent) -> None:  # noqa: N802
+        super().showEvent(event)
+        if not self._started:
+            self._started = True
+            # Tras el primer pintado: la ventana ya se ve mientras carga la librería
+            QTimer.singleShot(0, self._load_library)
+
+    def _load_library(self) -> None:
+        timer = startup_timer()
+        timer.mark(WINDOW_PHASE)
+        page = self._library_page()
+        if self.pages.currentWidget() is self._loading:
+            self.pages.setCurrentWidget(page)
+        self.pages.removeWidget(self._loading)
+        self._loading.deleteLater()
+        page.populated.connect(lambda: QTimer.singleShot(0, self._on_library_ready))
+        page.thumbnailsDone.connect(lambda: timer.mark("thumbnails"))
+        page.populate()
+
+    def _on_library_ready(self) -> None:
+        startup_timer().mark(INTERACTIVE_PHASE)
+
+    def _library_store(self) -> LibraryStore:
+        if self._store is None:
+            from storage.library_store import LibraryStore
+
+            self._store = LibraryStore(write_delay=0.75)
+            app = cast(QApplication, QApplication.instance())
+            app.aboutToQuit.connect(self._store.close)
+            startup_timer().mark("library_store")
+        return self._store
+
+    def _library_page(self) -> LibraryPage:
+        if self.page_library is None:
+            from ui.library_page import LibraryPage
+
+            self.page_library = LibraryPage(self._library_store())
+            self.pages.addWidget(self.page_library)
+            startup_timer().mark("library_page")
+        return self.page_library
+
+    def _edit_page(self) -> EditPage:
+        if self.page_edit is None:
+            from ui.edit_page import EditPage
+
+            self.page_edit = EditPage()
+            self.pages.addWidget(self.page_edit)
+        return self.page_edit
+
+    # ------------------------------------------------------------------
+    # Órdenes de otras instancias
+    # ------------------------------------------------------------------
+    def handle_command(self, cmd: str, args: dict) -> None:
+        if cmd == "show":
+            self._restore_from_tray()
+        elif cmd == "play":
+            paths = [p for p in args.get("paths", []) if isinstance(p, str)]
+            if paths:
+                self._library_page().play(paths)
+        elif cmd == "stop_all":
+            if self.page_library is not None:
+                self.page_library.close_all_overlays()
+        elif cmd == "reload":
+            if self.page_library is not None:
+                self.page_library.reload()
+        elif cmd in ("add", "import"):
+            from storage.models import entry_from_dict
+
+            entries = [entry_from_dict(e) for e in args.get("entries", [])
+                       if isinstance(e, dict) and isinstance(e.get("path"), str)]
+            if entries:
+                self._library_page().put_entries(entries, overwrite=cmd == "import")
+        elif cmd == "remove":
+            paths = [p for p in args.get("paths", []) if isinstance(p, str)]
+            if paths:
+                self._library_page().remove_paths(paths)
+
     # ------------------------------------------------------------------
     # Icono helper
     # ------------------------------------------------------------------
@@ -175,9 +270,9 @@ class MainWindow(QMainWindow):
         self.activateWindow()
 
     def _quit_from_tray(self) -> None:
-        """Cierra overlay, oculta icono y finaliza la aplicación."""
-        if self.page_library._overlay and self.page_library._overlay.isVisible():
-            self.page_library._overlay.close()
+        """Cierra los overlays, oculta icono y finaliza la aplicación."""
+        if self.page_library is not None:
+            self.page_library.close_all_overlays()
 
         self.tray.hide()
         QApplication.quit()
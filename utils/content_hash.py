@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/content_hash.py – Identidad de un archivo por su contenido.
+
+• `quick_hash()`: tamaño + primeros y últimos `CHUNK` bytes; una lectura
+  acotada sea cual sea el tamaño. Dos archivos distintos casi nunca
+  coinciden, pero puede pasar: solo sirve para descartar.
+• `full_hash()`: el archivo entero por bloques (memoria constante). Solo
+  hace falta cuando dos archivos coinciden en `quick_hash`.
+• Un archivo de hasta 2×`CHUNK` se resume entero en la primera pasada:
+  su hash rápido ya es el completo (`complete`).
+• Sin Qt ni dependencias: apto para hilos y pools de procesos, como
+  `utils.gif_meta`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from typing import Callable, Iterable, List, Tuple
+
+CHUNK = 16 * 1024           # bytes de cabeza y de cola en la primera pasada
+BLOCK = 1 << 20             # lectura por bloques del hash completo
+HEX_DIGITS = 32             # SHA-256 truncado a 128 bits
+
+# (ruta, mtime_ns, tamaño) → hash completo conocido de esa versión ("" si no)
+ContentLookup = Callable[[str, int, int], str]
+
+
+def quick_hash_of(data, size: int) -> Tuple[str, bool]:  # noqa: ANN001
+    """
+    Hash rápido de un contenido ya abierto (bytes o mmap) de `size` bytes.
+    Devuelve (hash, completo): completo si cubre el archivo entero.
+    """
+    if size <= 2 * CHUNK:
+        return hashlib.sha256(data[:size]).hexdigest()[:HEX_DIGITS], True
+    return _head_tail(data[:CHUNK], data[size - CHUNK:size], size)
+
+
+def quick_hash(path: str) -> Tuple[str, bool]:
+    """Como `quick_hash_of`, leyendo solo cabeza y cola de `path` (OSError si falla)."""
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(0)
+        if size <= 2 * CHUNK:
+            return quick_hash_of(f.read(), size)
+        head = f.read(CHUNK)
+        f.seek(size - CHUNK)
+        return _head_tail(head, f.read(CHUNK), size)
+
+
+def full_hash(path: str) -> str:
+    """Hash del contenido completo de `path`, por bloques (OSError si falla)."""
+    h = hashlib.sha256()
+    buf = bytearray(BLOCK)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.hexdigest()[:HEX_DIGITS]
+
+
+def full_hashes(
+    items: Iterable[Tuple[str, int, int]], cancelled: threading.Event | None = None
+) -> List[Tuple[str, int, int, str]]:
+    """
+    Hash completo de cada (ruta, mtime_ns, tamaño) → (ruta, mtime_ns, tamaño,
+    hash). Se omiten los archivos ilegibles o que ya no son esa versión.
+    """
+    results: List[Tuple[str, int, int, str]] = []
+    for path, mtime_ns, size in items:
+        if cancelled is not None and cancelled.is_set():
+            break
+        try:
+            st = os.stat(path)
+            if (st.st_mtime_ns, st.st_size) != (mtime_ns, size):
+                continue
+            results.append((path, mtime_ns, size, full_hash(path)))
+        except OSError:
+            continue
+    return results
+
+
+# ---------- internos ----------
+def _head_tail(head, tail, size: int) -> Tuple[str, bool]:  # noqa: ANN001
+    # 8 + 2×CHUNK bytes: no puede ser el contenido entero de otro archivo que
+    # se resuma completo (≤ 2×CHUNK), así que nunca coincide con su hash
+    h = hashlib.sha256(size.to_bytes(8, "little"))
+    h.update(head)
+    h.update(tail)
+    return h.hexdigest()[:HEX_DIGITS], False
@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/folder_watcher.py – Carpetas vigiladas: importación en paralelo y cambios.
+
+• Escaneo en un hilo de trabajo (QThreadPool propio): recorre la carpeta
+  con `os.scandir` y compara con la instantánea anterior {ruta: (mtime, tamaño)}.
+• Solo los archivos nuevos o modificados se validan (`utils.gif_meta.probe`),
+  en un pool de procesos con todos los núcleos; los lotes pequeños, en el
+  mismo hilo (arrancar procesos cuesta más que leerlos).
+• Cambios posteriores: QFileSystemWatcher sobre los directorios (con
+  retardo para agrupar ráfagas) y, como respaldo, un sondeo periódico de
+  mtime que solo hace `stat`.
+• Las carpetas vigiladas se guardan en `storage/watched.json`.
+• `refresh_metadata()` revalida en el mismo pool los metadatos en caché de
+  cualquier lista de rutas (las de la librería fuera de estas carpetas).
+• `hash_files()` calcula, también en segundo plano, el hash completo de
+  los archivos cuyo hash rápido coincide con el de otro (copias).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from storage.path_index import canonical_path
+from utils.content_hash import full_hashes
+from utils.gif_meta import GifMeta, probe
+
+WATCH_FILE = Path(__file__).resolve().parent.parent / "storage" / "watched.json"
+GIF_SUFFIXES = (".gif",)
+
+POOL_MIN_FILES = 2_000      # por debajo, validar en el propio hilo (arrancar procesos cuesta ~0,3 s)
+PROGRESS_EVERY = 500        # archivos validados entre avisos de progreso
+DEBOUNCE_MS = 300           # agrupa notificaciones del sistema de archivos
+POLL_MS = 30_000            # sondeo de respaldo
+MAX_WATCHED_DIRS = 2_000    # más allá, solo sondeo (límites de inotify/handles)
+
+Stat = Tuple[int, int]                  # (mtime_ns, tamaño)
+Snapshot = Dict[str, "Stat | None"]     # None = conocido, pero sin stat: se revalida
+
+
+# ---------- recorrido y validación (sin Qt) ----------
+def walk_gifs(root: str) -> Tuple[Dict[str, Stat], List[str]]:
+    """GIF bajo `root` con su stat, y los directorios recorridos (sin seguir enlaces)."""
+    files: Dict[str, Stat] = {}
+    dirs: List[str] = []
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        dirs.append(current)
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(GIF_SUFFIXES) and entry.is_file():
+                        st = entry.stat()
+                        files[entry.path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+    return files, dirs
+
+
+def diff_snapshots(
+    old: Snapshot, new: Dict[str, Stat]
+) -> Tuple[List[str], List[str], List[str]]:
+    """(añadidos, modificados, eliminados) entre dos instantáneas."""
+    added: List[str] = []
+    changed: List[str] = []
+    for path, st in new.items():
+        if path not in old:
+            added.append(path)
+        elif old[path] != st:
+            changed.append(path)
+    removed = [p for p in old if p not in new]
+    return added, changed, removed
+
+
+def probe_all(
+    paths: List[str],
+    jobs: int | None = None,
+    progress: Callable[[int], None] | None = None,
+    cancelled: threading.Event | None = None,
+) -> List[GifMeta]:
+    """Valida `paths` en paralelo (procesos) y devuelve sus metadatos en orden."""
+    jobs = jobs or os.cpu_count() or 1
+    results: List[GifMeta] = []
+
+    def collect(metas) -> bool:  # noqa: ANN001
+        for meta in metas:
+            results.append(meta)
+            if progress is not None and len(results) % PROGRESS_EVERY == 0:
+                progress(len(results))
+            if cancelled is not None and cancelled.is_set():
+                return False
+        return True
+
+    if len(paths) >= POOL_MIN_FILES and jobs > 1:
+        # Importación diferida: multiprocessing no hace falta al arrancar
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        # spawn: bifurcar un proceso con hilos de Qt vivos no es seguro
+        ctx = multiprocessing.get_context("spawn")
+        chunk = max(16, len(paths) // (jobs * 8))
+        try:
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx) as pool:
+                if not collect(pool.map(probe, paths, chunksize=chunk)):
+                    pool.shutdown(cancel_futures=True)
+        except (BrokenProcessPool, OSError, RuntimeError):
+            # Sin procesos (entorno congelado, límites del sistema…): en este hilo
+            del results[:]
+    if len(results) < len(paths) and not (cancelled is not None and cancelled.is_set()):
+        collect(map(probe, paths[len(results):]))
+    if progress is not None:
+        progress(len(results))
+    return results
+
+
+class WatchList:
+    """Lista persistente de carpetas vigiladas (JSON, escritura atómica)."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = Path(path or WATCH_FILE)
+
+    def load(self) -> List[str]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return []
+        return [p for p in data if isinstance(p, str)] if isinstance(data, list) else []
+
+    def save(self, roots: List[str]) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(sorted(roots), indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def file_stats(paths: Iterable[str]) -> Dict[str, Stat]:
+    """Stat de cada ruta existente."""
+    stats: Dict[str, Stat] = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        stats[path] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+# ---------- escaneo en segundo plano ----------
+def _emit(signals: "_ScanSignals", name: str, *args) -> None:
+    try:
+        getattr(signals, name).emit(*args)
+    except RuntimeError:
+        pass  # el vigilante se destruyó (cierre de la app) mientras el hilo trabajaba
+
+
+class _ScanSignals(QObject):
+    progress = pyqtSignal(str, int, int)            # raíz, validados, a validar
+    done = pyqtSignal(str, object, object, object)  # raíz, stats, metas, extra
+    metadata = pyqtSignal(list)                     # [GifMeta]
+    hashes = pyqtSignal(list)                       # [(ruta, mtime_ns, tamaño, hash)]
+
+
+class _ScanJob(QRunnable):
+    def __init__(
+        self,
+        root: str,
+        known: Snapshot,
+        jobs: int | None,
+        signals: _ScanSignals,
+        cancelled: threading.Event,
+    ) -> None:
+        super().__init__()
+        self._root = root
+        self._known = known
+        self._jobs = jobs
+        self._signals = signals
+        self._cancelled = cancelled
+
+    def run(self) -> None:
+        t0 = time.perf_counter()
+        files, dirs = walk_gifs(self._root)
+        added, changed, removed = diff_snapshots(self._known, files)
+        t_walk = time.perf_counter()
+        todo = added + changed
+        total = len(todo)
+        _emit(self._signals, "progress", self._root, 0, total)
+        metas = probe_all(
+            todo, self._jobs,
+            lambda n: _emit(self._signals, "progress", self._root, n, total),
+            self._cancelled,
+        )
+        if self._cancelled.is_set():
+            return
+        # Resolver rutas cuesta decenas de µs cada una: mejor aquí que en el hilo GUI
+        for meta in metas:
+            if meta.valid:
+                canonical_path(meta.path)
+        stats = {
+            "files": len(files),
+            "added": sum(1 for m in metas[:len(added)] if m.valid),
+            "changed": len(changed), "removed": len(removed),
+            "invalid": sum(1 for m in metas if not m.valid),
+            "walk_ms": round((t_walk - t0) * 1000, 2),
+            "probe_ms": round((time.perf_counter() - t_walk) * 1000, 2),
+        }
+        _emit(self._signals, "done", self._root, stats, metas,
+              {"files": files, "dirs": dirs, "changed": set(changed), "removed": removed})
+
+
+class _MetadataJob(QRunnable):
+    def __init__(
+        self, known: Snapshot, jobs: int | None, signals: _ScanSignals, cancelled: threading.Event
+    ) -> None:
+        super().__init__()
+        self._known = known
+        self._jobs = jobs
+        self._signals = signals
+        self._cancelled = cancelled
+
+    def run(self) -> None:
+        current = file_stats(self._known)
+        todo = [p for p, st in current.items() if st != self._known[p]]
+        metas = probe_all(todo, self._jobs, cancelled=self._cancelled)
+        if not self._cancelled.is_set():
+            _emit(self._signals, "metadata", metas)
+
+
+class _HashJob(QRunnable):
+    def __init__(
+        self, items: List[Tuple[str, int, int]], signals: _ScanSignals, cancelled: threading.Event
+    ) -> None:
+        super().__init__()
+        self._items = items
+        self._signals = signals
+        self._cancelled = cancelled
+
+    def run(self) -> None:
+        results = full_hashes(self._items, self._cancelled)
+        if not self._cancelled.is_set():
+            _emit(self._signals, "hashes", results)
+
+
+class FolderWatcher(QObject):
+    """Vigila carpetas y entrega GIF nuevos/modificados/eliminados al hilo GUI."""
+
+    filesAdded = pyqtSignal(list)           # [GifMeta] válidos y nuevos
+    filesChanged = pyqtSignal(list)         # [GifMeta] válidos ya conocidos
+    filesRemoved = pyqtSignal(list)         # [ruta]
+    scanProgress = pyqtSignal(str, int, int)
+    scanFinished = pyqtSignal(str, dict)    # raíz, estadísticas
+    metadataReady = pyqtSignal(list)        # [GifMeta] de `refresh_metadata`
+    hashesReady = pyqtSignal(list)          # [(ruta, mtime_ns, tamaño, hash)] de `hash_files`
+
+    def __init__(
+        self,
+        watch_file: Path | None = None,
+        jobs: int | None = None,
+        poll_ms: int = POLL_MS,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._list = WatchList(watch_file)
+        self._jobs = jobs
+        self._roots: Dict[str, Snapshot] = {}
+        self._running: Dict[str, threading.Event] = {}
+        self._again: Set[str] = set()          # reescanear al terminar el actual
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)         # los procesos ya usan todos los núcleos
+        self._signals = _ScanSignals(self)
+        self._signals.progress.connect(self.scanProgress)
+        self._signals.done.connect(self._on_done)
+        self._signals.metadata.connect(self.metadataReady)
+        self._signals.hashes.connect(self.hashesReady)
+        self._meta_cancel = threading.Event()
+
+        self._fs = QFileSystemWatcher(self)
+        self._fs.directoryChanged.connect(self._on_dir_changed)
+        self._dirty: Set[str] = set()
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._rescan_dirty)
+        self._poll = QTimer(self)
+        self._poll.setInterval(poll_ms)
+        self._poll.timeout.connect(self.rescan)
+
+    # ---------- API ----------
+    def roots(self) -> List[str]:
+        return sorted(self._roots)
+
+    def restore(self, known: Snapshot | None = None) -> None:
+        """Vuelve a vigilar las carpetas guardadas; `known` como en `add_root`."""
+        for root in self._list.load():
+            if os.path.isdir(root):
+                self.add_root(root, known, persist=False)
+
+    def add_root(self, path: str, known: Snapshot | None = None, persist: bool = True) -> str:
+        """
+        Vigila `path` (recursivo) y lanza su escaneo. `known` son rutas ya
+        importadas con el stat de sus metadatos: no se notifican como nuevas
+        y, si no cambiaron, tampoco se vuelven a validar.
+        """
+        root = str(Path(path).resolve())
+        if root not in self._roots:
+            prefix = root.rstrip(os.sep) + os.sep
+            self._roots[root] = {
+                p: st for p, st in (known or {}).items() if p.startswith(prefix)
+            }
+            if persist:
+                self._list.save(list(self._roots))
+            if not self._poll.isActive() and self._poll.interval() > 0:
+                self._poll.start()
+        self.rescan(root)
+        return root
+
+    def remove_root(self, path: str) -> None:
+        root = str(Path(path).resolve())
+        if self._roots.pop(root, None) is None:
+            return
+        cancelled = self._running.pop(root, None)
+        if cancelled is not None:
+            cancelled.set()
+        self._again.discard(root)
+        prefix = root.rstrip(os.sep) + os.sep
+        stale = [d for d in self._fs.directories() if d == root or d.startswith(prefix)]
+        if stale:
+            self._fs.removePaths(stale)
+        self._list.save(list(self._roots))
+        if not self._roots:
+            self._poll.stop()
+
+    def rescan(self, root: str | None = None) -> None:
+        """Reescanea `root` (o todas); si ya hay un escaneo en curso, se repite al acabar."""
+        for r in [root] if root else list(self._roots):
+            if r not in self._roots:
+                continue
+            if r in self._running:
+                self._again.add(r)
+                continue
+            cancelled = threading.Event()
+            self._running[r] = cancelled
+            self._pool.start(_ScanJob(r, dict(self._roots[r]), self._jobs, self._signals, cancelled))
+
+    def covers(self, path: str) -> bool:
+        """True si `path` está bajo alguna carpeta vigilada."""
+        return any(path.startswith(r.rstrip(os.sep) + os.sep) for r in self._roots)
+
+    def refresh_metadata(self, known: Snapshot) -> None:
+        """
+        Revalida en segundo plano los metadatos de `known` ({ruta: stat en
+        caché}); `metadataReady` entrega los de los archivos que cambiaron.
+        """
+        if known:
+            self._pool.start(_MetadataJob(dict(known), self._jobs, self._signals, self._meta_cancel))
+
+    def hash_files(self, items: List[Tuple[str, int, int]]) -> None:
+        """
+        Hash completo de cada (ruta, mtime_ns, tamaño) en segundo plano;
+        `hashesReady` entrega los de los archivos que siguen en esa versión.
+        """
+        if items:
+            self._pool.start(_HashJob(list(items), self._signals, self._meta_cancel))
+
+    def is_scanning(self) -> bool:
+        return bool(self._running)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Bloquea hasta terminar los escaneos (útil en benchmarks headless)."""
+        return self._pool.waitForDone(msecs)
+
+    def stop(self) -> None:
+        self._poll.stop()
+        self._debounce.stop()
+        self._meta_cancel.set()
+        for cancelled in self._running.values():
+            cancelled.set()
+        self._running.clear()
+        self._again.clear()
+
+    # ---------- internos ----------
+    def _on_done(self, root: str, stats: dict, metas: List[GifMeta], extra: dict) -> None:
+        if self._running.pop(root, None) is None or root not in self._roots:
+            return  # carpeta quitada o escaneo cancelado
+        snapshot: Snapshot = dict(extra["files"])
+        # Un inválido queda en la instantánea: no se revalida hasta que cambie
+        changed_set: Set[str] = extra["changed"]
+        added = [m for m in metas if m.valid and m.path not in changed_set]
+        changed = [m for m in metas if m.valid and m.path in changed_set]
+        gone = [m.path for m in metas if not m.valid and m.path in changed_set]
+        self._roots[root] = snapshot
+        self._watch_dirs(extra["dirs"])
+
+        if added:
+            self.filesAdded.emit(added)
+        if changed:
+            self.filesChanged.emit(changed)
+        if extra["removed"] or gone:
+            self.filesRemoved.emit(list(extra["removed"]) + gone)
+        self.scanFinished.emit(root, stats)
+        if root in self._again:
+            self._again.discard(root)
+            self.rescan(root)
+
+    def _watch_dirs(self, dirs: List[str]) -> None:
+        current = set(self._fs.directories())
+        room = MAX_WATCHED_DIRS - len(current)
+        new = [d for d in dirs if d not in current][:max(room, 0)]
+        if new:
+            self._fs.addPaths(new)
+
+    def _on_dir_changed(self, directory: str) -> None:
+        self._dirty.add(directory)
+        self._debounce.start()
+
+    def _rescan_dirty(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        for root in self._roots:
+            prefix = root.rstrip(os.sep) + os.sep
+            if any(d == root or d.startswith(prefix) for d in dirty):
+                self.rescan(root)
@@ -0,0 +1,450 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/gif_decoder.py – Decodificador de GIF en Python + NumPy, sin Qt.
+
+• Recorre los bloques como `utils.gif_meta`, descomprime el LZW de cada
+  imagen y la compone sobre el lienzo con la disposición (1 = dejar,
+  2 = fondo, 3 = restaurar lo anterior) y la transparencia del GCE.
+• Paleta y composición vectorizadas: índices → RGBA con una indexación
+  de NumPy y copia con máscara sobre el rectángulo del frame.
+• Cada frame es el lienzo completo en RGBA8888 sin premultiplicar
+  (alto × ancho × 4, uint8), igual que lo entrega Qt; más el retardo en ms.
+• Sin Qt: apto para pools de procesos (miniaturas en masa con
+  `cli.py thumbs --processes`, varios GIF abiertos a la vez con
+  `FrameCache.batch()`). Requiere NumPy (dependencia opcional de la app).
+• Validado frame a frame contra QMovie: `benchmarks/bench_decoder.py`.
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from utils.gif_meta import GifMeta, probe
+
+__all__ = [
+    "DecodedGif", "decode", "decode_file", "downscale", "first_frame", "iter_frames", "lzw_decode",
+    "probe_with_thumbnail", "thumbnail",
+]
+
+_SIGNATURES = (b"GIF87a", b"GIF89a")
+_MAX_CODES = 4096
+DEFAULT_DELAY = 100         # ms; como Qt (y los navegadores) para retardos de 0 o 1 cs
+
+
+@dataclass
+class DecodedGif:
+    width: int = 0
+    height: int = 0
+    frames: List[np.ndarray] = field(default_factory=list)   # alto × ancho × 4 (RGBA)
+    delays: List[int] = field(default_factory=list)          # ms, como los da Qt
+    loop: int | None = None         # None = sin bucle declarado, 0 = infinito
+    truncated: bool = False
+    opaque: bool = False            # lienzo sin transparencia (Qt lo da en RGB32)
+    error: str = ""
+
+
+# ---------- API ----------
+def decode(data: bytes, max_frames: int | None = None) -> DecodedGif:
+    """Decodifica `data` (nunca lanza: los errores quedan en `error`)."""
+    gif = DecodedGif()
+    try:
+        for rgba, delay in iter_frames(data, gif):
+            gif.frames.append(rgba)
+            gif.delays.append(delay)
+            if max_frames is not None and len(gif.frames) >= max_frames:
+                break
+    except (ValueError, IndexError, struct.error) as exc:
+        gif.error = str(exc) or type(exc).__name__
+    if not gif.frames and not gif.error:
+        gif.error = "sin frames"
+    return gif
+
+
+def decode_file(path: str, max_frames: int | None = None) -> DecodedGif:
+    """Como `decode`, leyendo `path` (un error de lectura también queda en `error`)."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as exc:
+        return DecodedGif(error=str(exc))
+    return decode(data, max_frames)
+
+
+def first_frame(path: str) -> np.ndarray | None:
+    """Primer frame en RGBA (None si no se puede decodificar)."""
+    gif = decode_file(path, max_frames=1)
+    return gif.frames[0] if gif.frames else None
+
+
+def thumbnail(path: str, max_size: Tuple[int, int]) -> np.ndarray | None:
+    """
+    Primer frame reducido para caber en `max_size` conservando la proporción
+    (promedio por áreas con alfa premultiplicado). Pensado para pools de
+    procesos: devuelve poco más que la miniatura.
+    """
+    rgba = first_frame(path)
+    if rgba is None:
+        return None
+    return downscale(rgba, max_size)
+
+
+def probe_with_thumbnail(
+    path: str, max_size: Tuple[int, int] | None
+) -> Tuple[GifMeta, np.ndarray | None, float]:
+    """
+    Una tarea por archivo para pools de procesos: metadatos (`utils.gif_meta`),
+    la miniatura si se pide `max_size` (None si no se pudo) y los ms empleados.
+    """
+    t0 = time.perf_counter()
+    meta = probe(path)
+    thumb = thumbnail(path, max_size) if max_size is not None and meta.valid else None
+    return meta, thumb, (time.perf_counter() - t0) * 1000
+
+
+def downscale(rgba: np.ndarray, max_size: Tuple[int, int]) -> np.ndarray:
+    """Reduce (nunca amplía) `rgba` para caber en `max_size`, conservando la proporción."""
+    h, w = rgba.shape[:2]
+    scale = min(max_size[0] / w, max_size[1] / h, 1.0)
+    tw, th = max(round(w * scale), 1), max(round(h * scale), 1)
+    if (tw, th) == (w, h):
+        return rgba
+    # Promedio por áreas: cada píxel destino suma su franja de filas y columnas
+    # (sumas acumuladas, sin bucles); el alfa premultiplicado evita halos
+    px = rgba.astype(np.float32)
+    px[..., :3] *= px[..., 3:4] / 255.0
+    rows = _area_sums(px, th, axis=0)
+    both = _area_sums(rows, tw, axis=1)
+    both /= (h / th) * (w / tw)
+    alpha = both[..., 3:4]
+    both[..., :3] = np.where(alpha > 0, both[..., :3] * 255.0 / np.maximum(alpha, 1e-6), 0)
+    return np.clip(both + 0.5, 0, 255).astype(np.uint8)
+
+
+def iter_frames(data: bytes, info: DecodedGif | None = None) -> Iterator[Tuple[np.ndarray, int]]:
+    """
+    Genera (lienzo RGBA, retardo ms) por frame. `info`, si se pasa, recibe
+    dimensiones, bucle, `opaque` y `truncated`. ValueError si no es un GIF.
+    """
+    info = info if info is not None else DecodedGif()
+    end = len(data)
+    if end < 13 or bytes(data[:6]) not in _SIGNATURES:
+        raise ValueError("no es un GIF")
+    width, height, packed, bg_index = struct.unpack_from("<HHBB", data, 6)
+    info.width, info.height = width, height
+    if not width or not height:
+        raise ValueError("dimensiones nulas")
+    i = 13
+    global_palette = None
+    if packed & 0x80:
+        count = 2 << (packed & 0x07)
+        global_palette = _palette(data, i, count)
+        i += 3 * count
+    global_count = 2 << (packed & 0x07)     # Qt lo usa aunque no haya tabla global
+    # Sin ninguna paleta Qt pinta negro (transparente) hasta ese tamaño y
+    # transparente el resto
+    no_palette = np.empty((256, 4), np.uint8)
+    no_palette[:] = _CLEAR
+    no_palette[:global_count + 1] = 0
+
+    canvas: np.ndarray | None = None
+    opaque = False
+    # Disposición pendiente del frame anterior: (modo, rectángulo, copia previa)
+    # y su índice transparente
+    pending: Tuple[int, Tuple[int, int, int, int], np.ndarray | None, int] | None = None
+    disposal, transparent, delay = 0, -1, DEFAULT_DELAY
+    drawn_with: np.ndarray | None = None        # paleta del frame anterior
+    while i < end:
+        block = data[i]
+        if block == 0x3B:                   # fin
+            return
+        if block == 0x21:                   # extensión
+            if i + 2 > end:
+                break
+            label = data[i + 1]
+            if label == 0xF9 and i + 8 <= end and data[i + 2] == 4:
+                if pending is not None:
+                    # Qt aplica la disposición al leer el GCE siguiente, aún
+                    # con la paleta y la transparencia del frame anterior
+                    _dispose(canvas, *pending, _background(drawn_with, global_palette, bg_index))
+                    pending = None
+                flags = data[i + 3]
+                disposal = (flags >> 2) & 0x07
+                delay_cs = struct.unpack_from("<H", data, i + 4)[0]
+                delay = delay_cs * 10 if delay_cs >= 2 else DEFAULT_DELAY
+                transparent = data[i + 6] if flags & 0x01 else -1
+            elif label == 0xFF and i + 14 <= end and data[i + 2] == 11 \
+                    and bytes(data[i + 3:i + 14]) in (b"NETSCAPE2.0", b"ANIMEXTS1.0"):
+                j = i + 14
+                if j + 4 <= end and data[j] >= 3 and data[j + 1] == 1:
+                    info.loop = struct.unpack_from("<H", data, j + 2)[0]
+            i = _skip_subblocks(data, i + 2, end)
+        elif block == 0x2C:                 # imagen
+            if i + 10 > end:
+                break
+            x, y, w, h, flags = struct.unpack_from("<HHHHB", data, i + 1)
+            i += 10
+            palette, count = global_palette, global_count
+            if flags & 0x80:
+                count = 2 << (flags & 0x07)
+                palette = _palette(data, i, count)
+                i += 3 * count
+            if i >= end:
+                break
+            min_code = data[i]
+            payload, i = _read_subblocks(data, i + 1, end)
+            indices = lzw_decode(payload, min_code, w * h)
+            if i < 0 and not indices:
+                break                       # cortado antes de sus datos: Qt no lo da
+
+            # Sin GCE de por medio, Qt toma el fondo con la tabla del frame que
+            # llega; si es local, antes de cargarla (memoria sin inicializar):
+            # en ese caso, negro
+            background = _background(_BLACK_PALETTE if flags & 0x80 else global_palette,
+                                     global_palette, bg_index)
+            if canvas is None:
+                # Como Qt: sin transparencia en el primer frame el lienzo es
+                # opaco (RGB32) para toda la animación
+                opaque = info.opaque = transparent < 0
+                canvas = np.empty((height, width, 4), np.uint8)
+                canvas[:] = _CLEAR if transparent >= 0 else _BLACK if background is None else background
+            elif pending is not None:
+                _dispose(canvas, *pending, background)
+            # Lo que se sale del lienzo se recorta (Qt no lo desplaza)
+            x0, y0, x1, y1 = rect = x, y, min(x + w, width), min(y + h, height)
+            saved = canvas[y0:y1, x0:x1].copy() if disposal == 3 else None
+            _draw(canvas, indices, w, h, rect, flags & 0x40,
+                  palette if palette is not None else no_palette, transparent)
+            pending = (disposal, rect, saved, transparent)
+            drawn_with = palette
+            frame = canvas.copy()
+            if opaque:
+                frame[..., 3] = 255
+            yield frame, delay
+            disposal = 0            # la transparencia sigue hasta otro GCE, como en Qt
+            if i < 0:
+                break
+        else:
+            info.truncated = True
+            raise ValueError(f"bloque desconocido 0x{block:02x} en {i}")
+    info.truncated = True
+
+
+def lzw_decode(data: bytes, min_code: int, limit: int) -> bytearray:
+    """
+    Índices de color de una imagen (a lo sumo `limit`). Un flujo cortado o
+    con códigos inválidos devuelve lo descomprimido hasta ahí.
+    """
+    if not 1 <= min_code <= 11:
+        raise ValueError(f"tamaño mínimo de código LZW inválido: {min_code}")
+    clear = 1 << min_code
+    stop = clear + 1
+    first = clear + 2
+    table = [bytes((c,)) for c in range(clear)] + [b"", b""]
+    add = table.append
+    out = bytearray()
+    size = min_code + 1
+    mask = (1 << size) - 1
+    nxt = first
+    acc = bits = 0
+    prev = b""
+    # Bucle caliente: variables locales y sin len() de la tabla
+    for byte in data:
+        acc |= byte << bits
+        bits += 8
+        while bits >= size:
+            code = acc & mask
+            acc >>= size
+            bits -= size
+            if code == clear:
+                del table[first:]
+                size = min_code + 1
+                mask = (1 << size) - 1
+                nxt = first
+                prev = b""
+                continue
+            elif code == stop:
+                return out[:limit]
+            elif not prev:
+                if code >= first:
+                    return out[:limit]      # código sin definir tras limpiar
+                prev = table[code]
+                out += prev
+                continue
+            elif code < nxt:
+                entry = table[code]
+                if nxt < _MAX_CODES:
+                    add(prev + entry[:1])
+            elif code == nxt and nxt < _MAX_CODES:
+                entry = prev + prev[:1]
+                add(entry)
+            else:
+                return out[:limit]          # corrupto
+            out += entry
+            prev = entry
+            if nxt < _MAX_CODES:
+                nxt += 1
+                if nxt > mask and size < 12:
+                    size += 1
+                    mask = (1 << size) - 1
+            if len(out) >= limit:
+                return out[:limit]
+    return out[:limit]
+
+
+# ---------- internos ----------
+def _palette(data: bytes, i: int, count: int) -> np.ndarray:
+    """Tabla de color → (256, 4) RGBA; los índices fuera de la tabla pintan transparente."""
+    rgb = np.frombuffer(data, np.uint8, 3 * count, i).reshape(count, 3)
+    pal = np.empty((256, 4), np.uint8)
+    pal[:] = _CLEAR
+    pal[:count, :3] = rgb
+    pal[:count, 3] = 255
+    return pal
+
+
+def _skip_subblocks(data: bytes, i: int, end: int) -> int:
+    while i < end:
+        n = data[i]
+        i += n + 1
+        if n == 0:
+            return i
+    return -1
+
+
+def _read_subblocks(data: bytes, i: int, end: int) -> Tuple[bytes, int]:
+    """Contenido de una cadena de sub-bloques y el índice siguiente (-1 si se corta)."""
+    parts = []
+    while i < end:
+        n = data[i]
+        if n == 0:
+            return b"".join(parts), i + 1
+        parts.append(data[i + 1:i + 1 + n])
+        i += n + 1
+    return b"".join(parts), -1
+
+
+def _interlaced_rows(h: int) -> List[Tuple[int, int]]:
+    """
+    (fila destino, filas a duplicar debajo) de cada fila de datos de una imagen
+    entrelazada de `h` filas visibles, con la secuencia de Qt: sus atajos para
+    imágenes de menos de 5 filas y el relleno progresivo de las primeras pasadas.
+    """
+    rows: List[Tuple[int, int]] = []
+    y, mode, bottom = 0, 1, h - 1
+    while y <= bottom:
+        rows.append((y, min(_DUP[mode], bottom - y)))
+        if mode == 1:
+            y += 8
+            if y > bottom:
+                mode, y = 2, 4
+                if y > bottom:
+                    y = 2
+                    if y > bottom:
+                        mode, y = 0, 1
+        elif mode == 2:
+            y += 8
+            if y > bottom:
+                mode, y = 3, 2
+                if y > bottom:
+                    mode, y = 4, 1
+        elif mode == 3:
+            y += 4
+            if y > bottom:
+                mode, y = 4, 1
+        else:
+            y += 2 if mode == 4 else 1
+    return rows
+
+
+def _draw(
+    canvas: np.ndarray,
+    indices: bytearray,
+    w: int,
+    h: int,
+    rect: Tuple[int, int, int, int],
+    interlaced: int,
+    palette: np.ndarray,
+    transparent: int,
+) -> None:
+    x0, y0, x1, y1 = rect
+    if x0 >= x1 or y0 >= y1 or not indices:
+        return
+    # Lo que no llegó (frame cortado) no se pinta, como en Qt
+    idx = np.zeros(w * h, np.uint8)
+    idx[:len(indices)] = np.frombuffer(bytes(indices), np.uint8)
+    known = np.zeros(w * h, bool)
+    known[:len(indices)] = True
+    idx, known = idx.reshape(h, w), known.reshape(h, w)
+    if transparent >= 0:
+        known &= idx != transparent
+    if interlaced:
+        cw = x1 - x0
+        for r, (row, dup) in enumerate(_interlaced_rows(y1 - y0)[:h]):
+            line = canvas[y0 + row, x0:x1]
+            np.copyto(line, palette[idx[r, :cw]], where=known[r, :cw, None])
+            if dup and transparent < 0 and (r + 1) * w <= len(indices):
+                canvas[y0 + row + 1:y0 + row + 1 + dup, x0:x1] = line
+        return
+    idx, known = idx[:y1 - y0, :x1 - x0], known[:y1 - y0, :x1 - x0]
+    np.copyto(canvas[y0:y1, x0:x1], palette[idx], where=known[..., None])
+
+
+def _background(palette: np.ndarray | None, global_palette: np.ndarray | None,
+                index: int) -> np.ndarray | None:
+    """Color de fondo como lo resuelve Qt (None: sin tabla global no hay índice de fondo)."""
+    if global_palette is None:
+        return None
+    return palette[index] if palette is not None else _BLACK
+
+
+def _dispose(
+    canvas: np.ndarray,
+    mode: int,
+    rect: Tuple[int, int, int, int],
+    saved: np.ndarray | None,
+    transparent: int,
+    background: np.ndarray | None,
+) -> None:
+    x0, y0, x1, y1 = rect
+    if x0 >= x1 or y0 >= y1:
+        return
+    if mode == 2:
+        # Fondo, como Qt: transparente si el frame usaba transparencia; si no,
+        # el color de fondo o, sin él, el del píxel (0, 0)
+        if transparent >= 0:
+            canvas[y0:y1, x0:x1] = _CLEAR
+        else:
+            canvas[y0:y1, x0:x1] = background if background is not None else canvas[0, 0].copy()
+    elif mode == 3 and saved is not None:
+        canvas[y0:y1, x0:x1] = saved
+
+
+# Filas de relleno progresivo por pasada del entrelazado (sin transparencia)
+_DUP = {0: 0, 1: 7, 2: 3, 3: 1, 4: 0}
+# "Transparente" de Qt (blanco con alfa 0: blanco si el lienzo es opaco)
+_CLEAR = np.array([255, 255, 255, 0], np.uint8)
+_BLACK = np.zeros(4, np.uint8)
+_BLACK_PALETTE = np.zeros((256, 4), np.uint8)
+
+
+def _area_sums(px: np.ndarray, target: int, axis: int) -> np.ndarray:
+    """Suma de `px` por franjas de igual ancho (fraccionario) a lo largo de `axis`."""
+    n = px.shape[axis]
+    edges = np.linspace(0, n, target + 1)
+    cum = np.concatenate([np.zeros_like(np.take(px, [0], axis=axis)), np.cumsum(px, axis=axis)],
+                         axis=axis)
+    # Interpolación lineal de la suma acumulada en los bordes fraccionarios
+    lo = np.floor(edges).astype(int)
+    frac = edges - lo
+    hi = np.minimum(lo + 1, n)
+    shape = [1] * px.ndim
+    shape[axis] = target + 1
+    frac = frac.reshape(shape).astype(np.float32)
+    at = np.take(cum, lo, axis=axis) * (1 - frac) + np.take(cum, hi, axis=axis) * frac
+    return np.diff(at, axis=axis)
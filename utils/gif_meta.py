@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/gif_meta.py – Metadatos de un GIF sin decodificar píxeles.
+
+• Recorre la estructura del archivo (cabecera, extensiones, descriptores de
+  imagen) saltando los sub-bloques de datos LZW: cuenta frames, suma
+  retardos y lee el contador de bucles (NETSCAPE2.0).
+• Sin Qt ni dependencias: `probe()` se puede ejecutar en un pool de procesos.
+• Sirve también de validación: `valid` es False si no es un GIF o no
+  contiene ningún frame; un archivo cortado con frames sigue siendo válido
+  (`truncated`), igual que lo reproduce Qt.
+• De paso, el hash rápido del contenido (`utils.content_hash`) con los
+  bytes ya leídos: identidad para detectar copias sin otra lectura.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+
+from utils.content_hash import quick_hash_of
+
+_SIGNATURES = (b"GIF87a", b"GIF89a")
+READ_LIMIT = 1 << 20        # hasta 1 MiB se lee entero; más grande, mmap
+
+
+@dataclass
+class GifMeta:
+    path: str
+    size: int = 0               # bytes en disco
+    mtime_ns: int = 0
+    width: int = 0
+    height: int = 0
+    frames: int = 0
+    duration_ms: int = 0        # suma de retardos tal cual (0 si no los declara)
+    loop: int | None = None     # None = sin bucle declarado, 0 = infinito
+    valid: bool = False
+    truncated: bool = False
+    error: str = ""
+    quick_hash: str = ""        # tamaño + cabeza y cola (`utils.content_hash`)
+    content_hash: str = ""      # contenido completo, si el archivo es pequeño
+
+
+def _skip_subblocks(data, i: int, end: int) -> int:  # noqa: ANN001
+    """Índice tras la cadena de sub-bloques que empieza en `i` (o `end` si se corta)."""
+    while i < end:
+        n = data[i]
+        i += n + 1
+        if n == 0:
+            return i
+    return -1
+
+
+def parse(data, meta: GifMeta) -> GifMeta:  # noqa: ANN001
+    """Rellena `meta` a partir del contenido (bytes o mmap)."""
+    end = len(data)
+    if end < 13 or bytes(data[:6]) not in _SIGNATURES:
+        meta.error = "no es un GIF"
+        return meta
+    meta.width, meta.height, packed = struct.unpack_from("<HHB", data, 6)
+    i = 13
+    if packed & 0x80:
+        i += 3 * (2 << (packed & 0x07))     # tabla de color global
+
+    delay_cs = 0
+    while i < end:
+        block = data[i]
+        if block == 0x3B:                   # fin
+            break
+        if block == 0x21:                   # extensión
+            if i + 2 > end:
+                break
+            label = data[i + 1]
+            if label == 0xF9 and i + 8 <= end and data[i + 2] == 4:
+                delay_cs = struct.unpack_from("<H", data, i + 4)[0]
+            elif label == 0xFF and i + 14 <= end and data[i + 2] == 11 \
+                    and bytes(data[i + 3:i + 14]) in (b"NETSCAPE2.0", b"ANIMEXTS1.0"):
+                j = i + 14
+                if j + 4 <= end and data[j] >= 3 and data[j + 1] == 1:
+                    meta.loop = struct.unpack_from("<H", data, j + 2)[0]
+            i = _skip_subblocks(data, i + 2, end)
+        elif block == 0x2C:                 # imagen
+            if i + 10 > end:
+                break
+            packed = data[i + 9]
+            i += 10
+            if packed & 0x80:
+                i += 3 * (2 << (packed & 0x07))     # tabla de color local
+            i = _skip_subblocks(data, i + 1, end)   # +1: tamaño mínimo de código LZW
+            # Un frame cortado cuenta (Qt lo muestra a medias)
+            meta.frames += 1
+            meta.duration_ms += delay_cs * 10
+            delay_cs = 0
+        else:
+            meta.error = f"bloque desconocido 0x{block:02x} en {i}"
+            break
+        if i < 0:
+            break
+    else:
+        i = -1
+
+    meta.truncated = i < 0 or i >= end or bool(meta.error)
+    meta.valid = meta.frames > 0 and meta.width > 0 and meta.height > 0
+    if not meta.valid and not meta.error:
+        meta.error = "sin frames"
+    return meta
+
+
+def _with_hash(data, meta: GifMeta) -> GifMeta:  # noqa: ANN001
+    parse(data, meta)
+    meta.quick_hash, complete = quick_hash_of(data, meta.size)
+    if complete:
+        meta.content_hash = meta.quick_hash
+    return meta
+
+
+def probe(path: str) -> GifMeta:
+    """Metadatos de `path` (nunca lanza: los errores quedan en `error`)."""
+    meta = GifMeta(path)
+    try:
+        st = os.stat(path)
+        meta.size, meta.mtime_ns = st.st_size, st.st_mtime_ns
+        if not st.st_size:
+            meta.error = "archivo vacío"
+            return meta
+        with open(path, "rb") as f:
+            if st.st_size <= READ_LIMIT:
+                return _with_hash(f.read(), meta)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _with_hash(mm, meta)
+    except (OSError, ValueError) as exc:
+        meta.error = str(exc)
+        return meta
@@ -6,28 +6,60 @@ utils/gif_utils.py – utilidades relacionadas con GIF.
 
 from __future__ import annotations
 
+import struct
 from pathlib import Path
+from typing import Tuple
 
 from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QMovie, QPixmap
+from PyQt6.QtGui import QImage, QImageReader
 
 
-def first_frame_as_pixmap(path: str | Path, thumb_size: QSize | None = None) -> QPixmap:
+def first_frame_as_image(path: str | Path, thumb_size: QSize | None = None) -> QImage:
     """
-    Devuelve el primer frame del GIF como QPixmap.
-    • Si `thumb_size` se indica -> escala la miniatura.
+    Decodifica el primer frame directamente al tamaño de miniatura.
+    • Usa QImageReader con `setScaledSize` (lee solo la cabecera para calcular
+      la proporción) en vez de decodificar a resolución completa y reescalar.
+    • Devuelve QImage: es seguro llamarla desde hilos de trabajo.
     """
-    movie = QMovie(str(path))
-    if not movie.isValid():
-        return QPixmap()
+    reader = QImageReader(str(path))
+    reader.setAutoTransform(True)
+    if not reader.canRead():
+        return QImage()
 
-    # Salta al primer frame y obtén el pixmap
-    movie.jumpToFrame(0)
-    pix = movie.currentPixmap()
     if thumb_size is not None and not thumb_size.isNull():
-        pix = pix.scaled(
-            thumb_size,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation,
-        )
-    return pix
+        src = reader.size()
+        if src.isValid() and not src.isEmpty():
+            reader.setScaledSize(src.scaled(thumb_size, Qt.AspectRatioMode.KeepAspectRatio))
+
+    img = reader.read()
+    return img if not img.isNull() else QImage()
+
+
+def rgba_to_image(rgba, opaque: bool = False) -> QImage:  # noqa: ANN001
+    """
+    QImage (copia propia) de un frame de `utils.gif_decoder` (array
+    alto × ancho × 4). Apto para hilos de trabajo.
+    • Mismo formato que QImageReader (ARGB32, o RGB32 si `opaque`): al
+      escalarlo da los mismos píxeles que un frame leído con Qt.
+    """
+    height, width = rgba.shape[:2]
+    img = QImage(rgba.tobytes(), width, height, 4 * width, QImage.Format.Format_RGBA8888)
+    fmt = QImage.Format.Format_RGB32 if opaque else QImage.Format.Format_ARGB32
+    return img.convertToFormat(fmt)
+
+
+def gif_header_size(path: str | Path) -> Tuple[int, int] | None:
+    """
+    Tamaño lógico (ancho, alto) leído de los 10 primeros bytes del archivo.
+    • No decodifica ni recorre el archivo: apto para el hilo GUI.
+    • None si no es un GIF o no se puede leer.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(10)
+    except OSError:
+        return None
+    if len(head) < 10 or head[:6] not in (b"GIF87a", b"GIF89a"):
+        return None
+    width, height = struct.unpack("<HH", head[6:10])
+    return (width, height) if width and height else None
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/instrumentation.py – Métricas de rendimiento por overlay y del proceso.
+
+• Por overlay: FPS objetivo vs logrados, percentiles de decode y pintado,
+  frames perdidos (llegaron tarde) y saltados (presupuesto), memoria de caché.
+• Proceso: RSS, volcados de LibraryStore (cuántos y cuánto tardan) y lo que
+  aporten los "proveedores" registrados (caché de frames, gobernador…).
+• Sin Qt: los módulos de UI/reproducción solo llaman a `record_*`.
+• Registro periódico opcional en JSON-lines (`DESKTOPGIF_METRICS=archivo`,
+  intervalo en `DESKTOPGIF_METRICS_INTERVAL`, por defecto 5 s).
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List
+
+from utils.process_stats import rss_bytes
+
+METRICS_ENV = "DESKTOPGIF_METRICS"
+METRICS_INTERVAL_ENV = "DESKTOPGIF_METRICS_INTERVAL"
+
+SAMPLES = 512           # muestras conservadas por serie (ventana deslizante)
+FPS_WINDOW_S = 5.0      # ventana para calcular los FPS logrados
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentil `q` (0–100) por interpolación lineal sobre valores ordenados."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+class LatencyStats:
+    """Serie de duraciones (ms) con ventana deslizante y contador total."""
+
+    def __init__(self, maxlen: int = SAMPLES) -> None:
+        self._values: Deque[float] = deque(maxlen=maxlen)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        # deque.append es atómico bajo el GIL: apto para hilos de trabajo
+        self._values.append(ms)
+        self.count += 1
+        self.total_ms += ms
+
+    def summary(self) -> Dict[str, float]:
+        values = sorted(list(self._values))
+        return {
+            "count": self.count,
+            "mean": round(sum(values) / len(values), 3) if values else 0.0,
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+            "max": round(values[-1], 3) if values else 0.0,
+        }
+
+
+class OverlayMetrics:
+    """Métricas de un overlay (las escribe su FramePlayer / GifOverlay)."""
+
+    def __init__(self, key: str, path: str) -> None:
+        self.key = key
+        self.path = path
+        self.frames = 0
+        self.dropped = 0            # ticks que llegaron más de un frame tarde
+        self.skipped = 0            # frames saltados por el presupuesto global
+        self.paint = LatencyStats()
+        self.tick = LatencyStats()
+        self._stamps: Deque[float] = deque(maxlen=SAMPLES)
+        # Valores que se consultan al leer (no cuestan nada por frame)
+        self.target_fps_fn: Callable[[], float] | None = None
+        self.cache_bytes_fn: Callable[[], int] | None = None
+
+    @property
+    def target_fps(self) -> float:
+        return self.target_fps_fn() if self.target_fps_fn is not None else 0.0
+
+    @property
+    def cache_bytes(self) -> int:
+        return self.cache_bytes_fn() if self.cache_bytes_fn is not None else 0
+
+    def record_frame(self, now_s: float | None = None) -> None:
+        self.frames += 1
+        self._stamps.append(time.monotonic() if now_s is None else now_s)
+
+    def achieved_fps(self) -> float:
+        stamps = list(self._stamps)
+        if len(stamps) < 2:
+            return 0.0
+        cutoff = stamps[-1] - FPS_WINDOW_S
+        recent = [t for t in stamps if t >= cutoff]
+        span = recent[-1] - recent[0]
+        return (len(recent) - 1) / span if span > 0 else 0.0
+
+
+class StoreMetrics:
+    """Volcados de LibraryStore: número y duración por tipo."""
+
+    def __init__(self) -> None:
+        self.saves: Dict[str, LatencyStats] = {}
+
+    def record(self, kind: str, ms: float) -> None:
+        stats = self.saves.get(kind)
+        if stats is None:
+            stats = self.saves.setdefault(kind, LatencyStats())
+        stats.add(ms)
+
+    def snapshot(self) -> dict:
+        return {kind: stats.summary() for kind, stats in list(self.saves.items())}
+
+
+class Instrumentation:
+    """Registro central de métricas del proceso."""
+
+    def __init__(self) -> None:
+        self._overlays: Dict[str, OverlayMetrics] = {}
+        self._decode: Dict[str, LatencyStats] = {}
+        self._providers: Dict[str, Callable[[], dict]] = {}
+        self._ids = itertools.count(1)
+        self.store = StoreMetrics()
+        self.started = time.time()
+        self._logger: JsonLinesLogger | None = None
+
+    # ---------- overlays ----------
+    def add_overlay(self, path: str) -> OverlayMetrics:
+        key = f"{os.path.basename(path)}#{next(self._ids)}"
+        metrics = self._overlays[key] = OverlayMetrics(key, path)
+        return metrics
+
+    def remove_overlay(self, metrics: OverlayMetrics) -> None:
+        self._overlays.pop(metrics.key, None)
+
+    def overlays(self) -> List[OverlayMetrics]:
+        return list(self._overlays.values())
+
+    # ---------- decode (por archivo; puede llamarse desde hilos de trabajo) ----------
+    def record_decode(self, path: str, ms: float) -> None:
+        stats = self._decode.get(path)
+        if stats is None:
+            stats = self._decode.setdefault(path, LatencyStats())
+        stats.add(ms)
+
+    def decode_stats(self, path: str) -> LatencyStats | None:
+        return self._decode.get(path)
+
+    # ---------- proveedores ----------
+    def add_provider(self, name: str, provider: Callable[[], dict]) -> None:
+        """`provider()` se incluye en cada instantánea bajo `name`."""
+        self._providers[name] = provider
+
+    def remove_provider(self, name: str) -> None:
+        self._providers.pop(name, None)
+
+    # ---------- lectura ----------
+    def overlay_snapshot(self, m: OverlayMetrics) -> dict:
+        decode = self._decode.get(m.path)
+        return {
+            "key": m.key,
+            "path": m.path,
+            "target_fps": round(m.target_fps, 2),
+            "achieved_fps": round(m.achieved_fps(), 2),
+            "frames": m.frames,
+            "dropped": m.dropped,
+            "skipped": m.skipped,
+            "cache_mb": round(m.cache_bytes / 2**20, 2),
+            "decode_ms": decode.summary() if decode is not None else None,
+            "paint_ms": m.paint.summary(),
+            "tick_ms": m.tick.summary(),
+        }
+
+    def snapshot(self) -> dict:
+        """Instantánea serializable a JSON de todas las métricas."""
+        providers = {}
+        for name, provider in list(self._providers.items()):
+            try:
+                providers[name] = provider()
+            except RuntimeError:
+                continue    # objeto Qt destruido o modificado a mitad de lectura
+        return {
+            "t": round(time.time(), 3),
+            "uptime_s": round(time.time() - self.started, 1),
+            "rss_mb": round(rss_bytes() / 2**20, 2),
+            "overlays": [self.overlay_snapshot(m) for m in self.overlays()],
+            "store": self.store.snapshot(),
+            **providers,
+        }
+
+    # ---------- registro JSON-lines ----------
+    def start_logging(self, path: str | Path, interval_s: float = 5.0) -> "JsonLinesLogger":
+        self.stop_logging()
+        self._logger = JsonLinesLogger(self, path, interval_s)
+        self._logger.start()
+        return self._logger
+
+    def stop_logging(self) -> None:
+        if self._logger is not None:
+            self._logger.stop()
+            self._logger = None
+
+    def logging_path(self) -> Path | None:
+        return self._logger.path if self._logger is not None else None
+
+
+class JsonLinesLogger:
+    """Escribe una instantánea por línea cada `interval_s` en un hilo daemon."""
+
+    def __init__(self, source: Instrumentation, path: str | Path, interval_s: float = 5.0) -> None:
+        self.path = Path(path)
+        self.interval_s = max(interval_s, 0.1)
+        self.lines = 0
+        self._source = source
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="metrics-log", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def write_now(self) -> None:
+        line = json.dumps(self._source.snapshot(), ensure_ascii=False)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self.lines += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.write_now()
+            except OSError:
+                pass    # disco lleno / ruta inválida: se reintenta en el próximo intervalo
+        try:
+            self.write_now()    # última muestra al detener
+        except OSError:
+            pass
+
+
+_shared: Instrumentation | None = None
+
+
+def instrumentation() -> Instrumentation:
+    """Registro único del proceso (se crea en el primer uso)."""
+    global _shared
+    if _shared is None:
+        _shared = Instrumentation()
+    return _shared
+
+
+def start_logging_from_env() -> JsonLinesLogger | None:
+    """Activa el registro si `DESKTOPGIF_METRICS` apunta a un archivo."""
+    target = os.environ.get(METRICS_ENV)
+    if not target:
+        return None
+    try:
+        interval = float(os.environ.get(METRICS_INTERVAL_ENV, "5"))
+    except ValueError:
+        interval = 5.0
+    return instrumentation().start_logging(target, interval)
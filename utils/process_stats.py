@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/process_stats.py – Memoria residente (RSS) y CPU del proceso actual.
+
+• Sin dependencias obligatorias: usa psutil si está instalado; si no,
+  /proc en Linux, GetProcessMemoryInfo en Windows y getrusage (pico) en macOS.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+
+def rss_bytes() -> int:
+    """RSS actual en bytes (0 si la plataforma no permite obtenerlo)."""
+    try:
+        import psutil  # type: ignore[import-not-found]
+        return int(psutil.Process().memory_info().rss)
+    except ImportError:
+        pass
+
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm", "r", encoding="ascii") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    if sys.platform == "win32":
+        return _rss_windows()
+
+    try:
+        import resource
+        # macOS informa el pico en bytes (Linux en KiB, pero ya se cubrió arriba)
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except (ImportError, OSError):
+        return 0
+
+
+def _rss_windows() -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class _Counters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = _Counters()
+    counters.cb = ctypes.sizeof(_Counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()  # type: ignore[attr-defined]
+    ok = ctypes.windll.psapi.GetProcessMemoryInfo(  # type: ignore[attr-defined]
+        handle, ctypes.byref(counters), counters.cb
+    )
+    return int(counters.WorkingSetSize) if ok else 0
+
+
+def cpu_seconds() -> float:
+    """Tiempo de CPU (usuario + sistema) consumido por el proceso."""
+    return time.process_time()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/profiling.py – Perfilado opcional (cProfile + tracemalloc) y su informe.
+
+• Se activa por línea de comandos o por entorno (no cuesta nada si no):
+    --profile-startup            DESKTOPGIF_PROFILE_STARTUP=1
+    --profile-window 30:60       DESKTOPGIF_PROFILE_WINDOWS=30:60,600:120
+    --tracemalloc 300            DESKTOPGIF_TRACEMALLOC=300
+    --profile-dir perfiles/      DESKTOPGIF_PROFILE_DIR=perfiles/
+• Ventanas "inicio:duración" en segundos desde el arranque; cada una genera
+  su `.prof`. El arranque se mide desde `main()` hasta el primer ciclo de
+  eventos con la ventana ya mostrada.
+• tracemalloc: una instantánea cada N s; cada una se compara con la anterior
+  y con la primera (`mem-NNN.txt`) para detectar fugas en sesiones largas.
+• Todo se escribe en `profiles/AAAAMMDD-HHMMSS/`.
+• Informe: `python -m utils.profiling report [carpeta] [--top 25]`
+  (sin carpeta usa la última sesión).
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+if TYPE_CHECKING:   # cProfile/pstats solo se importan si se usan (arranque)
+    import cProfile
+
+PROFILE_ROOT = Path(__file__).resolve().parent.parent / "profiles"
+
+STARTUP_ENV = "DESKTOPGIF_PROFILE_STARTUP"
+WINDOWS_ENV = "DESKTOPGIF_PROFILE_WINDOWS"
+TRACEMALLOC_ENV = "DESKTOPGIF_TRACEMALLOC"
+DIR_ENV = "DESKTOPGIF_PROFILE_DIR"
+
+TRACE_FRAMES = 10       # profundidad de pila guardada por tracemalloc
+TOP = 25                # líneas por sección en diffs e informe
+
+# Asignaciones del propio perfilado que no interesan en los diffs (se
+# descartan al comparar: `filter_traces` recorre cada traza en Python y
+# tarda segundos con sesiones grandes)
+_NOISE = (tracemalloc.__file__, "<frozen importlib._bootstrap", "<unknown>")
+
+
+def parse_windows(spec: str) -> List[Tuple[float, float]]:
+    """'30:60,600:120' → [(30, 60), (600, 120)]; ignora entradas mal formadas."""
+    windows = []
+    for part in spec.replace(";", ",").split(","):
+        start, _, length = part.strip().partition(":")
+        try:
+            s, d = float(start), float(length)
+        except ValueError:
+            continue
+        if s >= 0 and d > 0:
+            windows.append((s, d))
+    return windows
+
+
+def latest_session(root: Path = PROFILE_ROOT) -> Path | None:
+    sessions = sorted(p for p in root.glob("*") if p.is_dir()) if root.is_dir() else []
+    return sessions[-1] if sessions else None
+
+
+class ProfilingSession:
+    """Perfiles de CPU y memoria de una ejecución; se conecta al bucle Qt."""
+
+    def __init__(
+        self,
+        startup: bool = False,
+        windows: Sequence[Tuple[float, float]] = (),
+        tracemalloc_s: float = 0.0,
+        root: str | Path | None = None,
+    ) -> None:
+        self.startup = startup
+        self.windows = list(windows)
+        self.tracemalloc_s = max(tracemalloc_s, 0.0)
+        self.root = Path(root) if root else PROFILE_ROOT
+        self.dir: Path | None = None
+        self.files: List[Path] = []
+
+        self._t0 = time.monotonic()
+        self._startup_prof: cProfile.Profile | None = None
+        self._window_prof: cProfile.Profile | None = None
+        self._first_snap: tracemalloc.Snapshot | None = None
+        self._prev_snap: tracemalloc.Snapshot | None = None
+        self._snaps = 0
+        self._timers: list = []
+
+    # ---------- construcción ----------
+    @classmethod
+    def from_args(cls, argv: List[str]) -> Tuple["ProfilingSession", List[str]]:
+        """
+        Lee las opciones de perfilado de `argv` (y del entorno) y devuelve
+        la sesión junto con los argumentos restantes (para QApplication).
+        """
+        ap = argparse.ArgumentParser(add_help=False)
+        ap.add_argument("--profile-startup", action="store_true")
+        ap.add_argument("--profile-window", action="append", default=[])
+        ap.add_argument("--tracemalloc", type=float, default=None)
+        ap.add_argument("--profile-dir", default=None)
+        args, rest = ap.parse_known_args(argv[1:])
+
+        startup = args.profile_startup or os.environ.get(STARTUP_ENV, "") not in ("", "0")
+        windows = parse_windows(",".join(args.profile_window or [os.environ.get(WINDOWS_ENV, "")]))
+        try:
+            mem = args.tracemalloc if args.tracemalloc is not None else float(
+                os.environ.get(TRACEMALLOC_ENV, "0") or 0
+            )
+        except ValueError:
+            mem = 0.0
+        root = args.profile_dir or os.environ.get(DIR_ENV) or None
+        return cls(startup, windows, mem, root), [argv[0], *rest]
+
+    @property
+    def enabled(self) -> bool:
+        return self.startup or bool(self.windows) or self.tracemalloc_s > 0
+
+    # ---------- API ----------
+    def begin(self) -> None:
+        """Llamar lo antes posible en `main()`: arranca el perfil de inicio y tracemalloc."""
+        if not self.enabled:
+            return
+        self._t0 = time.monotonic()
+        self.dir = self.root / time.strftime("%Y%m%d-%H%M%S")
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if self.tracemalloc_s and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        if self.startup:
+            import cProfile
+
+            self._startup_prof = cProfile.Profile()
+            self._startup_prof.enable()
+
+    def install(self) -> None:
+        """Con la ventana ya creada: programa fin de arranque, ventanas e instantáneas."""
+        if not self.enabled:
+            return
+        from PyQt6.QtCore import QTimer
+        from PyQt6.QtWidgets import QApplication
+
+        if self._startup_prof is not None:
+            # Primer ciclo del bucle de eventos = ventana mostrada y pintada
+            QTimer.singleShot(0, self._end_startup)
+
+        elapsed = time.monotonic() - self._t0
+        for i, (start, length) in enumerate(self.windows, 1):
+            delay = max(start - elapsed, 0.0)
+            QTimer.singleShot(int(delay * 1000), lambda i=i, length=length: self._start_window(i, length))
+
+        if self.tracemalloc_s:
+            QTimer.singleShot(0, self._snapshot)    # referencia, ya fuera del perfil de arranque
+            timer = QTimer()
+            timer.setInterval(int(self.tracemalloc_s * 1000))
+            timer.timeout.connect(self._snapshot)
+            timer.start()
+            self._timers.append(timer)
+
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.finish)
+
+    def finish(self) -> None:
+        """Cierra lo que siga abierto (perfil en curso, última instantánea)."""
+        for timer in self._timers:
+            timer.stop()
+        self._timers.clear()
+        if self._startup_prof is not None:
+            self._end_startup()
+        if self._window_prof is not None:
+            self._dump(self._window_prof, "window-partial.prof")
+            self._window_prof = None
+        if tracemalloc.is_tracing() and self._first_snap is not None:
+            self._snapshot()
+            tracemalloc.stop()
+            self._first_snap = self._prev_snap = None
+
+    # ---------- internos ----------
+    def _end_startup(self) -> None:
+        prof, self._startup_prof = self._startup_prof, None
+        if prof is not None:
+            prof.disable()
+            self._dump(prof, "startup.prof")
+
+    def _start_window(self, index: int, length: float) -> None:
+        import cProfile
+
+        from PyQt6.QtCore import QTimer
+
+        if self._window_prof is not None or self._startup_prof is not None:
+            return      # cProfile no admite perfiles solapados en el mismo hilo
+        prof = self._window_prof = cProfile.Profile()
+        prof.enable()
+        start = int(time.monotonic() - self._t0)
+        QTimer.singleShot(int(length * 1000), lambda: self._end_window(prof, index, start))
+
+    def _end_window(self, prof: cProfile.Profile, index: int, start: int) -> None:
+        if self._window_prof is not prof:
+            return
+        prof.disable()
+        self._window_prof = None
+        self._dump(prof, f"window-{index:02d}-{start}s.prof")
+
+    def _dump(self, prof: cProfile.Profile, name: str) -> None:
+        if self.dir is None:
+            return
+        path = self.dir / name
+        prof.dump_stats(str(path))
+        self.files.append(path)
+
+    def _snapshot(self) -> None:
+        if self.dir is None or not tracemalloc.is_tracing():
+            return
+        snap = tracemalloc.take_snapshot()
+        path = self.dir / f"mem-{self._snaps:03d}.snap"
+        snap.dump(str(path))
+        self.files.append(path)
+
+        if self._prev_snap is not None:
+            elapsed = time.monotonic() - self._t0
+            text = io.StringIO()
+            text.write(f"# instantánea {self._snaps} a los {elapsed:.0f} s\n")
+            text.write(_format_growth("desde la anterior", snap, self._prev_snap))
+            text.write(_format_growth("desde la primera", snap, self._first_snap))
+            report = self.dir / f"mem-{self._snaps:03d}.txt"
+            report.write_text(text.getvalue(), encoding="utf-8")
+            self.files.append(report)
+        else:
+            self._first_snap = snap
+        self._prev_snap = snap
+        self._snaps += 1
+
+
+def _format_growth(
+    title: str, new: tracemalloc.Snapshot, old: tracemalloc.Snapshot | None, top: int = TOP
+) -> str:
+    if old is None:
+        return ""
+    stats = [
+        s for s in new.compare_to(old, "lineno")
+        if not s.traceback[0].filename.startswith(_NOISE)
+    ]
+    total = sum(s.size_diff for s in stats)
+    lines = [f"\n## {title}: {total / 1024:+.1f} KiB"]
+    for stat in sorted(stats, key=lambda s: s.size_diff, reverse=True)[:top]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+7d} obj  "
+            f"{frame.filename}:{frame.lineno}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+# ---------- informe ----------
+def report(session: Path, top: int = TOP, out=sys.stdout) -> None:  # noqa: ANN001
+    """Resumen de una sesión: funciones más caras y crecimiento de memoria."""
+    import pstats
+
+    out.write(f"Sesión: {session}\n")
+
+    for prof in sorted(session.glob("*.prof")):
+        out.write(f"\n=== {prof.name} ===\n")
+        stats = pstats.Stats(str(prof), stream=out)
+        out.write(f"Total: {stats.total_tt * 1000:.1f} ms, {stats.total_calls} llamadas\n")
+        for key in ("tottime", "cumulative"):
+            out.write(f"\n-- por {key} --\n")
+            stats.sort_stats(key).print_stats(top)
+
+    snaps = sorted(session.glob("mem-*.snap"))
+    if len(snaps) >= 2:
+        first = tracemalloc.Snapshot.load(str(snaps[0]))
+        last = tracemalloc.Snapshot.load(str(snaps[-1]))
+        out.write(f"\n=== memoria ({len(snaps)} instantáneas) ===\n")
+        sizes = []
+        for path in snaps:
+            snap = first if path == snaps[0] else last if path == snaps[-1] else (
+                tracemalloc.Snapshot.load(str(path))
+            )
+            sizes.append(sum(s.size for s in snap.statistics("filename")))
+        out.write("Trazado: " + " → ".join(f"{b / 2**20:.1f}" for b in sizes) + " MiB\n")
+        out.write(_format_growth(f"{snaps[0].stem} → {snaps[-1].stem}", last, first, top))
+    elif snaps:
+        out.write("\n(una sola instantánea de memoria: sin crecimiento que comparar)\n")
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m utils.profiling",
+                                 description="Informe de perfiles de DesktopGIF")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rep = sub.add_parser("report", help="resume una sesión de perfilado")
+    rep.add_argument("session", nargs="?", help="carpeta de la sesión (por defecto, la última)")
+    rep.add_argument("--top", type=int, default=TOP)
+    args = ap.parse_args(argv)
+
+    session = Path(args.session) if args.session else latest_session()
+    if session is None or not session.is_dir():
+        print("No hay sesiones de perfilado.", file=sys.stderr)
+        return 1
+    report(session, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/single_instance.py – Una sola instancia por usuario, con reenvío de órdenes.
+
+• La primera instancia escucha en un socket local (QLocalServer) y es la
+  única dueña de la librería.
+• Las siguientes se conectan, envían su orden y salen sin crear
+  QApplication ni tocar el store (milisegundos).
+• Protocolo: una línea JSON por orden `{"cmd": ..., "args": {...}}` y una
+  línea de respuesta `{"ok": true}`.
+• Órdenes: "show", "play" (args: paths), "stop_all", "reload" y, desde
+  `cli.py` con la app abierta, "add"/"import" (args: entries, entradas
+  completas como dict) y "remove" (args: paths): así la librería solo la
+  escribe la instancia principal.
+"""
+
+from __future__ import annotations
+
+import argparse
+import getpass
+import hashlib
+import json
+import os
+from typing import List, Tuple
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+COMMANDS = ("show", "play", "stop_all", "reload", "add", "import", "remove")
+
+CONNECT_TIMEOUT_MS = 200
+REPLY_TIMEOUT_MS = 1000
+
+
+def server_name(app_id: str = "DesktopGIF") -> str:
+    """Nombre del socket, distinto por usuario (y corto: límite de sun_path)."""
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):
+        user = "default"
+    digest = hashlib.sha1(user.encode("utf-8")).hexdigest()[:10]
+    return f"{app_id}-{digest}"
+
+
+def encode(cmd: str, args: dict | None = None) -> bytes:
+    return json.dumps({"cmd": cmd, "args": args or {}}).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> Tuple[str, dict] | None:
+    try:
+        msg = json.loads(line.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(msg, dict) or msg.get("cmd") not in COMMANDS:
+        return None
+    args = msg.get("args")
+    return msg["cmd"], args if isinstance(args, dict) else {}
+
+
+def parse_commands(argv: List[str]) -> Tuple[List[Tuple[str, dict]], List[str]]:
+    """
+    Órdenes de la línea de comandos (`--show`, `--play RUTA`…, `--stop-all`,
+    `--reload`) y argumentos restantes. Las rutas se hacen absolutas aquí:
+    la instancia que las recibe puede tener otro directorio de trabajo.
+    """
+    ap = argparse.ArgumentParser(add_help=False)
+    ap.add_argument("--show", action="store_true")
+    ap.add_argument("--play", action="append", default=[], metavar="GIF")
+    ap.add_argument("--stop-all", action="store_true")
+    ap.add_argument("--reload", action="store_true")
+    args, rest = ap.parse_known_args(argv[1:])
+
+    commands: List[Tuple[str, dict]] = []
+    if args.show:
+        commands.append(("show", {}))
+    if args.stop_all:
+        commands.append(("stop_all", {}))
+    if args.reload:
+        commands.append(("reload", {}))
+    if args.play:
+        commands.append(("play", {"paths": [os.path.abspath(p) for p in args.play]}))
+    return commands, [argv[0], *rest]
+
+
+def send_commands(commands: List[Tuple[str, dict]], name: str | None = None) -> bool:
+    """
+    Envía las órdenes a la instancia en marcha (bloqueante, sin bucle de
+    eventos). Devuelve False si no hay ninguna escuchando.
+    """
+    sock = QLocalSocket()
+    sock.connectToServer(name or server_name())
+    if not sock.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    for cmd, args in commands:
+        sock.write(encode(cmd, args))
+    sock.flush()
+    # Una orden grande (miles de entradas) no cabe en una sola escritura
+    while sock.bytesToWrite() and sock.waitForBytesWritten(REPLY_TIMEOUT_MS):
+        pass
+    replies = 0
+    while replies < len(commands) and sock.waitForReadyRead(REPLY_TIMEOUT_MS):
+        while sock.canReadLine() and replies < len(commands):
+            sock.readLine()
+            replies += 1
+    sock.disconnectFromServer()
+    return True
+
+
+class InstanceServer(QObject):
+    """Servidor de la instancia principal: emite cada orden recibida."""
+
+    commandReceived = pyqtSignal(str, dict)
+
+    def __init__(self, name: str | None = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.name = name or server_name()
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self._server.newConnection.connect(self._on_connection)
+        self.received = 0
+
+    # ---------- API ----------
+    def listen(self) -> bool:
+        """
+        Empieza a escuchar. False si ya hay otra instancia escuchando; un
+        socket huérfano (proceso anterior que murió) se elimina y se reintenta.
+        """
+        if self._server.listen(self.name):
+            return True
+        if self._server.serverError() != QLocalSocket.LocalSocketError.AddressInUseError:
+            return False
+        probe = QLocalSocket()
+        probe.connectToServer(self.name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            probe.disconnectFromServer()
+            return False                # otra instancia ganó la carrera
+        QLocalServer.removeServer(self.name)
+        return self._server.listen(self.name)
+
+    def close(self) -> None:
+        self._server.close()
+
+    def is_listening(self) -> bool:
+        return self._server.isListening()
+
+    # ---------- internos ----------
+    def _on_connection(self) -> None:
+        while self._server.hasPendingConnections():
+            sock = self._server.nextPendingConnection()
+            if sock is None:
+                break
+            sock.readyRead.connect(lambda s=sock: self._on_ready(s))
+            sock.disconnected.connect(sock.deleteLater, Qt.ConnectionType.QueuedConnection)
+            self._on_ready(sock)
+
+    def _on_ready(self, sock: QLocalSocket) -> None:
+        while sock.canReadLine():
+            msg = decode(bytes(sock.readLine()))
+            ok = msg is not None
+            sock.write(json.dumps({"ok": ok}).encode("utf-8") + b"\n")
+            if msg is not None:
+                self.received += 1
+                self.commandReceived.emit(*msg)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/startup_timing.py – Tiempos del arranque por fases.
+
+• `startup_timer().mark("fase")` anota los ms transcurridos desde que se
+  importó este módulo (lo primero que hace `main.py`).
+• Dos hitos resumen el arranque:
+    - time-to-window: ventana y bandeja visibles (fase "window_shown").
+    - time-to-interactive: librería cargada y lista (fase "interactive").
+• Informe en stderr con `--startup-report` o `DESKTOPGIF_STARTUP_REPORT=1`;
+  también aparece en las métricas de `utils.instrumentation` ("startup").
+• Sin Qt: se puede importar antes que PyQt6 para medir sus importaciones.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+PROCESS_T0 = time.perf_counter()
+
+REPORT_ENV = "DESKTOPGIF_STARTUP_REPORT"
+
+WINDOW_PHASE = "window_shown"
+INTERACTIVE_PHASE = "interactive"
+
+
+class StartupTimer:
+    """Registro de fases del arranque (cada fase se anota una sola vez)."""
+
+    def __init__(self, t0: float | None = None) -> None:
+        self.t0 = PROCESS_T0 if t0 is None else t0
+        self._phases: List[Tuple[str, float]] = []
+        self._seen: Dict[str, float] = {}
+        self._listeners: List[Callable[[str, float], None]] = []
+
+    # ---------- API ----------
+    def mark(self, phase: str) -> float:
+        """Anota `phase` (si no estaba) y devuelve sus ms desde el inicio."""
+        if phase in self._seen:
+            return self._seen[phase]
+        ms = round((time.perf_counter() - self.t0) * 1000, 2)
+        self._seen[phase] = ms
+        self._phases.append((phase, ms))
+        for listener in list(self._listeners):
+            listener(phase, ms)
+        return ms
+
+    def elapsed(self, phase: str) -> float | None:
+        return self._seen.get(phase)
+
+    def add_listener(self, listener: Callable[[str, float], None]) -> None:
+        """`listener(fase, ms)` se llama en cada nueva fase."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, float], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def report(self) -> dict:
+        phases = []
+        prev = 0.0
+        for name, ms in self._phases:
+            phases.append({"phase": name, "at_ms": ms, "delta_ms": round(ms - prev, 2)})
+            prev = ms
+        return {
+            "time_to_window_ms": self._seen.get(WINDOW_PHASE),
+            "time_to_interactive_ms": self._seen.get(INTERACTIVE_PHASE),
+            "phases": phases,
+        }
+
+    def format(self) -> str:
+        lines = ["Arranque (ms desde el inicio):"]
+        for p in self.report()["phases"]:
+            lines.append(f"  {p['phase']:<20} {p['at_ms']:>9.1f}  (+{p['delta_ms']:.1f})")
+        return "\n".join(lines)
+
+
+_shared: StartupTimer | None = None
+
+
+def startup_timer() -> StartupTimer:
+    """Cronómetro único del proceso (se crea en el primer uso)."""
+    global _shared
+    if _shared is None:
+        _shared = StartupTimer()
+    return _shared
+
+
+def report_requested(argv: List[str]) -> bool:
+    return "--startup-report" in argv or os.environ.get(REPORT_ENV, "") not in ("", "0")
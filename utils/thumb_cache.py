@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/thumb_cache.py – Caché persistente de miniaturas de GIF.
+
+• Nivel 1: memoria (LRU con límite en bytes) de QPixmap ya listos.
+• Nivel 2: disco (PNG/WebP) en `storage/thumbs/`.
+• `load_image()` es apto para hilos de trabajo; `peek()`/`put()`/`get()`
+  manejan QPixmap y solo deben usarse desde el hilo GUI.
+• La clave combina ruta, mtime, tamaño del archivo y tamaño de miniatura:
+  si el GIF cambia, la clave cambia y la miniatura vieja queda huérfana
+  hasta el siguiente `prune()`.
+• Con `identity` (p. ej. `LibraryStore.content_id`), un archivo cuyo hash
+  completo se conoce usa una clave por contenido: sus copias idénticas
+  comparten la miniatura en memoria y en disco.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from PyQt6.QtCore import QSize
+from PyQt6.QtGui import QImage, QPixmap
+
+from utils.content_hash import ContentLookup
+from utils.gif_utils import first_frame_as_image
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "storage" / "thumbs"
+THUMB_SIZE = QSize(96, 96)      # miniaturas de la librería (app y cli.py)
+
+
+class ThumbnailCache:
+    """Miniaturas en dos niveles (memoria LRU + disco), invalidadas por mtime/tamaño."""
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_files: int = 20_000,
+        image_format: str = "PNG",
+    ) -> None:
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_files = max_disk_files
+        self.image_format = image_format.upper()
+        self._suffix = "." + self.image_format.lower()
+        self.identity: ContentLookup | None = None     # ruta → hash de contenido
+
+        self._memory: OrderedDict[str, QPixmap] = OrderedDict()
+        self._memory_bytes = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.prune()
+
+    # ---------- API ----------
+    def get(self, path: str | Path, thumb_size: QSize) -> QPixmap:
+        """Devuelve la miniatura de `path`; la genera y persiste si no existe."""
+        pix = self.peek(path, thumb_size)
+        if pix is not None:
+            return pix
+        key, img = self.load_image(path, thumb_size)
+        if key is None or img.isNull():
+            return QPixmap()
+        return self.put(key, img)
+
+    def peek(self, path: str | Path, thumb_size: QSize) -> QPixmap | None:
+        """Solo nivel de memoria: no toca el disco ni decodifica."""
+        key = self.key_for(path, thumb_size)
+        if key is None:
+            return None
+        pix = self._memory.get(key)
+        if pix is not None:
+            self._memory.move_to_end(key)
+        return pix
+
+    def load_image(self, path: str | Path, thumb_size: QSize) -> tuple[str | None, QImage]:
+        """
+        Nivel de disco + decodificación; devuelve (clave, QImage).
+        • No toca el nivel de memoria ni crea QPixmap: apto para hilos de trabajo.
+        """
+        key = self.key_for(path, thumb_size)
+        if key is None:
+            return None, QImage()
+
+        file = self._file_for(key)
+        img = QImage()
+        if file.exists() and img.load(str(file)):
+            return key, img
+
+        img = first_frame_as_image(path, thumb_size)
+        if not img.isNull():
+            self._write(file, img)
+        return key, img
+
+    def has_file(self, key: str) -> bool:
+        """La miniatura de `key` ya está en el nivel de disco."""
+        return self._file_for(key).exists()
+
+    def save(self, key: str, img: QImage) -> None:
+        """Guarda en disco una miniatura generada fuera (p. ej. en otro proceso)."""
+        if not img.isNull():
+            self._write(self._file_for(key), img)
+
+    def put(self, key: str, img: QImage) -> QPixmap:
+        """Convierte a QPixmap (hilo GUI) y lo registra en el nivel de memoria."""
+        pix = QPixmap.fromImage(img)
+        self._remember(key, pix)
+        return pix
+
+    def key_for(self, path: str | Path, thumb_size: QSize) -> str | None:
+        """Clave estable para (ruta o contenido, mtime, tamaño, miniatura) o None si no existe."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        content = self.identity(str(path), st.st_mtime_ns, st.st_size) if self.identity else ""
+        if content:
+            raw = f"content:{content}|{thumb_size.width()}x{thumb_size.height()}"
+        else:
+            raw = (
+                f"{os.path.normcase(os.path.abspath(path))}|{st.st_mtime_ns}|{st.st_size}"
+                f"|{thumb_size.width()}x{thumb_size.height()}"
+            )
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def discard(self, path: str | Path, thumb_size: QSize) -> None:
+        """Quita la miniatura vigente de `path` de ambos niveles."""
+        key = self.key_for(path, thumb_size)
+        if key is None:
+            return
+        pix = self._memory.pop(key, None)
+        if pix is not None:
+            self._memory_bytes -= self._pixmap_bytes(pix)
+        self._file_for(key).unlink(missing_ok=True)
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+        self._memory_bytes = 0
+
+    def prune(self) -> None:
+        """Recorta el nivel de disco a `max_disk_files`, borrando los más antiguos."""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(self._suffix)]
+        except OSError:
+            return
+        excess = len(entries) - self.max_disk_files
+        if excess <= 0:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[:excess]:
+            try:
+                os.unlink(e.path)
+            except OSError:
+                pass
+
+    # ---------- internos ----------
+    def _file_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self._suffix}"
+
+    def _write(self, file: Path, img: QImage) -> None:
+        # Escritura atómica: nunca dejar un PNG a medias en la caché
+        tmp = file.with_name(f"{file.name}.{threading.get_ident()}.tmp")
+        if img.save(str(tmp), self.image_format):
+            os.replace(tmp, file)
+        else:
+            tmp.unlink(missing_ok=True)
+
+    def _remember(self, key: str, pix: QPixmap) -> None:
+        old = self._memory.pop(key, None)   # p. ej. dos copias cargadas a la vez
+        if old is not None:
+            self._memory_bytes -= self._pixmap_bytes(old)
+        self._memory[key] = pix
+        self._memory_bytes += self._pixmap_bytes(pix)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= self._pixmap_bytes(old)
+
+    @staticmethod
+    def _pixmap_bytes(pix: QPixmap) -> int:
+        return pix.width() * pix.height() * max(pix.depth(), 8) // 8
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+utils/thumb_loader.py – Generación asíncrona de miniaturas.
+
+• Pool de hilos acotado (QThreadPool propio, no el global).
+• Cada tarea lee la miniatura de la caché de disco o la decodifica
+  directamente al tamaño final (`first_frame_as_image`).
+• El resultado vuelve al hilo GUI por señal; allí se convierte a QPixmap.
+• `cancel(path)` descarta tareas en cola y resultados ya en vuelo;
+  `retain(paths)` cancela las de rutas que la vista ya no necesita.
+• `timings()` expone tiempo hasta la primera miniatura y hasta la última.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Collection, Dict
+
+from PyQt6.QtCore import QObject, QRunnable, QSize, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from utils.thumb_cache import ThumbnailCache
+
+
+class _TaskSignals(QObject):
+    done = pyqtSignal(str, object, QImage)   # path, key | None, imagen
+
+
+class _ThumbTask(QRunnable):
+    def __init__(
+        self,
+        path: str,
+        size: QSize,
+        cache: ThumbnailCache,
+        signals: _TaskSignals,
+        cancelled: threading.Event,
+    ) -> None:
+        super().__init__()
+        self._path = path
+        self._size = QSize(size)
+        self._cache = cache
+        self._signals = signals
+        self._cancelled = cancelled
+
+    def run(self) -> None:
+        if self._cancelled.is_set():
+            return
+        key, img = self._cache.load_image(self._path, self._size)
+        if not self._cancelled.is_set():
+            self._signals.done.emit(self._path, key, img)
+
+
+class ThumbnailLoader(QObject):
+    """Pide miniaturas a un pool de hilos y las entrega como QPixmap en el hilo GUI."""
+
+    thumbnailReady = pyqtSignal(str, QPixmap)   # path, miniatura
+    thumbnailFailed = pyqtSignal(str)           # path
+    idle = pyqtSignal()                         # no quedan tareas pendientes
+
+    def __init__(
+        self,
+        cache: ThumbnailCache,
+        thumb_size: QSize,
+        max_threads: int | None = None,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._cache = cache
+        self._size = QSize(thumb_size)
+
+        self._pool = QThreadPool(self)
+        ideal = max(QThreadPool.globalInstance().maxThreadCount() - 1, 1)
+        self._pool.setMaxThreadCount(max_threads or min(ideal, 4))
+
+        self._signals = _TaskSignals(self)
+        self._signals.done.connect(self._on_done)
+
+        self._pending: Dict[str, tuple[_ThumbTask, threading.Event]] = {}
+
+        self._t_start: float | None = None
+        self._t_first: float | None = None
+        self._t_all: float | None = None
+        self._delivered = 0
+
+    # ---------- API ----------
+    def request(self, path: str) -> None:
+        """Entrega de inmediato si está en memoria; si no, encola la tarea."""
+        if path in self._pending:
+            return
+        if self._t_start is None or self._t_all is not None:
+            self._reset_timings()
+
+        pix = self._cache.peek(path, self._size)
+        if pix is not None:
+            self._deliver(path, pix)
+            return
+
+        cancelled = threading.Event()
+        task = _ThumbTask(path, self._size, self._cache, self._signals, cancelled)
+        self._pending[path] = (task, cancelled)
+        self._pool.start(task)
+
+    def cancel(self, path: str) -> None:
+        pending = self._pending.pop(path, None)
+        if pending is None:
+            return
+        task, cancelled = pending
+        cancelled.set()
+        try:
+            self._pool.tryTake(task)
+        except RuntimeError:
+            pass  # la tarea ya terminó y Qt la liberó
+        self._check_idle()
+
+    def cancel_all(self) -> None:
+        for path in list(self._pending):
+            self.cancel(path)
+
+    def retain(self, paths: Collection[str]) -> int:
+        """Cancela las peticiones pendientes fuera de `paths`. Devuelve cuántas."""
+        drop = [p for p in self._pending if p not in paths]
+        for path in drop:
+            self.cancel(path)
+        return len(drop)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Bloquea hasta vaciar el pool (útil en benchmarks headless)."""
+        return self._pool.waitForDone(msecs)
+
+    def timings(self) -> dict:
+        """Milisegundos desde la primera petición hasta la 1.ª y la última miniatura."""
+        def ms(t: float | None) -> float | None:
+            if t is None or self._t_start is None:
+                return None
+            return round((t - self._t_start) * 1000, 2)
+
+        return {
+            "first_paint_ms": ms(self._t_first),
+            "all_thumbnails_ms": ms(self._t_all),
+            "delivered": self._delivered,
+            "pending": len(self._pending),
+        }
+
+    # ---------- internos ----------
+    def _reset_timings(self) -> None:
+        self._t_start = time.perf_counter()
+        self._t_first = None
+        self._t_all = None
+        self._delivered = 0
+
+    def _on_done(self, path: str, key: str | None, img: QImage) -> None:
+        if self._pending.pop(path, None) is None:
+            return  # cancelada mientras volvía el resultado
+        if key is None or img.isNull():
+            self.thumbnailFailed.emit(path)
+        else:
+            self._deliver(path, self._cache.put(key, img))
+        self._check_idle()
+
+    def _deliver(self, path: str, pix: QPixmap) -> None:
+        if self._t_first is None:
+            self._t_first = time.perf_counter()
+        self._delivered += 1
+        self.thumbnailReady.emit(path, pix)
+        self._check_idle()
+
+    def _check_idle(self) -> None:
+        if not self._pending and self._t_all is None and self._t_start is not None:
+            self._t_all = time.perf_counter()
+            self.idle.emit()